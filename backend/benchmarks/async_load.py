@@ -0,0 +1,127 @@
+"""
+Latency under concurrent load: sync views (WSGI) vs. async views (ASGI)
+
+Runs in-process against a throwaway test database. The WSGI side sends
+requests from a pool of threads through django.test.Client, like a threaded
+WSGI server. The ASGI side sends them concurrently through AsyncClient on
+one event loop. Both sides get the same mix: a few large /analyze/ jobs and
+many cheap requests (small /analyze/ payloads and /suggest/). The result
+cache is disabled so every request is scored.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_load --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import make_backlog, setup_django
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def build_workload(count, heavy_every, heavy_size, seed=0):
+    """(kind, method, path, body) tuples - one heavy analyze job per heavy_every requests"""
+    heavy = json.dumps(make_backlog(heavy_size, seed=seed))
+    light = json.dumps(make_backlog(20, seed=seed))
+    rng = random.Random(seed)
+    workload = []
+    for i in range(count):
+        if i % heavy_every == 0:
+            workload.append(('heavy', 'post', 'tasks/analyze/', heavy))
+        elif rng.random() < 0.5:
+            workload.append(('light', 'post', 'tasks/analyze/', light))
+        else:
+            workload.append(('light', 'get', 'tasks/suggest/', None))
+    return workload
+
+def send(client, prefix, request):
+    kind, method, path, body = request
+    start = time.perf_counter()
+    if method == 'post':
+        response = client.post(f'{prefix}{path}', data=body, content_type='application/json')
+    else:
+        response = client.get(f'{prefix}{path}')
+    assert response.status_code == 200, response.content[:200]
+    return kind, time.perf_counter() - start
+
+def run_wsgi(workload, concurrency):
+    from django.test import Client
+    
+    def worker(request):
+        return send(Client(), '/api/', request)
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(worker, workload))
+
+async def run_asgi(workload, concurrency):
+    from django.test import AsyncClient
+    
+    limit = asyncio.Semaphore(concurrency)
+    
+    async def worker(request):
+        kind, method, path, body = request
+        async with limit:
+            client = AsyncClient()
+            start = time.perf_counter()
+            if method == 'post':
+                response = await client.post(f'/api/async/{path}', data=body, content_type='application/json')
+            else:
+                response = await client.get(f'/api/async/{path}')
+            assert response.status_code == 200, response.content[:200]
+            return kind, time.perf_counter() - start
+    
+    return await asyncio.gather(*(worker(request) for request in workload))
+
+def report(label, results, elapsed):
+    for kind in ('light', 'heavy'):
+        latencies = [latency * 1000 for k, latency in results if k == kind]
+        print(
+            f'{label:>5}  {kind:>5}  {len(latencies):>6}  {statistics.median(latencies):9.1f}  '
+            f'{percentile(latencies, 0.99):9.1f}  {len(results) / elapsed:8.1f}'
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--heavy-every', type=int, default=20, help='one large analyze job per N requests')
+    parser.add_argument('--heavy-size', type=int, default=20000, help='tasks in each large analyze job')
+    parser.add_argument('--stored-tasks', type=int, default=1000)
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from tasks import store
+    from tasks.models import Task
+    
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    settings.TASK_ANALYSIS_CACHE = None
+    
+    Task.objects.bulk_create(
+        Task(title=task['title'], due_date=task['due_date'], estimated_hours=task['estimated_hours'], importance=task['importance'])
+        for task in make_backlog(args.stored_tasks, dependency_density=0)
+    )
+    store.rescore_all()
+    
+    workload = build_workload(args.requests, args.heavy_every, args.heavy_size)
+    print(f'{"mode":>5}  {"kind":>5}  {"count":>6}  {"p50 (ms)":>9}  {"p99 (ms)":>9}  {"req/s":>8}')
+    
+    start = time.perf_counter()
+    results = run_wsgi(workload, args.concurrency)
+    report('wsgi', results, time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    results = asyncio.run(run_asgi(workload, args.concurrency))
+    report('asgi', results, time.perf_counter() - start)
+
+if __name__ == '__main__':
+    main()
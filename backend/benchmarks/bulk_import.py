@@ -0,0 +1,72 @@
+"""
+Bulk import throughput against saving one task at a time
+
+Writes a synthetic backlog to CSV, loads it with the batched import used by
+manage.py import_tasks, then exports it again. For comparison a small sample
+is saved row by row through TaskSerializer, as POST /api/tasks/ does, and the
+rate is extrapolated. Runs against a throwaway SQLite file, never db.sqlite3.
+
+Usage (from the backend directory):
+    python -m benchmarks.bulk_import --size 100000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from .common import make_backlog, setup_django
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--row-sample', type=int, default=500, help='Tasks saved one at a time for comparison')
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+    
+    directory = tempfile.mkdtemp()
+    settings.DATABASES['default']['NAME'] = os.path.join(directory, 'bench.sqlite3')  # Before any connection opens
+    call_command('migrate', verbosity=0)
+    
+    from tasks import bulk, store
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer
+    
+    path = os.path.join(directory, 'tasks.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(bulk.FIELDS)
+        for task in make_backlog(args.size):
+            # Synthetic ids are positions; dependencies stay dangling, which scoring allows
+            writer.writerow(('', task['title'], task['due_date'], max(1, round(task['estimated_hours'])),
+                             task['importance'], ';'.join(task['dependencies'])))
+    
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        result = bulk.import_tasks(bulk.iter_rows(f, 'csv'), args.batch_size)
+    bulk_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    exported = sum(1 for _ in bulk.export_lines('csv', args.batch_size)) - 1
+    export_seconds = time.perf_counter() - start
+    
+    sample = make_backlog(args.row_sample, seed=1)
+    Task.objects.all().delete()
+    start = time.perf_counter()
+    for task in sample:
+        serializer = TaskSerializer(data=dict(task, id=None, estimated_hours=max(1, round(task['estimated_hours']))))
+        serializer.is_valid(raise_exception=True)
+        store.save_task(serializer)
+    row_rate = args.row_sample / (time.perf_counter() - start)
+    
+    print(f'bulk import:  {result["imported"]:,} tasks in {bulk_seconds:.2f} s ({result["imported"] / bulk_seconds:,.0f} tasks/s)')
+    print(f'export:       {exported:,} tasks in {export_seconds:.2f} s')
+    print(f'row by row:   {row_rate:,.0f} tasks/s on {args.row_sample} tasks, '
+          f'~{args.size / row_rate / 60:.1f} min for {args.size:,}')
+
+if __name__ == '__main__':
+    main()
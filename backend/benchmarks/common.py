@@ -0,0 +1,59 @@
+import os
+import random
+import time
+from datetime import timedelta
+
+def setup_django():
+    """Configure Django so the scoring code can run outside manage.py"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_analyzer.settings')
+    import django
+    django.setup()
+
+# How due dates are spread over the -5..due_date_spread day window
+DUE_DATE_DISTRIBUTIONS = ('uniform', 'near', 'overdue')
+
+def _due_offset(rng, distribution, spread):
+    if distribution == 'near':
+        # Most tasks due within the next week or two, with a long tail
+        return min(spread, int(rng.expovariate(1 / 7)))
+    if distribution == 'overdue':
+        # Half the backlog is already late
+        return rng.randint(-30, -1) if rng.random() < 0.5 else rng.randint(0, spread)
+    return rng.randint(-5, spread)
+
+def make_backlog(size, dependency_density=0.3, max_dependencies=3, due_date_spread=60, seed=0, due_dates='uniform'):
+    """Generate a synthetic backlog of task dicts shaped like /api/tasks/analyze/ payloads"""
+    from django.utils import timezone
+    
+    if due_dates not in DUE_DATE_DISTRIBUTIONS:
+        raise ValueError(f'due_dates must be one of {", ".join(DUE_DATE_DISTRIBUTIONS)}')
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    tasks = []
+    
+    for i in range(size):
+        dependencies = []
+        if i and rng.random() < dependency_density:
+            # Only depend on earlier tasks so the backlog stays acyclic
+            count = rng.randint(1, max_dependencies)
+            dependencies = [str(rng.randrange(i)) for _ in range(count)]
+        
+        tasks.append({
+            'id': str(i),
+            'title': f'Task {i}',
+            'due_date': (today + timedelta(days=_due_offset(rng, due_dates, due_date_spread))).isoformat(),
+            'estimated_hours': rng.randint(1, 16),
+            'importance': rng.randint(1, 10),
+            'dependencies': dependencies,
+        })
+    
+    return tasks
+
+def best_of(func, repeat=3):
+    """Run func repeat times and return the fastest wall-clock time in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,53 @@
+"""
+Compare per-task dependency scanning with the precomputed DependencyIndex
+
+Usage (from the backend directory):
+    python -m benchmarks.dependency_index
+    python -m benchmarks.dependency_index --sizes 1000 10000 100000 --legacy-limit 10000
+"""
+import argparse
+
+from .common import best_of, make_backlog, setup_django
+
+def legacy_score(scorer, tasks):
+    """The original O(n^2) loop: every task rescans the whole backlog"""
+    return [scorer.calculate_total_score(task, tasks) for task in tasks]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-limit', type=int, default=10000,
+                        help='Largest size to time the quadratic loop at; larger sizes are extrapolated')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    setup_django()
+    from tasks.scoring import TaskScorer
+    
+    scorer = TaskScorer()
+    measured = None  # (size, seconds) of the largest real legacy measurement
+    
+    print(f'{"tasks":>8}  {"legacy (s)":>12}  {"indexed (s)":>12}  {"speedup":>9}')
+    for size in args.sizes:
+        tasks = make_backlog(size)
+        
+        indexed = best_of(lambda: scorer.score_tasks(tasks), args.repeat)
+        
+        if size <= args.legacy_limit:
+            legacy = best_of(lambda: legacy_score(scorer, tasks), 1)
+            assert legacy_score(scorer, tasks) == scorer.score_tasks(tasks)
+            measured = (size, legacy)
+            legacy_label = f'{legacy:12.3f}'
+        elif measured:
+            # Quadratic extrapolation from the largest measured run
+            legacy = measured[1] * (size / measured[0]) ** 2
+            legacy_label = f'{"~%.1f" % legacy:>12}'
+        else:
+            legacy = None
+            legacy_label = f'{"skipped":>12}'
+        
+        speedup = f'{legacy / indexed:8.0f}x' if legacy else f'{"-":>9}'
+        print(f'{size:>8}  {legacy_label}  {indexed:12.3f}  {speedup}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Peak memory of ranking a backlog, per task, with tracemalloc
+
+The legacy pipeline scored into a list, copied every task dict to add its
+score and sorted the copies. The current one ranks (score, position) pairs and
+wraps each task in a slotted ScoredTask that points at the submitted dict.
+The submitted tasks themselves are allocated before tracing starts, so only
+the memory the ranking adds is counted.
+
+Usage (from the backend directory):
+    python -m benchmarks.memory --sizes 100000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from .common import make_backlog, setup_django
+
+def legacy_rank(scorer, tasks):
+    """The ranking analyze_tasks used to build"""
+    scores = scorer.score_tasks(tasks)
+    ranked = []
+    for task, score in zip(tasks, scores):
+        task_with_score = task.copy()
+        task_with_score['priority_score'] = score
+        task_with_score['strategy_used'] = 'smart'
+        ranked.append(task_with_score)
+    ranked.sort(key=lambda x: x['priority_score'], reverse=True)
+    return ranked
+
+def compact_rank(scorer, tasks):
+    from tasks.records import ScoredTask
+    return [ScoredTask(tasks[i], score, 'smart') for score, i in scorer.rank_tasks(tasks)]
+
+def peak_bytes(func):
+    """Peak bytes allocated while func runs, including what its result keeps alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+    
+    setup_django()
+    from tasks.scoring import TaskScorer
+    from tasks.validation import validate_tasks
+    
+    scorer = TaskScorer()
+    print(f'{"tasks":>8}  {"legacy (B/task)":>15}  {"compact (B/task)":>16}  {"saved":>6}')
+    for size in args.sizes:
+        tasks = make_backlog(size)
+        validate_tasks(tasks)  # Parse due dates up front, as analyze_tasks does
+        legacy = peak_bytes(lambda: legacy_rank(scorer, tasks)) / size
+        compact = peak_bytes(lambda: compact_rank(scorer, tasks)) / size
+        print(f'{size:>8}  {legacy:15,.0f}  {compact:16,.0f}  {1 - compact / legacy:6.0%}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Find where process-pool scoring starts beating a single core
+
+Usage (from the backend directory):
+    python -m benchmarks.parallel_scoring
+    python -m benchmarks.parallel_scoring --sizes 50000 200000 800000 --workers 16
+"""
+import argparse
+
+from .common import best_of, make_backlog, setup_django
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000, 200000, 400000])
+    parser.add_argument('--workers', type=int, default=None, help='Pool size (default: os.cpu_count())')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.conf import settings
+    from tasks import parallel
+    from tasks.scoring import TaskScorer
+    
+    settings.TASK_SCORING_WORKERS = args.workers
+    scorer = TaskScorer()
+    # Start the workers before timing so pool start-up is not counted
+    parallel.get_pool().submit(int).result()
+    
+    print(f'workers: {parallel.worker_count()}')
+    print(f'{"tasks":>8}  {"serial (s)":>11}  {"parallel (s)":>12}  {"speedup":>8}')
+    for size in args.sizes:
+        tasks = make_backlog(size)
+        serial = best_of(lambda: scorer.rank_tasks(tasks), args.repeat)
+        pooled = best_of(lambda: parallel.rank_in_pool(scorer, tasks), args.repeat)
+        assert parallel.rank_in_pool(scorer, tasks) == scorer.rank_tasks(tasks)
+        print(f'{size:>8}  {serial:11.3f}  {pooled:12.3f}  {serial / pooled:7.2f}x')
+    
+    parallel.shutdown_pool()
+
+if __name__ == '__main__':
+    main()
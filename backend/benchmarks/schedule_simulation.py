@@ -0,0 +1,84 @@
+"""
+Time the what-if scheduler against rescoring every ready task at each step
+
+Usage (from the backend directory):
+    python -m benchmarks.schedule_simulation
+    python -m benchmarks.schedule_simulation --sizes 50000 100000 --capacity 6 --naive-limit 0
+
+Exits non-zero when simulating --budget-size tasks takes longer than --budget seconds.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from .common import best_of, make_backlog, setup_django
+
+def rescore_each_step(tasks, weights, daily_hours, start_date):
+    """Reference scheduler: score every ready task with the day's urgency before each pick"""
+    from tasks.graph import TaskGraph
+    from tasks.scoring import COMPONENTS, TaskScorer, UrgencyTable
+    
+    scorer = TaskScorer(weights)
+    columns = scorer.component_columns(tasks)
+    graph = TaskGraph(tasks)
+    in_degree = list(graph.in_degree)
+    ready = {i for i, degree in enumerate(in_degree) if degree == 0}
+    hours = 0
+    order = []
+    while ready:
+        urgency_of = UrgencyTable(start_date + timedelta(days=int(hours // daily_hours)))
+        best = min(ready, key=lambda i: (-scorer.combine({
+            'urgency': urgency_of(tasks[i]['due_date']),
+            **{component: columns[component][i] for component in COMPONENTS[1:]},
+        }), i))
+        ready.remove(best)
+        order.append(tasks[best]['id'])
+        hours += tasks[best]['estimated_hours']
+        for successor in graph.successors[best]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                ready.add(successor)
+    return order
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000, 100000])
+    parser.add_argument('--capacity', type=float, default=8, help='Hours of work per simulated day')
+    parser.add_argument('--naive-limit', type=int, default=2000, help='Largest size to run the reference scheduler on')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=1.0, help='Most seconds one simulation of --budget-size tasks may take')
+    parser.add_argument('--budget-size', type=int, default=50000)
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.utils import timezone
+    from tasks.scoring import get_weights_for_strategy
+    from tasks.simulation import ScheduleSimulator
+    from tasks.validation import validate_tasks
+    
+    weights = get_weights_for_strategy('smart')
+    simulator = ScheduleSimulator(weights, args.capacity)
+    start_date = timezone.now().date()
+    
+    over_budget = None
+    print(f'{"tasks":>8}  {"simulate (s)":>12}  {"late":>7}  {"rescore each step (s)":>21}')
+    for size in args.sizes:
+        tasks = make_backlog(size)
+        validate_tasks(tasks)
+        simulated = best_of(lambda: simulator.simulate(tasks, start_date), args.repeat)
+        data = simulator.simulate(tasks, start_date)
+        naive = ''
+        if size <= args.naive_limit:
+            began = time.perf_counter()
+            order = rescore_each_step(tasks, weights, args.capacity, start_date)
+            naive = f'{time.perf_counter() - began:.3f}'
+            assert order == [task['id'] for task in data['schedule']]
+        print(f'{size:>8}  {simulated:12.3f}  {data["late_count"]:>7}  {naive:>21}')
+        if size == args.budget_size and simulated > args.budget:
+            over_budget = simulated
+    
+    if over_budget is not None:
+        raise SystemExit(f'{args.budget_size} tasks took {over_budget:.3f}s to simulate, over the {args.budget:.3f}s budget')
+
+if __name__ == '__main__':
+    main()
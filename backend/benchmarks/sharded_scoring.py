@@ -0,0 +1,48 @@
+"""
+Scale map/reduce scoring from 1 to N local shard workers
+
+Usage (from the backend directory):
+    python -m benchmarks.sharded_scoring
+    python -m benchmarks.sharded_scoring --size 400000 --workers 8
+"""
+import argparse
+import secrets
+
+from .common import best_of, make_backlog, setup_django
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=4, help='Largest worker count to try')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    setup_django()
+    from django.conf import settings
+    from tasks import sharding
+    
+    # The workers are local to this run, so a throwaway key will do
+    settings.TASK_SHARD_AUTHKEY = settings.TASK_SHARD_AUTHKEY or secrets.token_hex(16)
+    from tasks.scoring import TaskScorer
+    
+    scorer = TaskScorer()
+    tasks = make_backlog(args.size)
+    expected = scorer.rank_tasks(tasks)
+    serial = best_of(lambda: scorer.rank_tasks(tasks), args.repeat)
+    processes, addresses = sharding.start_local_workers(args.workers)
+    
+    print(f'tasks: {args.size}  serial: {serial:.3f}s')
+    print(f'{"workers":>7}  {"sharded (s)":>11}  {"speedup":>8}')
+    try:
+        for count in range(1, args.workers + 1):
+            coordinator = sharding.Coordinator(addresses[:count])
+            assert coordinator.rank(scorer, tasks) == expected
+            sharded = best_of(lambda: coordinator.rank(scorer, tasks), args.repeat)
+            coordinator.close()
+            print(f'{count:>7}  {sharded:11.3f}  {serial / sharded:7.2f}x')
+    finally:
+        for process in processes:
+            process.terminate()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare the original per-task validation loop with tasks.validation
+
+The original loop only checked presence and ranges and stopped at the first
+error; due dates were parsed later by the scorer, once per task. The new
+validator also checks types and date formats and parses each distinct date
+once, so both columns include the date parsing the scorer needs.
+
+Usage (from the backend directory):
+    python -m benchmarks.validation --sizes 100000
+"""
+import argparse
+import copy
+from datetime import date
+
+from .common import best_of, make_backlog, setup_django
+
+def legacy_validate(tasks):
+    """The validation loop analyze_tasks used to run, plus the scorer's per-task date parsing"""
+    for task in tasks:
+        if not all(k in task for k in ['title', 'due_date', 'estimated_hours', 'importance']):
+            return False
+        if not (1 <= task['importance'] <= 10):
+            return False
+        if task['estimated_hours'] <= 0:
+            return False
+    for task in tasks:
+        date.fromisoformat(task['due_date'])
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    setup_django()
+    from tasks.validation import validate_tasks
+    
+    print(f'{"tasks":>8}  {"legacy (s)":>11}  {"validator (s)":>13}  {"tasks/s":>11}')
+    for size in args.sizes:
+        tasks = make_backlog(size)
+        legacy = best_of(lambda: legacy_validate(tasks), args.repeat)
+        # validate_tasks normalizes dates in place, so time it on fresh copies
+        copies = [copy.deepcopy(tasks) for _ in range(args.repeat)]
+        validator = best_of(lambda: validate_tasks(copies.pop()), args.repeat)
+        print(f'{size:>8}  {legacy:11.3f}  {validator:13.3f}  {size / validator:11,.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+In-memory cache of the frontend files served by serve_frontend.
+
+Each file is read once, hashed for a strong ETag and compressed once per
+encoding, so a request only picks a ready-made byte string. A file is
+re-read when its mtime or size changes; the stat that detects this runs at
+most once per FRONTEND_ASSET_RECHECK_SECONDS per file.
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip and identity are always available
+    brotli = None
+
+CONTENT_TYPES = {
+    'index.html': 'text/html; charset=utf-8',
+    'script.js': 'text/javascript; charset=utf-8',
+    'styles.css': 'text/css; charset=utf-8',
+}
+
+# Preferred first when the client accepts several
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+DEFAULT_RECHECK_SECONDS = 1.0
+
+def frontend_dir():
+    return getattr(settings, 'FRONTEND_DIR', settings.BASE_DIR / '../frontend')
+
+def recheck_seconds():
+    return getattr(settings, 'FRONTEND_ASSET_RECHECK_SECONDS', DEFAULT_RECHECK_SECONDS)
+
+def _compress(encoding, body):
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=9, mtime=0)  # mtime=0 keeps the bytes reproducible
+
+class FrontendAsset:
+    """One file's bytes, its compressed variants and the stat they were read at"""
+    __slots__ = ('name', 'content_type', 'mtime', 'size', 'etag', 'variants', 'checked_at')
+    
+    def __init__(self, name, path):
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            body = f.read()
+        
+        self.name = name
+        self.content_type = CONTENT_TYPES[name]
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.checked_at = time.monotonic()
+        self.variants = {None: body}
+        for encoding in ENCODINGS:
+            compressed = _compress(encoding, body)
+            if len(compressed) < len(body):
+                self.variants[encoding] = compressed
+    
+    def is_current(self, stat):
+        return stat.st_mtime == self.mtime and stat.st_size == self.size
+    
+    def etag_for(self, encoding):
+        """Strong ETag - each encoding is a different representation, so it gets its own tag"""
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+    
+    def choose_encoding(self, accept_encoding):
+        """Best precompressed variant the client accepts, or None for the plain bytes"""
+        accepted = set()
+        for part in accept_encoding.split(','):
+            coding, _, params = part.partition(';')
+            key, _, value = params.strip().partition('=')
+            try:
+                quality = float(value) if key.strip() == 'q' else 1.0
+            except ValueError:
+                quality = 0.0
+            if quality > 0:
+                accepted.add(coding.strip().lower())
+        
+        for encoding in ENCODINGS:
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+
+class AssetCache:
+    """Thread-safe name -> FrontendAsset map, refreshed when files change on disk"""
+    def __init__(self):
+        self._assets = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name):
+        """Current asset for name; raises FileNotFoundError if the file is gone"""
+        if name not in CONTENT_TYPES:
+            raise FileNotFoundError(name)
+        
+        asset = self._assets.get(name)
+        now = time.monotonic()
+        if asset is not None and now - asset.checked_at < recheck_seconds():
+            return asset
+        
+        path = os.path.join(frontend_dir(), name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._assets.pop(name, None)
+            raise
+        
+        if asset is not None and asset.is_current(stat):
+            asset.checked_at = now
+            return asset
+        
+        with self._lock:
+            asset = self._assets.get(name)
+            if asset is None or not asset.is_current(os.stat(path)):
+                asset = self._assets[name] = FrontendAsset(name, path)
+            return asset
+    
+    def preload(self):
+        """Read and compress every asset up front so the first request does no work"""
+        for name in CONTENT_TYPES:
+            try:
+                self.get(name)
+            except FileNotFoundError:
+                pass
+    
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+
+assets = AssetCache()
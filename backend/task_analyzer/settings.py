@@ -20,6 +20,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.instrumentation.ServerTimingMiddleware',  # Outermost, so 'total' covers every middleware
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -83,12 +84,80 @@ STATICFILES_DIRS = [
     BASE_DIR / '../frontend',  # Serve files from frontend directory
 ]
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # /api/tasks/analyze/ results - LocMemCache evicts least recently used entries past MAX_ENTRIES
+    'analysis': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-analysis',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 256},
+    },
+}
+
+# Cache alias used for /api/tasks/analyze/ results; None disables result caching.
+# Entries hold rankings (positions and scores), not task dicts, and larger payloads are not cached
+TASK_ANALYSIS_CACHE = 'analysis'
+TASK_ANALYSIS_CACHE_MAX_TASKS = 20000
+
+# Opt-in multi-process scoring for single-strategy /api/tasks/analyze/ requests
+TASK_SCORING_PARALLEL = False
+TASK_SCORING_PARALLEL_THRESHOLD = 200000  # Smaller batches always score on one core
+TASK_SCORING_WORKERS = None  # Defaults to os.cpu_count()
+# Map/reduce across `manage.py score_worker` processes, tried before the pool when listed
+TASK_SHARD_WORKERS = []  # e.g. ['10.0.0.5:7100', '10.0.0.6:7100']
+# Shared by coordinator and workers and required by both - keep it private, connections carry pickles
+TASK_SHARD_AUTHKEY = os.environ.get('TASK_SHARD_AUTHKEY')
+
+# Async views (/api/async/...): payloads this large are scored in the TASK_SCORING_WORKERS process pool,
+# not on the event loop
+TASK_ASYNC_OFFLOAD_THRESHOLD = 500
+
+# Frontend files served from memory by serve_frontend; changes on disk are picked up
+# within FRONTEND_ASSET_RECHECK_SECONDS
+FRONTEND_DIR = BASE_DIR / '../frontend'
+FRONTEND_ASSET_RECHECK_SECONDS = 1.0
+FRONTEND_CACHE_CONTROL = 'no-cache'  # Always revalidate; unchanged files answer 304
+
+# Per-request stage timings: Server-Timing headers and histograms at /api/metrics/
+TASK_INSTRUMENTATION = False
+TASK_METRICS_WINDOW = 1000  # Recent requests kept per view and stage
+TASK_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+TASK_PROFILE_SAMPLE_RATE = 0.0  # Share of timed sync requests run under cProfile...
+TASK_PROFILE_DIR = None  # ...with .prof files written here
+
+# Stale stored scores (after midnight, or rows saved outside the API) are refreshed on a
+# background thread; run `manage.py urgency_tick` from cron so requests rarely see any
+TASK_REFRESH_SCORES_INLINE = False  # True refreshes inside the request that finds them
+
+# Analysis sessions (/api/tasks/sessions/) - kept in process memory, least recently used dropped first
+TASK_SESSION_LIMIT = 64
+TASK_SESSION_IDLE_SECONDS = 60 * 60
+
+# Bulk import/export (manage.py import_tasks / export_tasks, /api/tasks/import/ and /export/)
+TASK_IMPORT_BATCH_SIZE = 2000  # Rows per bulk_create transaction and per export fetch
+# Run on every new SQLite connection; WAL lets reads continue during bulk writes
+TASK_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,  # Negative means KiB, i.e. about 20 MB
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    # orjson when installed, stdlib json otherwise - see tasks/renderers.py
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-    ]
+        'tasks.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'tasks.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 CORS_ALLOWED_ORIGINS = [
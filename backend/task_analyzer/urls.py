@@ -5,5 +5,6 @@ from . import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('tasks.urls')),
+    path('static/<str:name>', views.serve_asset),
     path('', views.serve_frontend),
 ]
\ No newline at end of file
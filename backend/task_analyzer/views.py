@@ -1,13 +1,60 @@
-import os
-from django.http import HttpResponse, FileResponse
 from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 
+from .assets import assets
+
+# Revalidate on every load - the asset URLs are not versioned, so a long
+# max-age would keep an old script.js after a deploy. Revalidation is a 304.
+DEFAULT_CACHE_CONTROL = 'no-cache'
+
+# Read and compress the frontend when the URLconf is imported, not on the first request
+assets.preload()
+
+def _not_modified(request, asset):
+    """True if If-None-Match names any variant's ETag - they all carry the same file version"""
+    header = request.headers.get('If-None-Match', '')
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/"..." matches too
+    tags = {tag[2:] if tag.startswith('W/') else tag for tag in (t.strip() for t in header.split(','))}
+    return '*' in tags or any(asset.etag_for(encoding) in tags for encoding in asset.variants)
+
+def _asset_response(request, asset):
+    encoding = asset.choose_encoding(request.headers.get('Accept-Encoding', ''))
+    
+    if _not_modified(request, asset):
+        response = HttpResponseNotModified()
+    else:
+        body = asset.variants[encoding]
+        response = HttpResponse(body, content_type=asset.content_type)
+        response['Content-Length'] = len(body)
+        response['Last-Modified'] = http_date(asset.mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    
+    response['ETag'] = asset.etag_for(encoding)
+    response['Cache-Control'] = getattr(settings, 'FRONTEND_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+@require_safe
+def serve_asset(request, name):
+    """Serve styles.css / script.js from the in-memory asset cache"""
+    if name == 'index.html':
+        raise Http404('Frontend asset not found')
+    try:
+        return _asset_response(request, assets.get(name))
+    except FileNotFoundError:
+        raise Http404('Frontend asset not found')
+
+@require_safe
 def serve_frontend(request):
     """Serve the frontend index.html file"""
-    frontend_path = os.path.join(settings.BASE_DIR, '../frontend/index.html')
     try:
-        with open(frontend_path, 'r', encoding='utf-8') as f:
-            return HttpResponse(f.read(), content_type='text/html')
+        return _asset_response(request, assets.get('index.html'))
     except FileNotFoundError:
         return HttpResponse("""
         <!DOCTYPE html>
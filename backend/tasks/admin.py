@@ -3,6 +3,6 @@ from .models import Task
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ['title', 'due_date', 'importance', 'estimated_hours', 'created_at']
+    list_display = ['title', 'due_date', 'importance', 'estimated_hours', 'score_smart', 'created_at']
     list_filter = ['due_date', 'importance', 'created_at']
     search_fields = ['title']
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply TASK_SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'TASK_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+    
+    def ready(self):
+        connection_created.connect(configure_sqlite, dispatch_uid='tasks.configure_sqlite')
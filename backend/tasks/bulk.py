@@ -0,0 +1,174 @@
+"""
+Bulk import and export of stored tasks as CSV or NDJSON.
+
+Imports read the file one row at a time, validate it with the same rules
+as /api/tasks/analyze/ plus the model's own limits, and write each chunk of
+valid rows with one bulk_create in its own transaction. Rows with an id that
+is already stored update that task, so an export can be re-imported. Blocker
+counts, and the scores of the imported tasks and of tasks whose counts moved,
+are recomputed once after the last chunk (see store.rescore_imported).
+"""
+import codecs
+import csv
+import uuid
+
+from django.db import transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from . import store
+from .models import Task
+from .renderers import dumps
+from .streaming import NDJSONError, iter_ndjson
+from .validation import MAX_REPORTED_ERRORS, validate_task
+
+FORMATS = ('csv', 'ndjson')
+
+# Columns written by export and read by import; CSV dependencies are ';'-separated ids
+FIELDS = ('id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies')
+
+DEFAULT_BATCH_SIZE = 2000
+
+_UPDATE_FIELDS = ['title', 'due_date', 'estimated_hours', 'importance', 'dependencies']
+_TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+# PositiveIntegerField's portable upper bound (SQLite itself reports none, but other backends enforce it)
+_INTEGER_MAX = BaseDatabaseOperations.integer_field_ranges['PositiveIntegerField'][1]
+
+def format_for_filename(filename):
+    """'csv' or 'ndjson' from a file extension, None if it is neither"""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return None
+
+def _number(value):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value  # validate_task reports it
+
+def iter_csv(lines):
+    """Yield (line_number, task) pairs from CSV text lines with a header row"""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        task = {}
+        for field in ('id', 'title', 'due_date'):
+            if row.get(field):
+                task[field] = row[field]
+        for field in ('estimated_hours', 'importance'):
+            if row.get(field):
+                task[field] = _number(row[field])
+        task['dependencies'] = [d.strip() for d in (row.get('dependencies') or '').split(';') if d.strip()]
+        yield reader.line_num, task
+
+def iter_rows(stream, file_format):
+    """(line_number, task) pairs from a binary stream in either format"""
+    if file_format == 'csv':
+        return iter_csv(codecs.iterdecode(stream, 'utf-8-sig'))
+    return iter_ndjson(stream)
+
+def _validate_row(index, task, parsed_dates):
+    """validate_task plus the limits of the Task model"""
+    errors = validate_task(index, task, parsed_dates)
+    if errors:
+        return errors
+    
+    if len(task['title']) > _TITLE_MAX_LENGTH:
+        errors.append({'index': index, 'field': 'title', 'message': f'must be at most {_TITLE_MAX_LENGTH} characters'})
+    for field in ('estimated_hours', 'importance'):
+        if task[field] % 1:  # Also true for inf, whose remainder is nan
+            errors.append({'index': index, 'field': field, 'message': 'must be a whole number'})
+        elif task[field] > _INTEGER_MAX:
+            errors.append({'index': index, 'field': field, 'message': f'must be at most {_INTEGER_MAX}'})
+    if 'id' in task:
+        try:
+            uuid.UUID(str(task['id']))
+        except ValueError:
+            errors.append({'index': index, 'field': 'id', 'message': 'must be a UUID'})
+    return errors
+
+def _write_batch(batch):
+    # Keep the last row per id; one INSERT ... ON CONFLICT cannot touch a row twice
+    by_id = {task.id: task for task in batch}
+    with transaction.atomic():
+        Task.objects.bulk_create(
+            by_id.values(), update_conflicts=True, unique_fields=['id'], update_fields=_UPDATE_FIELDS
+        )
+    return by_id.keys()
+
+def import_tasks(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Store (line_number, task) rows in batches and rescore what they touched once.
+    Invalid rows are skipped and reported; a malformed NDJSON line or an
+    undecodable file stops the import, keeping the batches already written.
+    Those batches are rescored even if a later one fails to write.
+    """
+    imported = invalid = 0
+    imported_ids = set()
+    errors = []
+    parsed_dates = {}
+    batch = []
+    index = 0
+    
+    try:
+        try:
+            for line_number, task in rows:
+                row_errors = _validate_row(index, task, parsed_dates)
+                index += 1
+                if row_errors:
+                    invalid += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.extend(dict(error, line=line_number) for error in row_errors)
+                    continue
+                
+                batch.append(Task(
+                    id=uuid.UUID(str(task['id'])) if 'id' in task else uuid.uuid4(),
+                    title=task['title'],
+                    due_date=task['due_date'],
+                    estimated_hours=int(task['estimated_hours']),
+                    importance=int(task['importance']),
+                    dependencies=task.get('dependencies') or [],
+                ))
+                if len(batch) >= batch_size:
+                    written = _write_batch(batch)
+                    imported += len(written)
+                    imported_ids.update(written)
+                    batch = []
+        except NDJSONError as e:
+            errors.append({'index': None, 'field': None, 'message': e.message, 'line': e.line_number})
+        except (UnicodeDecodeError, csv.Error) as e:
+            errors.append({'index': None, 'field': None, 'message': f'File cannot be read past row {index} ({e})'})
+        
+        if batch:
+            written = _write_batch(batch)
+            imported += len(written)
+            imported_ids.update(written)
+    finally:
+        # Committed batches must not keep stale scores, whatever stopped the import
+        if imported_ids:
+            store.rescore_imported(imported_ids)
+    
+    return {'imported': imported, 'invalid': invalid, 'errors': errors[:MAX_REPORTED_ERRORS]}
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer in a generator"""
+    def write(self, value):
+        return value
+
+def export_lines(file_format, chunk_size=DEFAULT_BATCH_SIZE):
+    """Yield every stored task as CSV or NDJSON without loading the table into memory"""
+    rows = Task.objects.order_by('created_at', 'id').values_list(*FIELDS).iterator(chunk_size=chunk_size)
+    
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(FIELDS)
+        for task_id, title, due_date, hours, importance, dependencies in rows:
+            yield writer.writerow((task_id, title, due_date.isoformat(), hours, importance, ';'.join(dependencies)))
+        return
+    
+    for row in rows:
+        yield dumps(dict(zip(FIELDS, row))) + b'\n'
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .records import MultiScoredTask, ScoredTask
+
+# Payloads above this many tasks are scored every time rather than cached
+DEFAULT_MAX_TASKS = 20000
+
+class CacheStats:
+    """Process-local hit/miss counters for the analysis cache"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+    
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+    
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+stats = CacheStats()
+
+def get_analysis_cache(tasks=None):
+    """
+    The configured cache backend, or None when result caching is disabled
+    (or, given a payload, when it is too large to be worth caching)
+    """
+    alias = getattr(settings, 'TASK_ANALYSIS_CACHE', None)
+    if not alias:
+        return None
+    if tasks is not None and len(tasks) > getattr(settings, 'TASK_ANALYSIS_CACHE_MAX_TASKS', DEFAULT_MAX_TASKS):
+        return None
+    return caches[alias]
+
+def compact(data, tasks):
+    """
+    The cache entry for an analyze response: its ranking (task positions and
+    scores) and small top-level fields, without the task dicts. A request
+    can only hit the entry with the same tasks, so expand() rebuilds the
+    records from that request's payload.
+    """
+    position_of = {id(task): i for i, task in enumerate(tasks)}
+    records = data['tasks']
+    entry = {key: value for key, value in data.items() if key != 'tasks'}
+    entry['positions'] = [position_of[id(record.task)] for record in records]
+    if 'strategies_used' in data:
+        entry['scores'] = [record.score_values for record in records]
+    else:
+        entry['scores'] = [record.priority_score for record in records]
+    return entry
+
+def expand(entry, tasks):
+    """The response data for a cache entry from compact()"""
+    if 'strategies_used' in entry:
+        names = tuple(entry['strategies_used'])
+        records = [MultiScoredTask(tasks[i], names, scores) for i, scores in zip(entry['positions'], entry['scores'])]
+    else:
+        strategy = entry['strategy_used']
+        records = [ScoredTask(tasks[i], score, strategy) for i, score in zip(entry['positions'], entry['scores'])]
+    data = {'tasks': records}
+    data.update((key, value) for key, value in entry.items() if key not in ('positions', 'scores'))
+    return data
+
+def analysis_key(tasks, weights, **options):
+    """
+    Canonical hash of an analyze request.
+    
+    Covers the task list (independent of key order and whitespace), the
+    resolved weights, any other options that shape the response, and
+    today's date - urgency scores change when the date does.
+    """
+    digest = hashlib.sha256()
+    canonical = {
+        'date': timezone.now().date().isoformat(),
+        'weights': weights,
+        'options': options,
+    }
+    digest.update(json.dumps(canonical, sort_keys=True, cls=DjangoJSONEncoder).encode())
+    digest.update(json.dumps(tasks, sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder).encode())
+    return 'analysis:' + digest.hexdigest()
+
+def etag_for(key):
+    """Strong ETag for a cache key"""
+    return '"' + key.split(':', 1)[1] + '"'
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match already names this ETag"""
+    header = request.headers.get('If-None-Match', '')
+    # If-None-Match uses weak comparison, so W/"..." matches too
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
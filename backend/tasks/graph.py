@@ -0,0 +1,152 @@
+import heapq
+
+class DependencyCycleError(ValueError):
+    """Raised when tasks cannot be ordered because their dependencies form a cycle"""
+    def __init__(self, cycles):
+        super().__init__('Dependencies contain a cycle')
+        self.cycles = cycles
+
+class TaskGraph:
+    """
+    Dependency graph over a batch of tasks, built once per request.
+    
+    Nodes are task positions in the input list. A task listing another as a
+    dependency gets an edge from that dependency to itself, so every edge
+    points from a blocker to the task it blocks. All traversals are
+    iterative, so 100k-node chains do not hit the recursion limit.
+    """
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.ids = ids = [str(task['id']) if 'id' in task else f'#{i}' for i, task in enumerate(tasks)]
+        # First position of each id: later duplicates are written first and overwritten
+        self.position = position = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+        
+        self.successors = successors = [[] for _ in tasks]
+        self.in_degree = in_degree = [0] * len(tasks)
+        self.dangling = {}  # task id -> dependency ids that match no task in the batch
+        
+        for i, task in enumerate(tasks):
+            dependencies = task.get('dependencies')
+            if not dependencies:
+                continue
+            # dict.fromkeys drops repeats while keeping the listed order
+            for dependency_id in dict.fromkeys(d for d in dependencies if isinstance(d, str)):
+                blocker = position.get(dependency_id)
+                if blocker is None:
+                    self.dangling.setdefault(ids[i], []).append(dependency_id)
+                    continue
+                successors[blocker].append(i)
+                in_degree[i] += 1
+    
+    def strongly_connected_components(self):
+        """Tarjan's algorithm, iterative, O(nodes + edges)"""
+        size = len(self.tasks)
+        index_of = [-1] * size
+        low = [0] * size
+        on_stack = [False] * size
+        stack = []
+        components = []
+        counter = 0
+        
+        for root in range(size):
+            if index_of[root] != -1:
+                continue
+            
+            index_of[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]  # (node, next successor to visit) - replaces the call stack
+            
+            while work:
+                node, next_edge = work[-1]
+                successors = self.successors[node]
+                
+                if next_edge < len(successors):
+                    work[-1] = (node, next_edge + 1)
+                    successor = successors[next_edge]
+                    if index_of[successor] == -1:
+                        index_of[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, 0))
+                    elif on_stack[successor]:
+                        low[node] = min(low[node], index_of[successor])
+                    continue
+                
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                
+                if low[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        
+        return components
+    
+    def cycles(self):
+        """Groups of task ids that depend on each other, directly or transitively"""
+        cycles = []
+        for component in self.strongly_connected_components():
+            node = component[0]
+            if len(component) > 1 or node in self.successors[node]:
+                cycles.append(sorted(self.ids[member] for member in component))
+        return cycles
+    
+    def topological_order(self, scores):
+        """
+        Positions ordered so every task comes after its dependencies.
+        Among the tasks that are ready at each step the highest score goes
+        first, with ties kept in input order.
+        """
+        in_degree = list(self.in_degree)
+        ready = [(-scores[i], i) for i in range(len(self.tasks)) if in_degree[i] == 0]
+        heapq.heapify(ready)
+        order = []
+        
+        while ready:
+            _, node = heapq.heappop(ready)
+            order.append(node)
+            for successor in self.successors[node]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    heapq.heappush(ready, (-scores[successor], successor))
+        
+        if len(order) < len(self.tasks):
+            raise DependencyCycleError(self.cycles())
+        return order
+    
+    def critical_path(self):
+        """Longest chain of dependent tasks by estimated_hours, as (hours, task ids)"""
+        size = len(self.tasks)
+        if not size:
+            return 0, []
+        
+        order = self.topological_order([0] * size)
+        hours = [task.get('estimated_hours', 0) for task in self.tasks]
+        finish = list(hours)  # Longest path ending at each node, including its own hours
+        previous = [None] * size
+        
+        for node in order:
+            for successor in self.successors[node]:
+                candidate = finish[node] + hours[successor]
+                if candidate > finish[successor]:
+                    finish[successor] = candidate
+                    previous[successor] = node
+        
+        end = node = max(range(size), key=finish.__getitem__)
+        path = []
+        while node is not None:
+            path.append(self.ids[node])
+            node = previous[node]
+        
+        path.reverse()
+        return finish[end], path
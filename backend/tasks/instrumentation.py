@@ -0,0 +1,206 @@
+"""
+Per-request timing spans, Server-Timing headers and rolling latency histograms.
+
+Code marks a stage with `with span('validate'):`. While a request is being
+timed, the span adds its duration to that request's totals, which the
+middleware reports in a Server-Timing header and records in process-wide
+histograms (served by the metrics view). When TASK_INSTRUMENTATION is off,
+no request is ever timed and span() returns a shared no-op context manager
+after a single ContextVar lookup.
+
+Sampled cProfile captures (TASK_PROFILE_SAMPLE_RATE, TASK_PROFILE_DIR) run
+only for synchronous requests - one profiler cannot tell interleaved
+coroutines apart.
+"""
+import bisect
+import contextlib
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+DEFAULT_WINDOW = 1000
+
+_spans = ContextVar('task_timing_spans', default=None)
+_NO_SPAN = contextlib.nullcontext()
+
+def enabled():
+    return getattr(settings, 'TASK_INSTRUMENTATION', False)
+
+class _Span:
+    __slots__ = ('spans', 'name', 'start')
+    
+    def __init__(self, spans, name):
+        self.spans = spans
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+    
+    def __exit__(self, *exc_info):
+        # Repeated stages (e.g. combine once per strategy) add up
+        self.spans[self.name] = self.spans.get(self.name, 0.0) + time.perf_counter() - self.start
+
+def span(name):
+    """Time a stage of the current request; a no-op outside a timed request"""
+    spans = _spans.get()
+    if spans is None:
+        return _NO_SPAN
+    return _Span(spans, name)
+
+class RollingHistogram:
+    """The last `window` durations of one stage, summarised on read"""
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.total_count = 0
+    
+    def add(self, duration_ms):
+        self.samples.append(duration_ms)
+        self.total_count += 1
+    
+    def summary(self):
+        ordered = sorted(self.samples)
+        buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for duration_ms in ordered:
+            buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        
+        def percentile(fraction):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+        
+        return {
+            'count': self.total_count,
+            'window': len(ordered),
+            'p50_ms': percentile(0.5),
+            'p90_ms': percentile(0.9),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(ordered[-1], 3),
+            'buckets': {
+                **{f'le_{bound}': count for bound, count in zip(BUCKET_BOUNDS_MS, buckets)},
+                'inf': buckets[-1],
+            },
+        }
+
+class Metrics:
+    """Rolling histograms keyed by view name and stage, shared by every request in this process"""
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def record(self, view_name, spans):
+        window = getattr(settings, 'TASK_METRICS_WINDOW', DEFAULT_WINDOW)
+        with self._lock:
+            stages = self._histograms.setdefault(view_name, {})
+            for stage, seconds in spans.items():
+                histogram = stages.get(stage)
+                if histogram is None:
+                    histogram = stages[stage] = RollingHistogram(window)
+                histogram.add(seconds * 1000)
+    
+    def as_dict(self):
+        with self._lock:
+            return {
+                view_name: {stage: histogram.summary() for stage, histogram in stages.items()}
+                for view_name, stages in self._histograms.items()
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+metrics = Metrics()
+
+def server_timing(spans):
+    """Server-Timing header value, durations in milliseconds"""
+    return ', '.join(f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in spans.items())
+
+class ServerTimingMiddleware:
+    """
+    Times each request when TASK_INSTRUMENTATION is on.
+    Stages recorded with span() appear in the Server-Timing header next to
+    'render' (DRF response rendering) and 'total'.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not enabled():
+            return self.get_response(request)
+        
+        spans = {}
+        token = _spans.set(spans)
+        start = time.perf_counter()
+        try:
+            profiler = self._sampled_profiler()
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+                    self._save_profile(profiler, request)
+        finally:
+            _spans.reset(token)
+        return self._finish(request, response, spans, start)
+    
+    async def __acall__(self, request):
+        if not enabled():
+            return await self.get_response(request)
+        
+        spans = {}
+        token = _spans.set(spans)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _spans.reset(token)
+        return self._finish(request, response, spans, start)
+    
+    def process_template_response(self, request, response):
+        """DRF responses render after the view returns - time that with a post-render callback"""
+        spans = _spans.get()
+        if spans is not None:
+            started = time.perf_counter()
+            
+            def rendered(response):
+                spans['render'] = spans.get('render', 0.0) + time.perf_counter() - started
+            
+            response.add_post_render_callback(rendered)
+        return response
+    
+    def _finish(self, request, response, spans, start):
+        spans['total'] = time.perf_counter() - start
+        response['Server-Timing'] = server_timing(spans)
+        match = getattr(request, 'resolver_match', None)
+        metrics.record(match.view_name if match else 'unresolved', spans)
+        return response
+    
+    def _sampled_profiler(self):
+        rate = getattr(settings, 'TASK_PROFILE_SAMPLE_RATE', 0.0)
+        if rate <= 0 or not getattr(settings, 'TASK_PROFILE_DIR', None) or random.random() >= rate:
+            return None
+        return cProfile.Profile()
+    
+    def _save_profile(self, profiler, request):
+        directory = settings.TASK_PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        slug = request.path.strip('/').replace('/', '-') or 'root'
+        profiler.dump_stats(os.path.join(directory, f'{time.time_ns()}-{slug}.prof'))
@@ -0,0 +1,139 @@
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from benchmarks.common import DUE_DATE_DISTRIBUTIONS, make_backlog
+from tasks import renderers
+from tasks.scoring import DependencyIndex, TaskScorer, np
+from tasks.validation import validate_tasks
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+def _time(func, repeat, setup=None):
+    """Wall-clock seconds of each run; setup() runs untimed before each one and its result is passed in"""
+    timings = []
+    for _ in range(repeat):
+        arguments = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*arguments)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+class Command(BaseCommand):
+    help = 'Time scoring, validation, JSON and the /api/tasks/analyze/ round trip on synthetic backlogs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--dependency-density', type=float, default=0.3, help='Share of tasks with dependencies')
+        parser.add_argument('--due-dates', choices=DUE_DATE_DISTRIBUTIONS, default='uniform')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Earlier --output file to report ratios against')
+    
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = {(r['size'], r['name']): r for r in json.load(f)['results']}
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'Cannot read {options["compare"]}: {e}')
+        
+        results = []
+        for size in options['sizes']:
+            tasks = make_backlog(
+                size,
+                dependency_density=options['dependency_density'],
+                due_dates=options['due_dates'],
+                seed=options['seed'],
+            )
+            for name, timings in self.run_suite(tasks, options['repeat']):
+                results.append({
+                    'size': size,
+                    'name': name,
+                    'best': min(timings),
+                    'median': statistics.median(timings),
+                    'per_task_us': min(timings) / size * 1e6,
+                })
+        
+        self.print_table(results, baseline)
+        
+        report = {
+            'created': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'options': {
+                key: options[key] for key in ('sizes', 'repeat', 'dependency_density', 'due_dates', 'seed')
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} timings to {options["output"]}'))
+    
+    def run_suite(self, tasks, repeat):
+        """(name, timings) for each measured stage, on one backlog"""
+        payload = json.dumps(tasks).encode()
+        validated = copy.deepcopy(tasks)
+        validate_tasks(validated)  # The scoring stages see parsed dates, as they do in the view
+        scorer = TaskScorer()
+        
+        def total_scores():
+            dependency_index = DependencyIndex(validated, track_dependents=False)
+            for task in validated:
+                scorer.calculate_total_score(task, validated, dependency_index)
+        
+        yield 'calculate_total_score', _time(total_scores, repeat)
+        yield 'score_tasks', _time(lambda: scorer.score_tasks(validated), repeat)
+        if np is not None:
+            yield 'score_batch', _time(lambda: scorer.score_batch(validated), repeat)
+        yield 'rank_tasks', _time(lambda: scorer.rank_tasks(validated), repeat)
+        yield 'validate_tasks', _time(validate_tasks, repeat, setup=lambda: json.loads(payload))
+        yield 'json_parse', _time(lambda: renderers.loads(payload), repeat)
+        
+        client = Client(SERVER_NAME='localhost')
+        with override_settings(TASK_ANALYSIS_CACHE=None):
+            response = client.post('/api/tasks/analyze/', data=payload, content_type='application/json')
+            if response.status_code != 200:
+                raise CommandError(f'/api/tasks/analyze/ returned {response.status_code}: {response.content[:200]!r}')
+            # response.data is what the view handed to the renderer, ScoredTask records included
+            yield 'json_render', _time(lambda: renderers.FastJSONRenderer().render(response.data), repeat)
+            yield 'analyze_round_trip', _time(
+                lambda: client.post('/api/tasks/analyze/', data=payload, content_type='application/json'), repeat
+            )
+    
+    def print_table(self, results, baseline):
+        header = f'{"size":>8}  {"stage":<22}  {"best (s)":>9}  {"median (s)":>10}  {"us/task":>8}'
+        if baseline:
+            header += f'  {"vs. baseline":>12}'
+        self.stdout.write(header)
+        
+        for result in results:
+            line = (
+                f'{result["size"]:>8}  {result["name"]:<22}  {result["best"]:9.4f}  '
+                f'{result["median"]:10.4f}  {result["per_task_us"]:8.2f}'
+            )
+            previous = baseline.get((result['size'], result['name'])) if baseline else None
+            if previous:
+                line += f'  {result["best"] / previous["best"]:11.2f}x'
+            self.stdout.write(line)
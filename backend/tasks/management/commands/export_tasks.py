@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks import bulk
+
+class Command(BaseCommand):
+    help = 'Write every stored task as CSV or NDJSON, reading the table in chunks'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=bulk.FORMATS, default='csv')
+        parser.add_argument('--output', help='File to write (default standard output)')
+    
+    def handle(self, *args, **options):
+        chunk_size = getattr(settings, 'TASK_IMPORT_BATCH_SIZE', bulk.DEFAULT_BATCH_SIZE)
+        lines = bulk.export_lines(options['format'], chunk_size)
+        
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line if isinstance(line, str) else line.decode(), ending='')
+            return
+        
+        count = -1 if options['format'] == 'csv' else 0  # Don't count the CSV header
+        if options['format'] == 'csv':
+            f = open(options['output'], 'w', newline='')  # Lines already end in \r\n
+        else:
+            f = open(options['output'], 'wb')
+        with f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Exported {count} tasks to {options["output"]}'))
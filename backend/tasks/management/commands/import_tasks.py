@@ -0,0 +1,40 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import bulk
+
+class Command(BaseCommand):
+    help = 'Bulk-load stored tasks from a CSV or NDJSON file, updating tasks whose id already exists'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import; '-' reads standard input")
+        parser.add_argument('--format', choices=bulk.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default TASK_IMPORT_BATCH_SIZE)')
+    
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (bulk.format_for_filename(path) if path != '-' else None)
+        if file_format is None:
+            raise CommandError('Cannot tell the file format from its name; pass --format csv|ndjson')
+        batch_size = options['batch_size'] or getattr(settings, 'TASK_IMPORT_BATCH_SIZE', bulk.DEFAULT_BATCH_SIZE)
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+        
+        try:
+            if path == '-':
+                result = bulk.import_tasks(bulk.iter_rows(sys.stdin.buffer, file_format), batch_size)
+            else:
+                with open(path, 'rb') as f:
+                    result = bulk.import_tasks(bulk.iter_rows(f, file_format), batch_size)
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        
+        for error in result['errors']:
+            location = f'Line {error["line"]}:' if 'line' in error else 'Error:'
+            field = f' {error["field"]}' if error['field'] else ''
+            self.stderr.write(f'{location}{field} {error["message"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["imported"]} tasks, skipped {result["invalid"]} invalid rows'
+        ))
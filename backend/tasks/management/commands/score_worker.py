@@ -0,0 +1,32 @@
+from multiprocessing.connection import Listener
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import sharding
+
+class Command(BaseCommand):
+    help = 'Run a shard worker for map/reduce scoring (list its address in TASK_SHARD_WORKERS)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default='127.0.0.1:7100', help='host:port to listen on')
+    
+    def handle(self, *args, **options):
+        try:
+            key = sharding.authkey()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        
+        try:
+            listener = Listener(sharding.parse_address(options['bind']), authkey=key)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot listen on {options["bind"]}: {e}')
+        
+        host, port = listener.address
+        self.stdout.write(self.style.SUCCESS(f'Shard worker listening on {host}:{port}'))
+        try:
+            sharding.serve(listener)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
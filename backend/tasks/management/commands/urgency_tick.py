@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tasks import store
+
+class Command(BaseCommand):
+    help = 'Refresh the date-dependent urgency scores of stored tasks (run daily, e.g. from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every score from scratch instead')
+    
+    def handle(self, *args, **options):
+        if options['full']:
+            count = store.rescore_all()
+            self.stdout.write(self.style.SUCCESS(f'Rescored {count} tasks'))
+        else:
+            count = store.urgency_tick()
+            self.stdout.write(self.style.SUCCESS(f'Updated urgency for {count} tasks'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:32
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('due_date', models.DateField()),
+                ('estimated_hours', models.PositiveIntegerField()),
+                ('importance', models.PositiveIntegerField()),
+                ('dependencies', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('urgency_score', models.FloatField(default=0)),
+                ('importance_score', models.FloatField(default=0)),
+                ('effort_score', models.FloatField(default=0)),
+                ('dependency_score', models.FloatField(default=0)),
+                ('score_smart', models.FloatField(default=0)),
+                ('score_fastest', models.FloatField(default=0)),
+                ('score_impact', models.FloatField(default=0)),
+                ('score_deadline', models.FloatField(default=0)),
+                ('scored_on', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['due_date'], name='task_due_date_idx'), models.Index(fields=['-score_smart', 'due_date'], name='task_score_smart_idx'), models.Index(fields=['-score_fastest', 'due_date'], name='task_score_fastest_idx'), models.Index(fields=['-score_impact', 'due_date'], name='task_score_impact_idx'), models.Index(fields=['-score_deadline', 'due_date'], name='task_score_deadline_idx')],
+            },
+        ),
+    ]
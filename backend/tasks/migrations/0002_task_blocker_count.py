@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='blocker_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_blocker_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['scored_on'], name='task_scored_on_idx'),
+        ),
+    ]
@@ -10,5 +10,27 @@ class Task(models.Model):
     dependencies = models.JSONField(default=list)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Materialized scoring, kept current by tasks.store
+    blocker_count = models.PositiveIntegerField(default=0)  # Stored tasks listing this one as a dependency
+    urgency_score = models.FloatField(default=0)
+    importance_score = models.FloatField(default=0)
+    effort_score = models.FloatField(default=0)
+    dependency_score = models.FloatField(default=0)
+    score_smart = models.FloatField(default=0)
+    score_fastest = models.FloatField(default=0)
+    score_impact = models.FloatField(default=0)
+    score_deadline = models.FloatField(default=0)
+    scored_on = models.DateField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+            models.Index(fields=['scored_on'], name='task_scored_on_idx'),  # Staleness check before reads
+            models.Index(fields=['-score_smart', 'due_date'], name='task_score_smart_idx'),
+            models.Index(fields=['-score_fastest', 'due_date'], name='task_score_fastest_idx'),
+            models.Index(fields=['-score_impact', 'due_date'], name='task_score_impact_idx'),
+            models.Index(fields=['-score_deadline', 'due_date'], name='task_score_deadline_idx'),
+        ]
+    
     def __str__(self):
         return self.title
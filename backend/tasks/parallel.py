@@ -0,0 +1,99 @@
+"""
+Opt-in multi-process scoring for very large batches.
+
+The parent builds the reverse-dependency index once and turns it into a
+dependency score per task, so each chunk carries only its own slice of that
+data instead of the whole index. Workers score and sort their chunk; the
+parent k-way merges the sorted chunks. Below TASK_SCORING_PARALLEL_THRESHOLD
+tasks the serial path is faster and is always used.
+"""
+import atexit
+import heapq
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from .scoring import DependencyIndex, TaskScorer, current_urgency_table
+
+DEFAULT_PARALLEL_THRESHOLD = 200000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def parallel_threshold():
+    return getattr(settings, 'TASK_SCORING_PARALLEL_THRESHOLD', DEFAULT_PARALLEL_THRESHOLD)
+
+def worker_count():
+    return getattr(settings, 'TASK_SCORING_WORKERS', None) or os.cpu_count() or 1
+
+def should_parallelize(size):
+    """True when a batch is large enough for the pool to beat a single core"""
+    return worker_count() > 1 and size >= parallel_threshold()
+
+def get_pool():
+    """Persistent process pool shared by every request in this process"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count())
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+atexit.register(shutdown_pool)
+
+def rank_in_pool(scorer, tasks, chunks=None):
+    """Same result as TaskScorer.rank_tasks, computed across the process pool"""
+    if not tasks:
+        return []
+    
+    dependency_index = DependencyIndex(tasks, track_dependents=False)
+    today = timezone.now().date()
+    chunks = chunks or worker_count() * 4
+    chunk_size = -(-len(tasks) // chunks)
+    
+    futures = []
+    pool = get_pool()
+    for start in range(0, len(tasks), chunk_size):
+        rows = [
+            (
+                task['due_date'],
+                task['estimated_hours'],
+                task['importance'],
+                scorer.calculate_dependency_score(
+                    task.get('dependencies', []), tasks, task.get('id', 'temp_id'), dependency_index
+                ),
+            )
+            for task in tasks[start:start + chunk_size]
+        ]
+        futures.append(pool.submit(_rank_chunk, scorer.weights, today, start, rows))
+    
+    # Each chunk is sorted by (-score, position), so a k-way merge gives the global order
+    merged = heapq.merge(*(future.result() for future in futures))
+    return [(-negative_score, position) for negative_score, position in merged]
+
+def _rank_chunk(weights, today, start, rows):
+    """Worker: score one chunk and return it sorted as (-score, position) pairs"""
+    scorer = TaskScorer(weights)
+    urgency_of = current_urgency_table(today)
+    ranked = []
+    
+    for offset, (due_date, estimated_hours, importance, dependency_score) in enumerate(rows):
+        components = {
+            'urgency': urgency_of(due_date),
+            'importance': importance / 10.0,
+            'effort': scorer.calculate_effort_score(estimated_hours),
+            'dependencies': dependency_score,
+        }
+        ranked.append((-scorer.combine(components), start + offset))
+    
+    ranked.sort()
+    return ranked
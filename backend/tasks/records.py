@@ -0,0 +1,81 @@
+from collections.abc import Mapping
+
+class ScoredTask(Mapping):
+    """
+    A ranked task in an analyze response.
+    
+    Holds a reference to the submitted task dict instead of copying it. The
+    renderer's JSON encoder turns any Mapping into a dict, so the merged
+    task + score dict only exists while its own JSON is being written.
+    """
+    __slots__ = ('task', 'priority_score', 'strategy_used')
+    _extra_keys = ('priority_score', 'strategy_used')
+    
+    def __init__(self, task, priority_score, strategy_used):
+        self.task = task
+        self.priority_score = priority_score
+        self.strategy_used = strategy_used
+    
+    def __getitem__(self, key):
+        if key in self._extra_keys:
+            return getattr(self, key)
+        return self.task[key]
+    
+    def __iter__(self):
+        for key in self.task:
+            if key not in self._extra_keys:
+                yield key
+        yield from self._extra_keys
+    
+    def __len__(self):
+        return len(self.task) + sum(1 for key in self._extra_keys if key not in self.task)
+    
+    def as_dict(self):
+        """Same as dict(self), without going through the Mapping protocol key by key"""
+        if 'priority_score' in self.task or 'strategy_used' in self.task:
+            return dict(self)  # Keep the score keys last, as iteration does
+        merged = self.task.copy()
+        merged['priority_score'] = self.priority_score
+        merged['strategy_used'] = self.strategy_used
+        return merged
+    
+    def __repr__(self):
+        return f'ScoredTask({dict(self)!r})'
+
+class MultiScoredTask(Mapping):
+    """A task in a multi-strategy response - its scores share one tuple of strategy names"""
+    __slots__ = ('task', 'strategies', 'score_values')
+    
+    def __init__(self, task, strategies, score_values):
+        self.task = task
+        self.strategies = strategies
+        self.score_values = score_values
+    
+    @property
+    def scores(self):
+        return dict(zip(self.strategies, self.score_values))
+    
+    def __getitem__(self, key):
+        if key == 'scores':
+            return self.scores
+        return self.task[key]
+    
+    def __iter__(self):
+        for key in self.task:
+            if key != 'scores':
+                yield key
+        yield 'scores'
+    
+    def __len__(self):
+        return len(self.task) + ('scores' not in self.task)
+    
+    def as_dict(self):
+        """Same as dict(self), without going through the Mapping protocol key by key"""
+        if 'scores' in self.task:
+            return dict(self)
+        merged = self.task.copy()
+        merged['scores'] = self.scores
+        return merged
+    
+    def __repr__(self):
+        return f'MultiScoredTask({dict(self)!r})'
@@ -0,0 +1,68 @@
+"""
+JSON parser and renderer for the tasks API.
+
+orjson is used when it is installed and stdlib json otherwise; both produce
+the same document as DRF's JSONRenderer for API data. Dates, datetimes and
+UUIDs are encoded natively by orjson. Ranked records (ScoredTask) are handed
+to the encoder one at a time through `default`, so the response is never
+copied into a second list of dicts first.
+"""
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .records import MultiScoredTask, ScoredTask
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - stdlib json is used instead
+    orjson = None
+
+class _Encoder(JSONEncoder):
+    """DRF's encoder with a fast path for ranked records"""
+    def default(self, obj):
+        if isinstance(obj, (ScoredTask, MultiScoredTask)):
+            return obj.as_dict()
+        # Other Mappings, Decimal, timedelta, lazy strings... exactly as DRF converts them
+        return super().default(obj)
+
+# orjson's `default` hook - only called for types orjson does not encode itself
+_default = _Encoder().default
+
+def dumps(data):
+    """Encode API data to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        # OPT_UTC_Z writes UTC datetimes with a Z suffix, as DRF does
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return FastJSONRenderer().render(data)
+
+def loads(data):
+    """Decode JSON bytes or str; raises ValueError on malformed input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it is installed"""
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed"""
+    encoder_class = _Encoder
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only indents by 2; keep DRF's output for ?indent= style requests
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
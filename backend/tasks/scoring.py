@@ -1,6 +1,86 @@
+import heapq
+import math
+from collections import deque
 from datetime import date
 from django.utils import timezone
 
+from .instrumentation import span
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - score_batch falls back to the scalar path
+    np = None
+
+# Payloads at least this large are scored with the vectorized score_batch path
+BATCH_SCORING_THRESHOLD = 1000
+
+COMPONENTS = ('urgency', 'importance', 'effort', 'dependencies')
+
+# Memo tables stop adding keys past this size; validated backlogs stay far below it
+MEMO_LIMIT = 100000
+
+def top_positions(scores, limit):
+    """
+    Positions of the best `limit` scores, best first, in O(n log limit).
+    Ties stay in input order like every other ranking, so the result is the head of the full sort.
+    """
+    return heapq.nsmallest(limit, range(len(scores)), key=lambda i: (-scores[i], i))
+
+class DependencyIndex:
+    """Reverse-dependency lookup built once per batch of tasks"""
+    def __init__(self, tasks=(), track_dependents=True):
+        self.blocker_counts = {}  # task id -> number of tasks that list it as a dependency
+        self.dependents = {}  # task id -> ids of the tasks that list it as a dependency
+        self.track_dependents = track_dependents
+        self._downstream_counts = {}
+        
+        for task in tasks:
+            if task.get('dependencies'):  # Most tasks list none - skip the call
+                self.add(task)
+    
+    @classmethod
+    def from_blocker_counts(cls, blocker_counts):
+        """Index over already-known blocker counts, e.g. ones materialized in the database"""
+        index = cls(track_dependents=False)
+        index.blocker_counts = dict(blocker_counts)
+        return index
+    
+    def add(self, task):
+        """Record the dependencies of one more task"""
+        dependencies = task.get('dependencies', [])
+        if not dependencies or not isinstance(dependencies, (list, tuple)):
+            return
+        
+        task_id = str(task.get('id', 'temp_id'))
+        # A task listing the same dependency twice still only blocks on it once
+        for dependency_id in set(d for d in dependencies if isinstance(d, str)):
+            self.blocker_counts[dependency_id] = self.blocker_counts.get(dependency_id, 0) + 1
+            if self.track_dependents:
+                self.dependents.setdefault(dependency_id, []).append(task_id)
+        self._downstream_counts.clear()
+    
+    def blocking_count(self, task_id):
+        """Number of tasks that directly depend on the given task"""
+        return self.blocker_counts.get(str(task_id), 0)
+    
+    def downstream_count(self, task_id):
+        """Number of distinct tasks that directly or transitively depend on the given task"""
+        task_id = str(task_id)
+        if task_id in self._downstream_counts:
+            return self._downstream_counts[task_id]
+        
+        # Iterative BFS so long dependency chains cannot hit the recursion limit
+        seen = {task_id}
+        queue = deque([task_id])
+        while queue:
+            for dependent_id in self.dependents.get(queue.popleft(), ()):
+                if dependent_id not in seen:
+                    seen.add(dependent_id)
+                    queue.append(dependent_id)
+        
+        self._downstream_counts[task_id] = len(seen) - 1
+        return len(seen) - 1
+
 class TaskScorer:
     def __init__(self, weights=None):
         self.weights = weights or {
@@ -12,13 +92,11 @@ class TaskScorer:
     
     def calculate_urgency_score(self, due_date):
         """Calculate urgency based on due date proximity"""
-        today = timezone.now().date()
-        
-        if isinstance(due_date, str):
-            due_date = date.fromisoformat(due_date)
-            
-        days_until_due = (due_date - today).days
-        
+        return current_urgency_table()(due_date)
+    
+    @staticmethod
+    def urgency_for_days(days_until_due):
+        """Urgency for a task due in the given number of days (negative = overdue)"""
         if days_until_due < 0:
             return 1.0  # Past due - highest urgency
         elif days_until_due == 0:
@@ -33,7 +111,17 @@ class TaskScorer:
             return max(0.1, 10.0 / days_until_due)  # Decreasing urgency
     
     def calculate_effort_score(self, estimated_hours):
-        """Lower effort = higher score (quick wins)"""
+        """Lower effort = higher score (quick wins), memoized by hours"""
+        effort = _effort_by_hours.get(estimated_hours)
+        if effort is None:
+            effort = self.effort_for_hours(estimated_hours)
+            if len(_effort_by_hours) < MEMO_LIMIT:
+                _effort_by_hours[estimated_hours] = effort
+        return effort
+    
+    @staticmethod
+    def effort_for_hours(estimated_hours):
+        """Effort score computed from scratch"""
         if estimated_hours <= 1:
             return 1.0  # Quick win
         elif estimated_hours <= 4:
@@ -43,11 +131,16 @@ class TaskScorer:
         else:
             return max(0.1, 8.0 / estimated_hours)  # Large task
     
-    def calculate_dependency_score(self, dependencies, all_tasks, current_task_id):
+    def calculate_dependency_score(self, dependencies, all_tasks, current_task_id, dependency_index=None):
         """Tasks with more dependencies on them get higher scores"""
         if not dependencies:
             return 0.5  # Neutral score for no dependencies
         
+        if dependency_index is not None:
+            # Precomputed once per batch - avoids rescanning every task
+            blocking_count = dependency_index.blocking_count(current_task_id)
+            return min(1.0, blocking_count * 0.3)
+        
         # Count how many tasks depend on this task
         blocking_count = 0
         current_task_id_str = str(current_task_id)
@@ -60,37 +153,252 @@ class TaskScorer:
         # Normalize to 0-1 scale
         return min(1.0, blocking_count * 0.3)
     
-    def calculate_total_score(self, task, all_tasks):
-        """Calculate overall priority score"""
+    def calculate_components(self, task, all_tasks, dependency_index=None, urgency_table=None):
+        """
+        Calculate the four unweighted component scores for a task.
+        Batch callers pass one UrgencyTable so "today" is read once per batch.
+        """
         # Convert string date to date object if needed
         due_date = task['due_date']
         
-        urgency_score = self.calculate_urgency_score(due_date)
-        importance_score = task['importance'] / 10.0  # Normalize to 0-1 scale
-        effort_score = self.calculate_effort_score(task['estimated_hours'])
-        
         # Use task ID for dependency calculation
         task_id = task.get('id', 'temp_id')
-        dependency_score = self.calculate_dependency_score(
-            task.get('dependencies', []), all_tasks, task_id
-        )
         
-        # Calculate weighted total score
+        return {
+            'urgency': (urgency_table or current_urgency_table())(due_date),
+            'importance': task['importance'] / 10.0,  # Normalize to 0-1 scale
+            'effort': self.calculate_effort_score(task['estimated_hours']),
+            'dependencies': self.calculate_dependency_score(
+                task.get('dependencies', []), all_tasks, task_id, dependency_index
+            ),
+        }
+    
+    def combine(self, components):
+        """Apply this scorer's weights to precomputed component scores"""
         total_score = (
-            urgency_score * self.weights['urgency'] +
-            importance_score * self.weights['importance'] +
-            effort_score * self.weights['effort'] +
-            dependency_score * self.weights['dependencies']
+            components['urgency'] * self.weights['urgency'] +
+            components['importance'] * self.weights['importance'] +
+            components['effort'] * self.weights['effort'] +
+            components['dependencies'] * self.weights['dependencies']
         )
         
         return round(total_score, 2)
+    
+    def calculate_total_score(self, task, all_tasks, dependency_index=None, urgency_table=None):
+        """Calculate overall priority score"""
+        return self.combine(self.calculate_components(task, all_tasks, dependency_index, urgency_table))
+    
+    def score_tasks(self, tasks):
+        """Score a batch of tasks in O(n + edges), returning scores in input order"""
+        dependency_index = DependencyIndex(tasks, track_dependents=False)
+        urgency_table = current_urgency_table()
+        return [self.calculate_total_score(task, tasks, dependency_index, urgency_table) for task in tasks]
+    
+    def score_batch(self, tasks):
+        """Vectorized equivalent of score_tasks - same scores, in input order"""
+        if np is None or not tasks:
+            return self.score_tasks(tasks)
+        
+        return self.combine_columns(self._component_arrays(tasks))
+    
+    def rank_tasks(self, tasks, parallel=False, limit=None):
+        """
+        (score, position) pairs for tasks, best first with ties in input order.
+        limit=k returns only the best k, found with a bounded heap (see top_positions).
+        parallel=True scores large batches on the shard workers in TASK_SHARD_WORKERS
+        (see tasks.sharding) or else in the worker process pool (see tasks.parallel).
+        """
+        if parallel:
+            from .parallel import rank_in_pool, should_parallelize
+            from .sharding import rank_sharded, should_shard
+            ranked = None
+            if should_shard(len(tasks)):
+                ranked = rank_sharded(self, tasks)  # None if the workers are unreachable
+            if ranked is None and should_parallelize(len(tasks)):
+                ranked = rank_in_pool(self, tasks)
+            if ranked is not None:
+                if limit is None:
+                    return ranked
+                scores = [0] * len(tasks)
+                for score, i in ranked:
+                    scores[i] = score
+                with span('sort'):
+                    return [(scores[i], i) for i in top_positions(scores, limit)]
+        
+        scores = self.combine_columns(self.component_columns(tasks))
+        with span('sort'):
+            if limit is not None:
+                return [(scores[i], i) for i in top_positions(scores, limit)]
+            return [(scores[i], i) for i in sorted(range(len(scores)), key=scores.__getitem__, reverse=True)]
+    
+    def component_columns(self, tasks):
+        """Unweighted component scores for a batch, one column per component in input order"""
+        with span('components'):
+            if np is not None and len(tasks) >= BATCH_SCORING_THRESHOLD:
+                return self._component_arrays(tasks)
+            
+            # Struct-of-arrays: one flat list per component rather than a dict per task
+            dependency_index = DependencyIndex(tasks, track_dependents=False)
+            urgency_of = current_urgency_table()
+            urgency, importance, effort, dependencies = [], [], [], []
+            for task in tasks:
+                urgency.append(urgency_of(task['due_date']))
+                importance.append(task['importance'] / 10.0)
+                effort.append(self.calculate_effort_score(task['estimated_hours']))
+                dependencies.append(self.calculate_dependency_score(
+                    task.get('dependencies', []), tasks, task.get('id', 'temp_id'), dependency_index
+                ))
+            return {'urgency': urgency, 'importance': importance, 'effort': effort, 'dependencies': dependencies}
+    
+    def combine_columns(self, columns):
+        """Weighted, rounded totals for columns from component_columns - only the weights differ per strategy"""
+        with span('combine'):
+            if np is not None and isinstance(columns['urgency'], np.ndarray):
+                total_scores = (
+                    columns['urgency'] * self.weights['urgency'] +
+                    columns['importance'] * self.weights['importance'] +
+                    columns['effort'] * self.weights['effort'] +
+                    columns['dependencies'] * self.weights['dependencies']
+                )
+                # Python's round() rather than np.round so ties round exactly like the scalar path
+                return [round(score, 2) for score in total_scores.tolist()]
+            
+            # Same summation order as combine()
+            w_urgency, w_importance, w_effort, w_dependencies = (self.weights[c] for c in COMPONENTS)
+            return [
+                round(urgency * w_urgency + importance * w_importance + effort * w_effort + dependency * w_dependencies, 2)
+                for urgency, importance, effort, dependency in zip(*(columns[c] for c in COMPONENTS))
+            ]
+    
+    def _component_arrays(self, tasks):
+        """NumPy implementation of component_columns"""
+        today = timezone.now().date()
+        dependency_index = DependencyIndex(tasks, track_dependents=False)
+        size = len(tasks)
+        
+        # Load the fields into columnar arrays once
+        days = np.empty(size, dtype=np.int64)
+        hours = np.empty(size, dtype=np.float64)
+        importance = np.empty(size, dtype=np.float64)
+        blocking = np.zeros(size, dtype=np.float64)
+        has_dependencies = np.zeros(size, dtype=bool)
+        parsed_dates = {}
+        
+        for i, task in enumerate(tasks):
+            due_date = task['due_date']
+            if isinstance(due_date, str):
+                # Backlogs share due dates heavily, so parse each distinct string once
+                parsed = parsed_dates.get(due_date)
+                if parsed is None:
+                    parsed = parsed_dates[due_date] = date.fromisoformat(due_date)
+                due_date = parsed
+            
+            days[i] = (due_date - today).days
+            hours[i] = task['estimated_hours']
+            importance[i] = task['importance']
+            if task.get('dependencies', []):
+                has_dependencies[i] = True
+                blocking[i] = dependency_index.blocking_count(task.get('id', 'temp_id'))
+        
+        # Same piecewise functions as calculate_urgency_score / calculate_effort_score
+        return {
+            'urgency': np.select(
+                [days < 0, days == 0, days <= 1, days <= 3, days <= 7],
+                [1.0, 0.9, 0.8, 0.6, 0.4],
+                np.maximum(0.1, 10.0 / np.maximum(days, 1)),
+            ),
+            'importance': importance / 10.0,
+            'effort': np.select(
+                [hours <= 1, hours <= 4, hours <= 8],
+                [1.0, 0.7, 0.4],
+                np.maximum(0.1, 8.0 / np.maximum(hours, 1)),
+            ),
+            'dependencies': np.where(has_dependencies, np.minimum(1.0, blocking * 0.3), 0.5),
+        }
+
+class UrgencyTable:
+    """
+    Urgency by due date for one day. Backlogs cluster on a few due dates, so
+    each distinct date (or date string) is worked out once; the table is only
+    valid for `today` and current_urgency_table() replaces it when the date changes.
+    """
+    __slots__ = ('today', '_by_date')
+    
+    def __init__(self, today):
+        self.today = today
+        self._by_date = {}
+    
+    def __call__(self, due_date):
+        urgency = self._by_date.get(due_date)
+        if urgency is None:
+            key = due_date
+            if isinstance(due_date, str):
+                due_date = date.fromisoformat(due_date)
+            urgency = TaskScorer.urgency_for_days((due_date - self.today).days)
+            if len(self._by_date) < MEMO_LIMIT:
+                self._by_date[key] = urgency
+        return urgency
+
+_urgency_table = None
+_effort_by_hours = {}  # Effort does not depend on the date, so this table is never rebuilt
+
+def current_urgency_table(today=None):
+    """The shared UrgencyTable for today (or the given date), rebuilt when the date changes"""
+    global _urgency_table
+    if today is None:
+        today = timezone.now().date()
+    table = _urgency_table
+    if table is None or table.today != today:
+        # A request racing the rollover may build its own table; either one is correct
+        table = _urgency_table = UrgencyTable(today)
+    return table
+
+STRATEGY_WEIGHTS = {
+    'smart': {'urgency': 0.4, 'importance': 0.3, 'effort': 0.2, 'dependencies': 0.1},
+    'fastest': {'urgency': 0.2, 'importance': 0.2, 'effort': 0.5, 'dependencies': 0.1},
+    'impact': {'urgency': 0.2, 'importance': 0.6, 'effort': 0.1, 'dependencies': 0.1},
+    'deadline': {'urgency': 0.7, 'importance': 0.2, 'effort': 0.05, 'dependencies': 0.05},
+}
 
 def get_weights_for_strategy(strategy):
     """Get weight configuration for different sorting strategies"""
-    strategies = {
-        'smart': {'urgency': 0.4, 'importance': 0.3, 'effort': 0.2, 'dependencies': 0.1},
-        'fastest': {'urgency': 0.2, 'importance': 0.2, 'effort': 0.5, 'dependencies': 0.1},
-        'impact': {'urgency': 0.2, 'importance': 0.6, 'effort': 0.1, 'dependencies': 0.1},
-        'deadline': {'urgency': 0.7, 'importance': 0.2, 'effort': 0.05, 'dependencies': 0.05},
-    }
-    return strategies.get(strategy, strategies['smart'])
\ No newline at end of file
+    return dict(STRATEGY_WEIGHTS.get(strategy, STRATEGY_WEIGHTS['smart']))
+
+def parse_custom_weights(strategy):
+    """
+    Weights for a custom strategy written as custom:<urgency>:<importance>:<effort>:<dependencies>
+    e.g. custom:0.5:0.3:0.1:0.1
+    """
+    values = strategy.split(':')[1:]
+    if len(values) != len(COMPONENTS):
+        raise ValueError(f'Custom strategy "{strategy}" needs {len(COMPONENTS)} weights: custom:urgency:importance:effort:dependencies')
+    try:
+        weights = [float(value) for value in values]
+    except ValueError:
+        raise ValueError(f'Custom strategy "{strategy}" has a non-numeric weight')
+    if not all(math.isfinite(weight) for weight in weights):
+        raise ValueError(f'Custom strategy "{strategy}" has a weight that is not a finite number')
+    if any(weight < 0 for weight in weights) or not any(weights):
+        raise ValueError(f'Custom strategy "{strategy}" needs non-negative weights that are not all zero')
+    return dict(zip(COMPONENTS, weights))
+
+def resolve_strategies(requested):
+    """
+    Turn requested strategy names into (name, weights) pairs.
+    Accepts named strategies, 'all' for every named strategy, and custom weight vectors;
+    names may also be comma-separated. Unknown names fall back to smart weights.
+    """
+    names = []
+    for entry in requested or ['smart']:
+        for name in entry.split(','):
+            name = name.strip()
+            if name == 'all':
+                names.extend(STRATEGY_WEIGHTS)
+            elif name:
+                names.append(name)
+    
+    resolved = {}
+    for name in names or ['smart']:
+        if name not in resolved:
+            resolved[name] = parse_custom_weights(name) if name.startswith('custom:') else get_weights_for_strategy(name)
+    return list(resolved.items())
@@ -4,5 +4,28 @@ from .models import Task
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ['id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies', 'created_at',
+            'urgency_score', 'importance_score', 'effort_score', 'dependency_score',
+            'score_smart', 'score_fastest', 'score_impact', 'score_deadline', 'scored_on',
+        ]
+        read_only_fields = [
+            'id', 'created_at',
+            'urgency_score', 'importance_score', 'effort_score', 'dependency_score',
+            'score_smart', 'score_fastest', 'score_impact', 'score_deadline', 'scored_on',
+        ]
+    
+    def validate_importance(self, value):
+        if not (1 <= value <= 10):
+            raise serializers.ValidationError('Must be between 1-10')
+        return value
+    
+    def validate_estimated_hours(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Must be positive')
+        return value
+    
+    def validate_dependencies(self, value):
+        if not isinstance(value, list) or not all(isinstance(d, str) for d in value):
+            raise serializers.ValidationError('Must be a list of task ids')
+        return value
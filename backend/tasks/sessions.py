@@ -0,0 +1,315 @@
+"""
+Session-scoped analysis state for incremental re-ranking.
+
+A client uploads its backlog once and gets a session id back; after that it
+sends only add/update/remove deltas. Each session keeps validated tasks,
+blocker counts, component scores and one sorted ranking per strategy, so a
+delta rescores only the tasks it touches (the edited tasks plus the tasks
+whose blocker counts moved) and the response is a ranking patch rather than
+the whole list.
+
+Rankings order tasks exactly as /api/tasks/analyze/ would for the session's
+current backlog: by score, highest first, ties in upload order (updated tasks
+keep their place, added tasks go last).
+
+Sessions live in this process's memory, in an LRU bounded by
+TASK_SESSION_LIMIT and expired after TASK_SESSION_IDLE_SECONDS without use.
+"""
+import bisect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .records import MultiScoredTask
+from .scoring import COMPONENTS, TaskScorer, current_urgency_table
+from .validation import MAX_REPORTED_ERRORS, validate_task, validate_tasks
+
+DEFAULT_SESSION_LIMIT = 64
+DEFAULT_IDLE_SECONDS = 60 * 60
+
+class DeltaError(ValueError):
+    """Raised when a delta or upload cannot be applied; nothing has been changed"""
+    def __init__(self, errors):
+        super().__init__(errors[0]['message'])
+        self.errors = errors
+
+def _error(index, field, message, section=None):
+    error = {'index': index, 'field': field, 'message': message}
+    if section is not None:
+        error['section'] = section
+    return error
+
+def _dependency_ids(task):
+    """Distinct string dependencies - what DependencyIndex counts"""
+    dependencies = task.get('dependencies', [])
+    if not dependencies or not isinstance(dependencies, (list, tuple)):
+        return set()
+    return set(d for d in dependencies if isinstance(d, str))
+
+def _task_id(task):
+    task_id = task.get('id')
+    if task_id is None or task_id == '' or isinstance(task_id, (bool, dict, list)):
+        return None
+    return str(task_id)
+
+class AnalysisSession:
+    """Scored, indexed state of one uploaded backlog"""
+    def __init__(self, strategies):
+        self.id = uuid.uuid4().hex
+        self.strategies = [name for name, _ in strategies]
+        self.scorers = [TaskScorer(weights) for _, weights in strategies]
+        self.version = 0
+        self.today = None
+        self.tasks = {}  # task id -> validated task dict, in upload order
+        self.arrival = {}  # task id -> tie-break position
+        self.blocker_counts = {}
+        self.scores = {}  # task id -> tuple of scores, one per strategy
+        self.rankings = [[] for _ in strategies]  # sorted (-score, arrival, id) per strategy
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self._next_arrival = 0
+    
+    def load(self, tasks):
+        """Validate and score a whole backlog; raises DeltaError"""
+        errors = validate_tasks(tasks)
+        if not errors:
+            errors = self._check_ids(tasks)
+        if errors:
+            raise DeltaError(errors)
+        
+        for task in tasks:
+            self._insert(_task_id(task), task, set())
+        self._rescore_all()
+    
+    def apply(self, add=None, update=None, remove=None):
+        """
+        Apply one delta and return the ranking patch; raises DeltaError.
+        `update` entries carry an id and only the fields that change.
+        """
+        removed, updated, added = self._validate_delta(
+            [] if add is None else add, [] if update is None else update, [] if remove is None else remove
+        )
+        
+        touched = set()
+        for task_id in removed:
+            self._count_dependencies(self.tasks.pop(task_id), -1, touched)
+        for task_id, task in updated.items():
+            self._count_dependencies(self.tasks[task_id], -1, touched)
+            self.tasks[task_id] = task
+            self._count_dependencies(task, 1, touched)
+        for task_id, task in added.items():
+            self._insert(task_id, task, touched)
+        
+        self.version += 1
+        today = timezone.now().date()
+        if today != self.today:
+            # Every urgency moved with the date - rescore everything and resend the rankings
+            for task_id in removed:
+                del self.arrival[task_id]
+            self._rescore_all()
+            return self.full_data()
+        
+        changed = set(updated) | set(added) | {task_id for task_id in touched if task_id in self.tasks}
+        before = {task_id: self.scores.pop(task_id, None) for task_id in changed | removed}
+        for task_id in changed:
+            self.scores[task_id] = self._score(task_id)
+        
+        moved = {task_id for task_id in changed if self.scores[task_id] != before[task_id]}
+        rankings = {}
+        for s, strategy in enumerate(self.strategies):
+            ranking = self.rankings[s]
+            for task_id in moved | removed:
+                if before[task_id] is not None:
+                    del ranking[bisect.bisect_left(ranking, (-before[task_id][s], self.arrival[task_id]))]
+            for task_id in moved:
+                bisect.insort(ranking, (-self.scores[task_id][s], self.arrival[task_id], task_id))
+            
+            rankings[strategy] = {
+                # Drop these ids, then insert the others at their final indexes in ascending order
+                'remove': sorted(task_id for task_id in moved | removed if before[task_id] is not None),
+                'insert': sorted(
+                    [bisect.bisect_left(ranking, (-self.scores[task_id][s], self.arrival[task_id])), task_id]
+                    for task_id in moved
+                ),
+            }
+        
+        for task_id in removed:
+            del self.arrival[task_id]
+        
+        # Edited tasks are resent even when their scores held, so the client sees the new fields
+        resent = moved | set(updated) | set(added)
+        return {
+            'session_id': self.id,
+            'version': self.version,
+            'full': False,
+            'tasks': [self._record(task_id) for task_id in sorted(resent, key=self.arrival.__getitem__)],
+            'removed': sorted(removed),
+            'rankings': rankings,
+            'strategies_used': self.strategies,
+            'total_tasks': len(self.tasks),
+        }
+    
+    def full_data(self):
+        """The whole session: every task with its scores and every ranking as ids, best first"""
+        return {
+            'session_id': self.id,
+            'version': self.version,
+            'full': True,
+            'tasks': [self._record(task_id) for task_id in self.tasks],
+            'rankings': {
+                strategy: [task_id for _, _, task_id in ranking]
+                for strategy, ranking in zip(self.strategies, self.rankings)
+            },
+            'strategies_used': self.strategies,
+            'total_tasks': len(self.tasks),
+        }
+    
+    def _validate_delta(self, add, update, remove):
+        """(removed ids, {id: merged task}, {id: new task}) - nothing is modified until all of it checks out"""
+        errors = []
+        for section, entries in (('add', add), ('update', update), ('remove', remove)):
+            if not isinstance(entries, list):
+                errors.append(_error(None, section, 'must be a list', section))
+        if errors:
+            raise DeltaError(errors)
+        
+        removed = set()
+        for index, task_id in enumerate(remove):
+            if not isinstance(task_id, (str, int)) or isinstance(task_id, bool) or str(task_id) not in self.tasks:
+                errors.append(_error(index, 'id', 'is not a task in this session', 'remove'))
+            else:
+                removed.add(str(task_id))
+        
+        updated = {}
+        parsed_dates = {}
+        for index, changes in enumerate(update):
+            task_id = _task_id(changes) if isinstance(changes, dict) else None
+            if task_id is None or task_id not in self.tasks or task_id in removed or task_id in updated:
+                errors.append(_error(index, 'id', 'must name a task in this session, once', 'update'))
+                continue
+            task = dict(self.tasks[task_id])
+            task.update(changes)
+            task['id'] = self.tasks[task_id]['id']
+            task_errors = validate_task(index, task, parsed_dates)
+            errors.extend(dict(error, section='update') for error in task_errors)
+            updated[task_id] = task
+        
+        added = {}
+        for index, task in enumerate(add):
+            task_errors = validate_task(index, task, parsed_dates)
+            errors.extend(dict(error, section='add') for error in task_errors)
+            if task_errors:
+                continue
+            task_id = _task_id(task)
+            if task_id is None:
+                errors.append(_error(index, 'id', 'is required', 'add'))
+            elif task_id in added or task_id in self.tasks:
+                errors.append(_error(index, 'id', 'is already used by another task', 'add'))
+            else:
+                added[task_id] = task
+        
+        if errors:
+            raise DeltaError(errors[:MAX_REPORTED_ERRORS])
+        return removed, updated, added
+    
+    def _check_ids(self, tasks):
+        """Deltas address tasks by id, so every uploaded task needs a distinct one"""
+        errors = []
+        taken = set()
+        for index, task in enumerate(tasks):
+            task_id = _task_id(task)
+            if task_id is None:
+                errors.append(_error(index, 'id', 'is required'))
+            elif task_id in taken:
+                errors.append(_error(index, 'id', 'is already used by another task'))
+            else:
+                taken.add(task_id)
+        return errors[:MAX_REPORTED_ERRORS]
+    
+    def _insert(self, task_id, task, touched):
+        self.tasks[task_id] = task
+        self.arrival[task_id] = self._next_arrival
+        self._next_arrival += 1
+        self._count_dependencies(task, 1, touched)
+    
+    def _count_dependencies(self, task, step, touched):
+        for dependency_id in _dependency_ids(task):
+            self.blocker_counts[dependency_id] = self.blocker_counts.get(dependency_id, 0) + step
+            touched.add(dependency_id)
+    
+    def _rescore_all(self):
+        """Component columns once, then each strategy's scores and sorted ranking"""
+        self.today = timezone.now().date()
+        tasks = list(self.tasks.values())
+        columns = TaskScorer().component_columns(tasks)
+        score_lists = [scorer.combine_columns(columns) for scorer in self.scorers]
+        
+        self.scores = dict(zip(self.tasks, zip(*score_lists)))
+        for s, scores in enumerate(score_lists):
+            self.rankings[s] = sorted(
+                (-score, self.arrival[task_id], task_id) for task_id, score in zip(self.tasks, scores)
+            )
+    
+    def _score(self, task_id):
+        """One task's score per strategy - the same arithmetic as component_columns + combine_columns"""
+        task = self.tasks[task_id]
+        scorer = self.scorers[0]
+        if task.get('dependencies', []):
+            dependency_score = min(1.0, self.blocker_counts.get(task_id, 0) * 0.3)
+        else:
+            dependency_score = 0.5
+        components = dict(zip(COMPONENTS, (
+            current_urgency_table(self.today)(task['due_date']),
+            task['importance'] / 10.0,
+            scorer.calculate_effort_score(task['estimated_hours']),
+            dependency_score,
+        )))
+        return tuple(scorer.combine(components) for scorer in self.scorers)
+    
+    def _record(self, task_id):
+        return MultiScoredTask(self.tasks[task_id], self.strategies, self.scores[task_id])
+
+class SessionStore:
+    """Process-local LRU of analysis sessions"""
+    def __init__(self):
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add(self, session):
+        limit = getattr(settings, 'TASK_SESSION_LIMIT', DEFAULT_SESSION_LIMIT)
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > limit:
+                self._sessions.popitem(last=False)
+    
+    def get(self, session_id):
+        """The session, marked most recently used, or None if unknown or expired"""
+        idle_seconds = getattr(settings, 'TASK_SESSION_IDLE_SECONDS', DEFAULT_IDLE_SECONDS)
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_used > idle_seconds:
+                del self._sessions[session_id]
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+    
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+    
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+    
+    def __len__(self):
+        return len(self._sessions)
+
+sessions = SessionStore()
@@ -0,0 +1,261 @@
+"""
+Map/reduce scoring across worker processes reached over sockets.
+
+Dependency scores need blocker counts from the whole backlog, so shards
+cannot simply be ranked on their own. Scoring runs in two stateless rounds:
+
+- map: a worker scores the urgency, importance and effort parts of its shard
+  and counts the dependencies its tasks list (a partial reverse index);
+- the coordinator sums the partial counts;
+- reduce: a worker receives its shard's partial scores again with the merged
+  blocker counts of the tasks that have dependencies, finishes the scores and
+  returns the shard sorted as (-score, position) pairs;
+- the coordinator k-way merges the sorted shards.
+
+The partial score is summed in the same order as TaskScorer.combine and the
+dependency term is added last, so results equal single-process scoring
+exactly. There are more shards than workers and each worker is sent the next
+shard as soon as it answers, so a slower or busier worker simply takes fewer.
+
+Workers run `manage.py score_worker --bind host:port` (TASK_SHARD_WORKERS
+lists their addresses) or start_local_workers() for a single machine.
+"""
+import heapq
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import Client, Listener, wait
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .parallel import parallel_threshold
+from .scoring import TaskScorer, current_urgency_table
+
+logger = logging.getLogger(__name__)
+
+SHARDS_PER_WORKER = 4
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+def authkey():
+    """
+    Shared secret for coordinator/worker connections. Connections exchange
+    pickles, so anyone holding the key can run code on the other end: there
+    is no fallback, and workers and coordinators refuse to start without one.
+    """
+    key = getattr(settings, 'TASK_SHARD_AUTHKEY', None)
+    if not key:
+        raise ImproperlyConfigured('TASK_SHARD_AUTHKEY must be set to a private secret to use shard workers')
+    return key.encode() if isinstance(key, str) else key
+
+def parse_address(address):
+    """'host:port' -> (host, port)"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+def shard_rows(tasks):
+    """The fields a map step needs, as compact tuples"""
+    return [
+        (task['due_date'], task['estimated_hours'], task['importance'], task.get('dependencies', []), task.get('id', 'temp_id'))
+        for task in tasks
+    ]
+
+def map_shard(weights, today, rows):
+    """
+    Worker: (partial scores, ids of tasks with dependencies, partial blocker counts).
+    Partial scores leave out the dependency term; the ids list marks which
+    tasks need a merged blocker count, in shard order.
+    """
+    scorer = TaskScorer(weights)
+    urgency_of = current_urgency_table(today)
+    w_urgency, w_importance, w_effort = weights['urgency'], weights['importance'], weights['effort']
+    partial_scores = []
+    dependent_ids = []  # (offset, id) of tasks with dependencies
+    counts = {}
+    
+    for offset, (due_date, estimated_hours, importance, dependencies, task_id) in enumerate(rows):
+        # Same summation order as TaskScorer.combine, minus the final dependency term
+        partial_scores.append(
+            urgency_of(due_date) * w_urgency +
+            (importance / 10.0) * w_importance +
+            scorer.calculate_effort_score(estimated_hours) * w_effort
+        )
+        if dependencies:
+            dependent_ids.append((offset, str(task_id)))
+            if isinstance(dependencies, (list, tuple)):
+                # As DependencyIndex.add: each listed id counts once per task
+                for dependency_id in set(d for d in dependencies if isinstance(d, str)):
+                    counts[dependency_id] = counts.get(dependency_id, 0) + 1
+    
+    return partial_scores, dependent_ids, counts
+
+def reduce_shard(dependency_weight, start, partial_scores, dependent_counts):
+    """
+    Worker: finish a shard's scores and sort them as (-score, position) pairs.
+    dependent_counts maps shard offsets of tasks with dependencies to their blocker counts.
+    """
+    neutral = 0.5 * dependency_weight
+    ranked = []
+    for offset, partial in enumerate(partial_scores):
+        count = dependent_counts.get(offset)
+        if count is None:
+            score = round(partial + neutral, 2)
+        else:
+            score = round(partial + min(1.0, count * 0.3) * dependency_weight, 2)
+        ranked.append((-score, start + offset))
+    ranked.sort()
+    return ranked
+
+_OPERATIONS = {'map': map_shard, 'reduce': reduce_shard}
+
+class ShardError(RuntimeError):
+    """A worker could not process a shard"""
+
+def _answer(connection):
+    """Run each (operation, arguments) message from one coordinator until it disconnects"""
+    with connection:
+        try:
+            while True:
+                operation, arguments = connection.recv()
+                try:
+                    connection.send(('ok', _OPERATIONS[operation](*arguments)))
+                except Exception as e:
+                    connection.send(('error', f'{operation} failed: {e!r}'))
+        except (EOFError, OSError):
+            pass  # Coordinator went away
+
+def serve(listener):
+    """Accept coordinators forever, one thread per connection (each web process keeps one open)"""
+    while True:
+        try:
+            connection = listener.accept()
+        except Exception:
+            logger.exception('Rejected a coordinator connection')
+            continue
+        threading.Thread(target=_answer, args=(connection,), daemon=True).start()
+
+def _local_worker(address, key, ready):
+    listener = Listener(address, authkey=key)
+    ready.send(listener.address)
+    ready.close()
+    serve(listener)
+
+def start_local_workers(count, host='127.0.0.1'):
+    """Start count worker processes on free local ports; returns (processes, addresses)"""
+    key = authkey()  # Read here - a spawned process would not see overridden settings
+    processes, addresses = [], []
+    for _ in range(count):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_local_worker, args=((host, 0), key, sender), daemon=True)
+        process.start()
+        host_name, port = receiver.recv()
+        processes.append(process)
+        addresses.append(f'{host_name}:{port}')
+    return processes, addresses
+
+class Coordinator:
+    """Connections to a set of workers, used by one ranking at a time"""
+    def __init__(self, addresses):
+        self.addresses = list(addresses)
+        key = authkey()
+        self.connections = [Client(parse_address(address), authkey=key) for address in self.addresses]
+        self.lock = threading.Lock()
+    
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+    
+    def run(self, jobs):
+        """Send (operation, arguments) jobs to whichever worker is free; results in job order"""
+        results = [None] * len(jobs)
+        pending = iter(enumerate(jobs))
+        assigned = {}
+        
+        def dispatch(connection):
+            job = next(pending, None)
+            if job is not None:
+                index, message = job
+                connection.send(message)
+                assigned[connection] = index
+        
+        for connection in self.connections:
+            dispatch(connection)
+        while assigned:
+            for connection in wait(list(assigned)):
+                outcome, result = connection.recv()
+                if outcome != 'ok':
+                    raise ShardError(result)
+                results[assigned.pop(connection)] = result
+                dispatch(connection)
+        return results
+    
+    def rank(self, scorer, tasks, shards=None):
+        """Same result as TaskScorer.rank_tasks without a limit"""
+        if not tasks:
+            return []
+        
+        weights = scorer.weights
+        today = timezone.now().date()
+        shards = shards or len(self.connections) * SHARDS_PER_WORKER
+        shard_size = -(-len(tasks) // shards)
+        starts = range(0, len(tasks), shard_size)
+        
+        with self.lock:
+            mapped = self.run([
+                ('map', (weights, today, shard_rows(tasks[start:start + shard_size]))) for start in starts
+            ])
+            
+            blocker_counts = {}
+            for _, _, counts in mapped:
+                for task_id, count in counts.items():
+                    blocker_counts[task_id] = blocker_counts.get(task_id, 0) + count
+            
+            reduced = self.run([
+                ('reduce', (
+                    weights['dependencies'], start, partial_scores,
+                    {offset: blocker_counts.get(task_id, 0) for offset, task_id in dependent_ids},
+                ))
+                for start, (partial_scores, dependent_ids, _) in zip(starts, mapped)
+            ])
+        
+        merged = heapq.merge(*reduced)
+        return [(-negative_score, position) for negative_score, position in merged]
+
+def should_shard(size):
+    """True when shard workers are configured and the batch is large enough to send them"""
+    return bool(getattr(settings, 'TASK_SHARD_WORKERS', None)) and size >= parallel_threshold()
+
+def get_coordinator():
+    """Coordinator for TASK_SHARD_WORKERS, connected on first use and shared by this process"""
+    global _coordinator
+    with _coordinator_lock:
+        addresses = list(getattr(settings, 'TASK_SHARD_WORKERS', None) or ())
+        if _coordinator is not None and _coordinator.addresses != addresses:
+            _coordinator.close()
+            _coordinator = None
+        if _coordinator is None:
+            _coordinator = Coordinator(addresses)
+        return _coordinator
+
+def reset_coordinator():
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is not None:
+            _coordinator.close()
+            _coordinator = None
+
+def rank_sharded(scorer, tasks):
+    """
+    Rank through the shard workers, or None if they cannot be reached -
+    the caller then scores in this process, which gives the same result.
+    A missing TASK_SHARD_AUTHKEY is a configuration error and is raised.
+    """
+    try:
+        return get_coordinator().rank(scorer, tasks)
+    except (OSError, EOFError, ShardError) as e:
+        logger.warning('Shard workers unavailable (%s); scoring in this process', e)
+        reset_coordinator()
+        return None
@@ -0,0 +1,300 @@
+"""
+What-if schedule simulation: work through a backlog in priority order and
+see what finishes late.
+
+One person works `daily_hours` a day, always on the best-scored task whose
+dependencies are done (dependencies outside the backlog count as done), and
+finishes each task before starting the next. A task's score is the score
+/api/tasks/analyze/ would give it on the simulated day the work starts, ties
+going to the earlier task in the payload. Only urgency depends on the date;
+the dependency score stays put because a task's dependents can never finish
+before it does, so its blocker count is the same in the remaining backlog.
+
+Rescoring every waiting task on every simulated day would be O(days * tasks).
+Instead ready tasks sit in one bucket per due date, and a bucket is re-keyed
+only when the day moves its urgency - never for overdue dates, nor for dates
+100 or more days out where urgency is flat. Inside a bucket, tasks are grouped
+by their other three components, so finding a bucket's best task touches
+only the few groups that can still tie after rounding.
+"""
+import bisect
+import gc
+import heapq
+import threading
+from datetime import date
+
+from django.utils import timezone
+
+from .graph import TaskGraph
+from .scoring import TaskScorer
+from .store import URGENCY_FLOOR_DAYS
+
+class ScheduleOverflowError(ValueError):
+    """Raised when a schedule would end after the last date Python can represent"""
+
+# Scores are rounded to 2 places, so a group more than this far below another
+# (before rounding) always ends up with a lower score
+_TIE_WINDOW = 0.011
+
+class _CollectorPause:
+    """
+    Pauses the cyclic garbage collector while any simulation runs. A run
+    allocates a result dict and a few heap entries per task but creates no
+    reference cycles, yet those allocations set off collections that walk
+    every object in the process - a third of a 50k-task run's time.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._resume = False
+    
+    def __enter__(self):
+        with self._lock:
+            if self._active == 0:
+                self._resume = gc.isenabled()
+                gc.disable()
+            self._active += 1
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._resume:
+                gc.enable()
+
+_collector_pause = _CollectorPause()
+
+def _as_list(column):
+    """component_columns gives lists or, for large batches, NumPy arrays"""
+    return column if isinstance(column, list) else column.tolist()
+
+class _Bucket:
+    """Ready tasks due on one date"""
+    __slots__ = ('offset', 'urgency', 'scores', 'ready', 'order', 'head', 'version')
+    
+    def __init__(self, offset):
+        self.offset = offset  # Due date as days after the start date
+        self.urgency = None
+        self.scores = None  # Profile scores at this urgency
+        self.ready = {}  # profile -> heap of ready task positions
+        self.order = []  # (-partial score, profile) of non-empty profiles, best first
+        self.head = None  # (-score, position) of the best ready task, as queued
+        self.version = 0
+
+class ScheduleSimulator:
+    """Event-driven scheduler for one strategy and daily capacity"""
+    def __init__(self, weights, daily_hours):
+        self.scorer = TaskScorer(weights)
+        self.daily_hours = daily_hours
+    
+    def simulate(self, tasks, start_date=None):
+        """
+        Simulate a validated backlog (due dates already date objects).
+        Returns the schedule in work order, the late tasks and anything a
+        dependency cycle keeps from ever starting. Every list names tasks by
+        TaskGraph id, so a task without an id is '#<position>' throughout.
+        Raises ScheduleOverflowError if the work runs past date.max.
+        """
+        with _collector_pause:
+            return self._simulate(tasks, start_date)
+    
+    def _simulate(self, tasks, start_date):
+        if start_date is None:
+            start_date = timezone.now().date()
+        weights = self.scorer.weights
+        w_urgency = weights['urgency']
+        graph = TaskGraph(tasks)
+        start = start_date.toordinal()
+        
+        # Tasks sharing importance, effort and dependency scores share a profile
+        columns = self.scorer.component_columns(tasks)
+        profiles = {}
+        profile_of = [
+            profiles.setdefault(components, len(profiles))
+            for components in zip(*(_as_list(columns[c]) for c in ('importance', 'effort', 'dependencies')))
+        ]
+        offset_of = [task['due_date'].toordinal() - start for task in tasks]
+        
+        profile_components = list(profiles)
+        partial_scores = [
+            importance * weights['importance'] + effort * weights['effort'] + dependency * weights['dependencies']
+            for importance, effort, dependency in profile_components
+        ]
+        scores_by_urgency = {}
+        
+        def scores_at(urgency):
+            """Score of every profile at one urgency level - urgency takes few distinct values"""
+            scores = scores_by_urgency.get(urgency)
+            if scores is None:
+                # Same summation order as TaskScorer.combine
+                scores = scores_by_urgency[urgency] = [
+                    round(
+                        urgency * w_urgency + importance * weights['importance'] +
+                        effort * weights['effort'] + dependency * weights['dependencies'], 2
+                    )
+                    for importance, effort, dependency in profile_components
+                ]
+            return scores
+        
+        def bucket_head(bucket):
+            """(-score, position) of the bucket's best ready task"""
+            best = None
+            scores = bucket.scores
+            ready = bucket.ready
+            floor = bucket.order[0][0] + _TIE_WINDOW
+            for negative_partial, profile in bucket.order:
+                if negative_partial > floor:
+                    break
+                key = (-scores[profile], ready[profile][0])
+                if best is None or key < best:
+                    best = key
+            return best
+        
+        queue = []  # (-score, position, bucket offset, version) - one live entry per non-empty bucket
+        
+        def requeue(bucket):
+            bucket.version += 1
+            bucket.head = bucket_head(bucket) if bucket.order else None
+            if bucket.head is not None:
+                heapq.heappush(queue, (*bucket.head, bucket.offset, bucket.version))
+        
+        offsets = sorted(set(offset_of))
+        buckets = {offset: _Bucket(offset) for offset in offsets}
+        urgency_for_days = self.scorer.urgency_for_days
+        for bucket in buckets.values():
+            bucket.urgency = urgency_for_days(bucket.offset)
+            bucket.scores = scores_at(bucket.urgency)
+        
+        def make_ready(position):
+            bucket = buckets[offset_of[position]]
+            profile = profile_of[position]
+            waiting = bucket.ready.get(profile)
+            if waiting is None:
+                waiting = bucket.ready[profile] = []
+                bisect.insort(bucket.order, (-partial_scores[profile], profile))
+            heapq.heappush(waiting, position)
+            # A new task either becomes the bucket's best or leaves it alone
+            key = (-bucket.scores[profile], position)
+            if bucket.head is None or key < bucket.head:
+                bucket.version += 1
+                bucket.head = key
+                heapq.heappush(queue, (*key, bucket.offset, bucket.version))
+        
+        def take(bucket, position):
+            profile = profile_of[position]
+            waiting = bucket.ready[profile]
+            heapq.heappop(waiting)
+            if not waiting:
+                del bucket.ready[profile]
+                bucket.order.remove((-partial_scores[profile], profile))
+            requeue(bucket)
+        
+        def advance(old_day, new_day):
+            """Re-key the buckets whose urgency differs between the two days"""
+            low = bisect.bisect_left(offsets, old_day)
+            high = bisect.bisect_left(offsets, new_day + URGENCY_FLOOR_DAYS)
+            for offset in offsets[low:high]:
+                bucket = buckets[offset]
+                urgency = urgency_for_days(offset - new_day)
+                if urgency != bucket.urgency:
+                    bucket.urgency = urgency
+                    bucket.scores = scores_at(urgency)
+                    if bucket.order:
+                        requeue(bucket)
+        
+        in_degree = list(graph.in_degree)
+        for position, degree in enumerate(in_degree):
+            if degree == 0:
+                make_ready(position)
+        
+        def overdue_heap():
+            """
+            Every ready task as (-score, position), for once all due dates have
+            passed: urgency is then 1.0 for good, so one heap replaces the buckets
+            """
+            scores = scores_at(urgency_for_days(-1))
+            heap = [
+                (-scores[profile], position)
+                for bucket in buckets.values() for profile, waiting in bucket.ready.items() for position in waiting
+            ]
+            heapq.heapify(heap)
+            return heap, scores
+        
+        daily_hours = self.daily_hours
+        successors = graph.successors
+        ids = graph.ids
+        pop = heapq.heappop
+        push = heapq.heappush
+        last_offset = offsets[-1] if offsets else 0
+        overdue = None  # The single heap, once every due date has passed
+        hours_worked = 0
+        day = 0
+        schedule = []
+        late = []
+        while True:
+            if overdue is None:
+                if not queue:
+                    break
+                negative_score, position, offset, version = pop(queue)
+                bucket = buckets[offset]
+                if version != bucket.version:
+                    continue
+                take(bucket, position)
+            else:
+                # Most of a long backlog is worked through here, long after its due dates
+                if not overdue:
+                    break
+                negative_score, position = pop(overdue)
+                offset = offset_of[position]
+            
+            task = tasks[position]
+            hours_worked += task['estimated_hours']
+            finish_day = int(-(-hours_worked // daily_hours)) - 1
+            days_late = finish_day - offset
+            try:
+                start_day, completion_day = date.fromordinal(start + day), date.fromordinal(start + finish_day)
+            except (OverflowError, ValueError):
+                raise ScheduleOverflowError(f'At {daily_hours} hours a day the schedule would end after {date.max}')
+            schedule.append({
+                'id': ids[position],
+                'title': task['title'],
+                'due_date': task['due_date'],
+                'estimated_hours': task['estimated_hours'],
+                'priority_score': -negative_score,
+                'start_date': start_day,
+                'completion_date': completion_day,
+                'days_late': max(days_late, 0),
+            })
+            if days_late > 0:
+                late.append(ids[position])
+            
+            next_day = int(hours_worked // daily_hours)
+            if next_day != day:
+                if overdue is None:
+                    if next_day > last_offset:
+                        overdue, overdue_scores = overdue_heap()
+                    else:
+                        advance(day, next_day)
+                day = next_day
+            for successor in successors[position]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    if overdue is None:
+                        make_ready(successor)
+                    else:
+                        push(overdue, (-overdue_scores[profile_of[successor]], successor))
+        
+        data = {
+            'schedule': schedule,
+            'late_tasks': late,
+            'late_count': len(late),
+            'start_date': start_date,
+            'finish_date': schedule[-1]['completion_date'] if schedule else None,
+            'daily_hours': daily_hours,
+            'total_tasks': len(tasks),
+            'dangling_dependencies': graph.dangling,
+        }
+        if len(schedule) < len(tasks):
+            # Tasks in a cycle, or downstream of one, never have all their dependencies done
+            data['unschedulable'] = [graph.ids[i] for i, degree in enumerate(in_degree) if degree > 0]
+            data['cycles'] = graph.cycles()
+        return data
@@ -0,0 +1,346 @@
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .scoring import STRATEGY_WEIGHTS, DependencyIndex, TaskScorer, current_urgency_table
+
+# Strategy name -> materialized score column on Task
+STRATEGY_SCORE_FIELDS = {strategy: f'score_{strategy}' for strategy in STRATEGY_WEIGHTS}
+
+COMPONENT_FIELDS = {
+    'urgency': 'urgency_score',
+    'importance': 'importance_score',
+    'effort': 'effort_score',
+    'dependencies': 'dependency_score',
+}
+
+SCORE_FIELDS = list(COMPONENT_FIELDS.values()) + list(STRATEGY_SCORE_FIELDS.values()) + ['scored_on']
+
+logger = logging.getLogger(__name__)
+
+_refresh_lock = threading.Lock()
+
+# Ids per UPDATE ... WHERE id IN (...), well under SQLite's bound-parameter limit
+UPDATE_BATCH_SIZE = 500
+
+# Beyond this many days out urgency bottoms out at 0.1 and stops changing day to day
+URGENCY_FLOOR_DAYS = 100
+
+def score_field_for_strategy(strategy):
+    """Materialized score column for a strategy, defaulting to smart"""
+    return STRATEGY_SCORE_FIELDS.get(strategy, STRATEGY_SCORE_FIELDS['smart'])
+
+def task_as_dict(task):
+    """Shape a stored Task like an /analyze/ payload entry for the scorer"""
+    return {
+        'id': str(task.id),
+        'title': task.title,
+        'due_date': task.due_date,
+        'estimated_hours': task.estimated_hours,
+        'importance': task.importance,
+        'dependencies': task.dependencies,
+    }
+
+def score_values(components, today):
+    """SCORE_FIELDS values for a task with the given component scores"""
+    values = {field: components[component] for component, field in COMPONENT_FIELDS.items()}
+    for strategy, field in STRATEGY_SCORE_FIELDS.items():
+        values[field] = TaskScorer(STRATEGY_WEIGHTS[strategy]).combine(components)
+    values['scored_on'] = today
+    return values
+
+def apply_scores(task, components, today):
+    """Copy component scores and per-strategy totals onto a Task instance"""
+    for field, value in score_values(components, today).items():
+        setattr(task, field, value)
+
+def stored_components(task):
+    """Component scores as last materialized on a Task"""
+    return {component: getattr(task, field) for component, field in COMPONENT_FIELDS.items()}
+
+@transaction.atomic
+def rescore_all():
+    """Recompute blocker counts and scores of every stored task from scratch"""
+    tasks = list(Task.objects.all())
+    task_dicts = [task_as_dict(task) for task in tasks]
+    dependency_index = DependencyIndex(task_dicts, track_dependents=False)
+    scorer = TaskScorer()
+    today = timezone.now().date()
+    urgency_table = current_urgency_table(today)
+    
+    for task, task_dict in zip(tasks, task_dicts):
+        task.blocker_count = dependency_index.blocking_count(task.id)
+        apply_scores(task, scorer.calculate_components(task_dict, task_dicts, dependency_index, urgency_table), today)
+    
+    _write_scores(tasks, SCORE_FIELDS + ['blocker_count'])
+    return len(tasks)
+
+@transaction.atomic
+def rescore_tasks(task_ids):
+    """Recompute scores for just the given tasks, trusting their materialized blocker counts"""
+    tasks = list(Task.objects.filter(pk__in=_stored_ids(task_ids)))
+    dependency_index = DependencyIndex.from_blocker_counts(
+        {str(task.id): task.blocker_count for task in tasks}
+    )
+    scorer = TaskScorer()
+    today = timezone.now().date()
+    urgency_table = current_urgency_table(today)
+    
+    for task in tasks:
+        apply_scores(task, scorer.calculate_components(task_as_dict(task), (), dependency_index, urgency_table), today)
+    
+    _write_scores(tasks, SCORE_FIELDS)
+    return len(tasks)
+
+def rescore_imported(task_ids):
+    """
+    Bring scores up to date after a bulk import wrote task_ids.
+    
+    Blocker counts are recounted from the id and dependency columns alone -
+    an imported task may be named by tasks stored long before it, and an
+    updated one may have dropped dependencies - and only the counts that
+    changed are written. Then just the imported tasks and the tasks whose
+    counts moved are rescored, UPDATE_BATCH_SIZE at a time, so a small
+    import into a large table never loads every row. Imports that touch
+    most of the table fall back to rescore_all.
+    """
+    counts = {}
+    stored_counts = {}
+    # Finish reading before writing, as in urgency_tick
+    for task_id, dependencies, blocker_count in Task.objects.values_list('id', 'dependencies', 'blocker_count').iterator():
+        stored_counts[str(task_id)] = blocker_count
+        # As DependencyIndex.add: each listed id counts once per task
+        for dependency_id in set(_dependency_ids(dependencies)):
+            counts[dependency_id] = counts.get(dependency_id, 0) + 1
+    
+    moved = {}  # new blocker count -> ids of tasks whose stored count differs
+    for task_id, blocker_count in stored_counts.items():
+        count = counts.get(task_id, 0)
+        if count != blocker_count:
+            moved.setdefault(count, []).append(task_id)
+    
+    rescore = {str(task_id) for task_id in task_ids}
+    for ids in moved.values():
+        rescore.update(ids)
+    if len(rescore) * 2 >= len(stored_counts):
+        # Most of the table: one full pass beats batches of primary-key lookups
+        return rescore_all()
+    
+    with transaction.atomic():
+        for count, ids in moved.items():
+            for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+                Task.objects.filter(pk__in=ids[start:start + UPDATE_BATCH_SIZE]).update(blocker_count=count)
+        rescore = list(rescore)
+        for start in range(0, len(rescore), UPDATE_BATCH_SIZE):
+            rescore_tasks(rescore[start:start + UPDATE_BATCH_SIZE])
+    return len(rescore)
+
+def affected_task_ids(task_id, old_dependencies, new_dependencies):
+    """
+    Tasks whose scores can change when one task is created, edited or deleted.
+    
+    That is the task itself plus every dependency it gained or lost: those
+    tasks' blocker counts move. Tasks that depend on the edited task keep
+    their scores, since nothing about them or their blocker counts changed.
+    """
+    old_dependencies = set(_dependency_ids(old_dependencies))
+    new_dependencies = set(_dependency_ids(new_dependencies))
+    return {str(task_id)} | (old_dependencies ^ new_dependencies)
+
+def save_task(serializer):
+    """Save a TaskSerializer and incrementally rescore the tasks it affects"""
+    with transaction.atomic():
+        old_dependencies = serializer.instance.dependencies if serializer.instance else []
+        task = serializer.save()
+        _shift_blocker_counts(old_dependencies, task.dependencies)
+        rescore_tasks(affected_task_ids(task.id, old_dependencies, task.dependencies))
+    task.refresh_from_db()
+    return task
+
+def delete_task(task):
+    """Delete a task and rescore the tasks it was blocked by"""
+    with transaction.atomic():
+        dependencies = task.dependencies
+        task_id = task.id
+        task.delete()
+        _shift_blocker_counts(dependencies, [])
+        rescore_tasks(affected_task_ids(task_id, dependencies, []))
+
+def urgency_tick():
+    """
+    Bring stored scores up to today after the date rolls over.
+    
+    Only urgency depends on the date, so importance, effort and dependency
+    scores are reused as stored. Past-due or far-future tasks whose urgency
+    cannot have moved are skipped in SQL rather than loaded. Tasks sharing a
+    due date and component scores get identical new scores, so each such
+    group is written with one UPDATE on the primary key.
+    """
+    today = timezone.now().date()
+    urgency_of = current_urgency_table(today)
+    stale = stale_tasks(today).filter(scored_on__isnull=False)
+    changed = (
+        stale
+        .exclude(due_date__lt=today, urgency_score=1.0)
+        .exclude(due_date__gte=today + timedelta(days=URGENCY_FLOOR_DAYS), urgency_score=0.1)
+        .values_list('id', 'due_date', *COMPONENT_FIELDS.values())
+    )
+    
+    # Finish reading before writing - SQLite gives no isolation between a
+    # chunked read and updates to the same table on one connection
+    groups = {}  # new component scores -> task ids
+    for task_id, due_date, urgency_score, *other_scores in changed:
+        urgency = urgency_of(due_date)
+        if urgency != urgency_score:
+            groups.setdefault((urgency, *other_scores), []).append(task_id)
+    
+    with transaction.atomic():
+        for components, task_ids in groups.items():
+            values = score_values(dict(zip(COMPONENT_FIELDS, components)), today)
+            for start in range(0, len(task_ids), UPDATE_BATCH_SIZE):
+                Task.objects.filter(pk__in=task_ids[start:start + UPDATE_BATCH_SIZE]).update(**values)
+        stale.update(scored_on=today)
+    
+    return sum(len(task_ids) for task_ids in groups.values())
+
+def stale_tasks(today=None):
+    """
+    Tasks not scored today. Spelled as ranges and IS NULL rather than
+    exclude(scored_on=today): a != test cannot use task_scored_on_idx, so
+    every read path would scan the table before its indexed top-k query.
+    """
+    if today is None:
+        today = timezone.now().date()
+    return Task.objects.filter(Q(scored_on__lt=today) | Q(scored_on__gt=today) | Q(scored_on__isnull=True))
+
+def scores_are_current():
+    """True when every stored task was scored today - an index probe, not a scan"""
+    return not stale_tasks().exists()
+
+def ensure_scores_current():
+    """Make sure stored scores reflect today before they are read"""
+    oldest = list(
+        stale_tasks()
+        .order_by(F('scored_on').asc(nulls_first=True))
+        .values_list('scored_on', flat=True)[:1]
+    )
+    if not oldest:
+        return
+    if oldest[0] is None:
+        # Written outside the store (e.g. the admin) - counts may be stale too
+        rescore_all()
+    else:
+        urgency_tick()
+
+def refresh_stale_scores():
+    """
+    Called by views before reading stored scores. By default a stale table is
+    refreshed on a worker thread so no request waits for it, and reads see the
+    previous day's scores until it finishes; running `manage.py urgency_tick`
+    from cron after midnight means requests normally find nothing to do.
+    TASK_REFRESH_SCORES_INLINE refreshes within the request instead.
+    """
+    if scores_are_current():
+        return
+    if getattr(settings, 'TASK_REFRESH_SCORES_INLINE', False):
+        ensure_scores_current()
+    else:
+        _start_refresh()
+
+def _start_refresh():
+    if not _refresh_lock.acquire(blocking=False):
+        return  # Already running
+    threading.Thread(target=_refresh, daemon=True).start()
+
+def _refresh():
+    try:
+        ensure_scores_current()
+    except Exception:
+        logger.exception('Background score refresh failed')
+    finally:
+        connection.close()  # This thread's own connection
+        _refresh_lock.release()
+
+def top_tasks(strategy='smart', limit=3):
+    """Best stored tasks for a strategy - a single query on the score index"""
+    refresh_stale_scores()
+    field = score_field_for_strategy(strategy)
+    return list(Task.objects.order_by(f'-{field}', 'due_date', 'id')[:limit])
+
+def stored_task_count(top, limit):
+    """Number of stored tasks given a top_tasks result - only counts when the result may be truncated"""
+    if len(top) < limit:
+        return len(top)
+    return Task.objects.count()
+
+async def atop_tasks(strategy='smart', limit=3):
+    """top_tasks for async views - reads use the async ORM, a stale-score refresh runs in the background"""
+    if await stale_tasks().aexists():
+        if getattr(settings, 'TASK_REFRESH_SCORES_INLINE', False):
+            await sync_to_async(ensure_scores_current)()
+        else:
+            _start_refresh()
+    field = score_field_for_strategy(strategy)
+    return [task async for task in Task.objects.order_by(f'-{field}', 'due_date', 'id')[:limit]]
+
+async def astored_task_count(top, limit):
+    """stored_task_count for async views"""
+    if len(top) < limit:
+        return len(top)
+    return await Task.objects.acount()
+
+def _write_scores(tasks, fields):
+    """
+    Write fields of loaded tasks back with one prepared UPDATE ... WHERE id
+    = %s run through executemany, so a task deleted after it was loaded
+    stays deleted - an INSERT ... ON CONFLICT upsert would bring it back.
+    bulk_update's CASE WHEN per row and one ORM update() per task are both
+    several times slower.
+    """
+    model_fields = [Task._meta.get_field(field) for field in fields]
+    pk = Task._meta.pk
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(Task._meta.db_table),
+        ', '.join(f'{quote(field.column)} = %s' for field in model_fields),
+        quote(pk.column),
+    )
+    rows = [
+        [field.get_db_prep_save(getattr(task, field.attname), connection) for field in model_fields] +
+        [pk.get_db_prep_value(task.pk, connection)]
+        for task in tasks
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+def _dependency_ids(dependencies):
+    return [d for d in dependencies or [] if isinstance(d, str)]
+
+def _stored_ids(ids):
+    """Keep only ids that name a stored task exactly as the scorer compares them"""
+    stored = []
+    for task_id in ids:
+        try:
+            if str(uuid.UUID(str(task_id))) == str(task_id):
+                stored.append(task_id)
+        except ValueError:
+            continue
+    return stored
+
+def _shift_blocker_counts(old_dependencies, new_dependencies):
+    old_dependencies = set(_dependency_ids(old_dependencies))
+    new_dependencies = set(_dependency_ids(new_dependencies))
+    gained = _stored_ids(new_dependencies - old_dependencies)
+    lost = _stored_ids(old_dependencies - new_dependencies)
+    if gained:
+        Task.objects.filter(pk__in=gained).update(blocker_count=F('blocker_count') + 1)
+    if lost:
+        Task.objects.filter(pk__in=lost, blocker_count__gt=0).update(blocker_count=F('blocker_count') - 1)
@@ -0,0 +1,119 @@
+import heapq
+
+from .records import ScoredTask
+from .renderers import dumps, loads
+from .scoring import DependencyIndex, current_urgency_table
+
+class NDJSONError(ValueError):
+    """Raised when a line of an NDJSON payload cannot be used as a task"""
+    def __init__(self, line_number, message):
+        super().__init__(f'Line {line_number}: {message}')
+        self.line_number = line_number
+        self.message = message
+
+def iter_ndjson(stream):
+    """Yield (line_number, task) pairs, parsing one line at a time"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            task = loads(line)
+        except ValueError as e:
+            raise NDJSONError(line_number, f'invalid JSON ({e})')
+        if not isinstance(task, dict):
+            raise NDJSONError(line_number, 'expected a JSON object')
+        yield line_number, task
+
+class StreamingAnalyzer:
+    """
+    Scores tasks as they arrive from a stream.
+    
+    Everything except the dependency component is final as soon as a task is
+    parsed; the dependency component needs blocker counts from the whole
+    stream, so it is applied in finish(). In top-k mode only tasks that can
+    still reach the top k are retained, keeping memory near O(k).
+    """
+    def __init__(self, scorer, top_k=None):
+        self.scorer = scorer
+        self.top_k = top_k
+        self.total_tasks = 0
+        self.dependency_index = DependencyIndex(track_dependents=False)
+        self._urgency_of = current_urgency_table()  # "Today" as of the start of the stream
+        self._candidates = []  # (arrival, task, partial_score, has_dependencies)
+        # Min-heap of the k best guaranteed (score, -arrival) keys seen so far; ties
+        # go to the earlier task, as in finish(), so equal scores can be ruled out too
+        self._floor = []
+        self._prune_at = 4 * top_k if top_k is not None else None
+    
+    def add(self, task):
+        """Score one parsed task"""
+        weights = self.scorer.weights
+        arrival = self.total_tasks
+        self.total_tasks += 1
+        self.dependency_index.add(task)
+        
+        # Same summation order as calculate_total_score, minus the final dependency term
+        partial_score = (
+            self._urgency_of(task['due_date']) * weights['urgency'] +
+            (task['importance'] / 10.0) * weights['importance'] +
+            self.scorer.calculate_effort_score(task['estimated_hours']) * weights['effort']
+        )
+        has_dependencies = bool(task.get('dependencies', []))
+        
+        if self.top_k is None:
+            self._candidates.append((arrival, task, partial_score, has_dependencies))
+            return
+        
+        # Blocker counts only ever grow, so the current dependency score is a floor
+        # and a fully blocking score (1.0) is a ceiling for the final score
+        lowest = round(partial_score + self._dependency_score(task, has_dependencies) * weights['dependencies'], 2)
+        highest = round(partial_score + (1.0 if has_dependencies else 0.5) * weights['dependencies'], 2)
+        
+        best_case = (highest, -arrival)
+        if len(self._floor) == self.top_k and best_case < self._floor[0]:
+            return  # k tasks are already certain to rank above it
+        
+        guaranteed = (lowest, -arrival)
+        if len(self._floor) < self.top_k:
+            heapq.heappush(self._floor, guaranteed)
+        elif guaranteed > self._floor[0]:
+            heapq.heapreplace(self._floor, guaranteed)
+        
+        self._candidates.append((arrival, task, partial_score, has_dependencies, best_case))
+        if len(self._candidates) > self._prune_at:
+            self._prune()
+    
+    def finish(self):
+        """Return (score, task) pairs ordered by score, highest first"""
+        weights = self.scorer.weights
+        scored = []
+        for candidate in self._candidates:
+            arrival, task, partial_score, has_dependencies = candidate[:4]
+            score = round(partial_score + self._dependency_score(task, has_dependencies) * weights['dependencies'], 2)
+            scored.append((-score, arrival, task))
+        self._candidates = []
+        
+        if self.top_k is not None:
+            scored = heapq.nsmallest(self.top_k, scored, key=lambda entry: entry[:2])
+        else:
+            scored.sort(key=lambda entry: entry[:2])
+        
+        return [(-negative_score, task) for negative_score, _, task in scored]
+    
+    def _dependency_score(self, task, has_dependencies):
+        if not has_dependencies:
+            return 0.5
+        return min(1.0, self.dependency_index.blocking_count(task.get('id', 'temp_id')) * 0.3)
+    
+    def _prune(self):
+        threshold = self._floor[0]
+        self._candidates = [c for c in self._candidates if c[4] >= threshold]
+        # Survivors may legitimately pile up (unknown dependency scores), so wait
+        # for the list to double before pruning again - O(1) amortized per task
+        self._prune_at = max(4 * self.top_k, 2 * len(self._candidates))
+
+def ndjson_lines(results, strategy):
+    """Encode scored tasks one NDJSON line at a time"""
+    for score, task in results:
+        yield dumps(ScoredTask(task, score, strategy)) + b'\n'
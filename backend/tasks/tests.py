@@ -1,7 +1,30 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+import gzip
+import json
+import os
+import pickle
+import tempfile
+import uuid
 from datetime import date, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core.management import CommandError, call_command
 from django.utils import timezone
-from .scoring import TaskScorer, get_weights_for_strategy
+from task_analyzer.assets import assets
+from . import bulk, cache, parallel, renderers, sharding, store
+from .graph import DependencyCycleError, TaskGraph
+from .instrumentation import metrics, span
+from .models import Task
+from .records import MultiScoredTask, ScoredTask
+from .sessions import sessions
+from .simulation import ScheduleSimulator
+from .streaming import StreamingAnalyzer
+from .validation import validate_tasks
+from .scoring import (
+    DependencyIndex, TaskScorer, UrgencyTable, current_urgency_table, get_weights_for_strategy, np, resolve_strategies, top_positions
+)
 
 class TaskScoringTests(TestCase):
     def setUp(self):
@@ -117,3 +140,1172 @@ class TaskScoringTests(TestCase):
         self.assertIsInstance(score, float)
         self.assertGreaterEqual(score, 0)
         self.assertLessEqual(score, 1)
+
+class ScoreMemoTests(TestCase):
+    def test_memoized_scores_match_piecewise_functions(self):
+        scorer = TaskScorer()
+        today = timezone.now().date()
+        for days in range(-40, 400):
+            due_date = today + timedelta(days=days)
+            for _ in range(2):  # First call fills the table, the second reads it
+                self.assertEqual(scorer.calculate_urgency_score(due_date), TaskScorer.urgency_for_days(days))
+                self.assertEqual(scorer.calculate_urgency_score(due_date.isoformat()), TaskScorer.urgency_for_days(days))
+        for hours in [0.25, 0.5, 1, 1.5, 2, 4, 4.5, 8, 9, 12.5, 40, 80, 1000]:
+            for _ in range(2):
+                self.assertEqual(scorer.calculate_effort_score(hours), TaskScorer.effort_for_hours(hours))
+    
+    def test_urgency_table_rebuilt_when_date_changes(self):
+        today = timezone.now().date()
+        table = current_urgency_table()
+        self.assertIs(current_urgency_table(), table)
+        self.assertEqual(table(today + timedelta(days=1)), 0.8)
+        
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            self.assertEqual(TaskScorer().calculate_urgency_score(today + timedelta(days=1)), 0.9)
+            self.assertIsNot(current_urgency_table(), table)
+
+class DependencyIndexTests(TestCase):
+    def setUp(self):
+        self.scorer = TaskScorer()
+        today = timezone.now().date()
+        self.tasks = [
+            {'id': 'a', 'title': 'A', 'due_date': today, 'estimated_hours': 2, 'importance': 5, 'dependencies': []},
+            {'id': 'b', 'title': 'B', 'due_date': today, 'estimated_hours': 3, 'importance': 6, 'dependencies': ['a', 'a']},
+            {'id': 'c', 'title': 'C', 'due_date': today, 'estimated_hours': 1, 'importance': 7, 'dependencies': ['a', 'b']},
+            {'id': 'd', 'title': 'D', 'due_date': today, 'estimated_hours': 9, 'importance': 2, 'dependencies': ['c', 'missing']},
+        ]
+    
+    def test_blocking_counts(self):
+        index = DependencyIndex(self.tasks)
+        self.assertEqual(index.blocking_count('a'), 2)
+        self.assertEqual(index.blocking_count('b'), 1)
+        self.assertEqual(index.blocking_count('d'), 0)
+    
+    def test_downstream_counts_are_transitive(self):
+        index = DependencyIndex(self.tasks)
+        self.assertEqual(index.downstream_count('a'), 3)
+        self.assertEqual(index.downstream_count('c'), 1)
+        self.assertEqual(index.downstream_count('d'), 0)
+    
+    def test_batch_scores_match_per_task_loop(self):
+        expected = [self.scorer.calculate_total_score(task, self.tasks) for task in self.tasks]
+        self.assertEqual(self.scorer.score_tasks(self.tasks), expected)
+
+@skipUnless(np is not None, 'NumPy is not installed')
+class BatchScoringTests(TestCase):
+    def test_score_batch_matches_scalar_path(self):
+        today = timezone.now().date()
+        tasks = []
+        for i in range(400):
+            tasks.append({
+                'id': str(i),
+                'title': f'Task {i}',
+                'due_date': (today + timedelta(days=(i % 130) - 10)).isoformat(),
+                'estimated_hours': (i % 23) + 0.5 * (i % 2),
+                'importance': (i % 10) + 1,
+                'dependencies': [str(i - 1), str(i // 2)] if i % 3 == 0 and i else [],
+            })
+        
+        for strategy in ['smart', 'fastest', 'impact', 'deadline']:
+            scorer = TaskScorer(get_weights_for_strategy(strategy))
+            expected = [scorer.calculate_total_score(task, tasks) for task in tasks]
+            self.assertEqual(scorer.score_batch(tasks), expected)
+    
+    def test_score_batch_accepts_date_objects(self):
+        today = timezone.now().date()
+        task = {'id': '1', 'title': 'Today', 'due_date': today, 'estimated_hours': 1, 'importance': 10, 'dependencies': []}
+        self.assertEqual(TaskScorer().score_batch([task]), [TaskScorer().calculate_total_score(task, [task])])
+
+class StreamingAnalyzeTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.tasks = []
+        for i in range(60):
+            self.tasks.append({
+                'id': str(i),
+                'title': f'Task {i}',
+                'due_date': (today + timedelta(days=(i * 7) % 40 - 3)).isoformat(),
+                'estimated_hours': (i % 9) + 1,
+                'importance': (i * 3) % 10 + 1,
+                'dependencies': [str((i * 5) % 60), str((i * 11) % 60)] if i % 2 else [],
+            })
+        self.body = '\n'.join(json.dumps(task) for task in self.tasks) + '\n'
+    
+    def stream(self, query=''):
+        response = self.client.post(
+            '/api/tasks/analyze/stream/' + query, data=self.body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return response, [json.loads(line) for line in lines]
+    
+    def test_stream_matches_analyze(self):
+        expected = self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json').json()
+        response, results = self.stream()
+        self.assertEqual(response['X-Total-Tasks'], '60')
+        self.assertEqual(
+            [(t['id'], t['priority_score']) for t in results],
+            [(t['id'], t['priority_score']) for t in expected['tasks']]
+        )
+    
+    def test_top_k_matches_head_of_full_ranking(self):
+        _, full = self.stream()
+        for k in [1, 3, 10]:
+            _, top = self.stream(f'?top={k}')
+            self.assertEqual(top, full[:k])
+    
+    def test_top_k_with_many_ties_keeps_few_candidates(self):
+        today = timezone.now().date()
+        analyzer = StreamingAnalyzer(TaskScorer(), top_k=10)
+        for i in range(5000):
+            analyzer.add({'id': str(i), 'title': 'Same', 'due_date': today, 'estimated_hours': 2, 'importance': 5})
+            self.assertLessEqual(len(analyzer._candidates), 40)
+        top = analyzer.finish()
+        self.assertEqual([task['id'] for _, task in top], [str(i) for i in range(10)])
+    
+    def test_invalid_line_reports_line_number(self):
+        response = self.client.post(
+            '/api/tasks/analyze/stream/', data='{"title": "ok"}\nnot json\n', content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 1', response.json()['error'])
+
+class TaskStoreTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+    
+    def create(self, title, days, hours, importance, dependencies=()):
+        response = self.client.post('/api/tasks/', data={
+            'title': title,
+            'due_date': (self.today + timedelta(days=days)).isoformat(),
+            'estimated_hours': hours,
+            'importance': importance,
+            'dependencies': list(dependencies),
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+    
+    def test_materialized_scores_match_scorer(self):
+        base = self.create('Base', 2, 3, 8)
+        child = self.create('Child', 5, 1, 6, [base['id']])
+        self.create('Grandchild', 12, 9, 4, [child['id'], base['id']])
+        
+        stored = [store.task_as_dict(task) for task in Task.objects.all()]
+        for task in Task.objects.all():
+            task_dict = store.task_as_dict(task)
+            for strategy, field in store.STRATEGY_SCORE_FIELDS.items():
+                scorer = TaskScorer(get_weights_for_strategy(strategy))
+                self.assertEqual(getattr(task, field), scorer.calculate_total_score(task_dict, stored))
+    
+    def test_suggest_returns_top_three_stored_tasks(self):
+        self.create('Later', 40, 20, 2)
+        self.create('Overdue', -1, 1, 10)
+        self.create('Soon', 1, 2, 8)
+        self.create('Next week', 6, 4, 5)
+        
+        # Freshness check, the top-3 read and a count because more tasks than 3 may be stored
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/tasks/suggest/')
+        titles = [s['title'] for s in response.json()['suggestions']]
+        self.assertEqual(titles, ['Overdue', 'Soon', 'Next week'])
+        self.assertEqual(response.json()['total_tasks'], 4)
+        
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/tasks/suggest/?top=10')
+        self.assertEqual(len(response.json()['suggestions']), 4)
+    
+    def test_update_and_delete_rescore(self):
+        base = self.create('Base', 3, 2, 5)
+        child = self.create('Child', 3, 2, 5, [base['id']])
+        self.assertEqual(Task.objects.get(pk=child['id']).dependency_score, 0.0)
+        
+        self.create('Other', 3, 2, 5, [child['id']])
+        self.assertEqual(Task.objects.get(pk=child['id']).dependency_score, 0.3)
+        
+        response = self.client.patch(f'/api/tasks/{child["id"]}/', data={'dependencies': []}, content_type='application/json')
+        self.assertEqual(response.json()['dependency_score'], 0.5)
+        
+        self.assertEqual(self.client.delete(f'/api/tasks/{base["id"]}/').status_code, 204)
+        self.assertEqual(self.client.get(f'/api/tasks/{base["id"]}/').status_code, 404)
+    
+    def test_invalid_importance_rejected(self):
+        response = self.client.post('/api/tasks/', data={
+            'title': 'Bad', 'due_date': self.today.isoformat(), 'estimated_hours': 1, 'importance': 11,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('importance', response.json())
+
+class IncrementalRescoreTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+    
+    def create(self, title, days, dependencies=()):
+        response = self.client.post('/api/tasks/', data={
+            'title': title,
+            'due_date': (self.today + timedelta(days=days)).isoformat(),
+            'estimated_hours': len(title),
+            'importance': 5,
+            'dependencies': list(dependencies),
+        }, content_type='application/json')
+        return response.json()['id']
+    
+    def snapshot(self):
+        return {
+            str(task.id): (task.blocker_count,) + tuple(getattr(task, f) for f in store.SCORE_FIELDS)
+            for task in Task.objects.all()
+        }
+    
+    def assertMatchesFullRescore(self):
+        incremental = self.snapshot()
+        store.rescore_all()
+        self.assertEqual(incremental, self.snapshot())
+    
+    def test_edits_match_full_rescore(self):
+        a = self.create('A', 1)
+        b = self.create('B', 4, [a])
+        c = self.create('C', 9, [a, b])
+        self.assertMatchesFullRescore()
+        
+        self.client.patch(f'/api/tasks/{c}/', data={'dependencies': [b, 'external']}, content_type='application/json')
+        self.assertMatchesFullRescore()
+        
+        self.client.delete(f'/api/tasks/{b}/')
+        self.assertMatchesFullRescore()
+    
+    def test_affected_tasks_are_edit_and_changed_dependencies(self):
+        self.assertEqual(store.affected_task_ids('t', ['a', 'b'], ['b', 'c']), {'t', 'a', 'c'})
+    
+    def test_edit_only_rescores_affected_tasks(self):
+        a = self.create('A', 1)
+        b = self.create('B', 4, [a])
+        untouched = self.create('Untouched', 9)
+        Task.objects.filter(pk=untouched).update(score_smart=-1)
+        
+        self.client.patch(f'/api/tasks/{b}/', data={'importance': 9}, content_type='application/json')
+        self.assertEqual(Task.objects.get(pk=untouched).score_smart, -1)
+    
+    def test_urgency_tick_matches_full_rescore_next_day(self):
+        for days in [-3, 0, 1, 2, 5, 8, 20, 99, 150]:
+            self.create(f'Due {days}', days)
+        
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            store.ensure_scores_current()
+            self.assertMatchesFullRescore()
+            self.assertFalse(Task.objects.exclude(scored_on=tomorrow.date()).exists())
+    
+    def test_requests_leave_stale_scores_to_a_background_refresh(self):
+        self.create('A', 3)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            with mock.patch.object(store, '_start_refresh') as start_refresh:
+                self.assertEqual(self.client.get('/api/tasks/suggest/').status_code, 200)
+            start_refresh.assert_called_once()
+            self.assertFalse(store.scores_are_current())
+            with self.settings(TASK_REFRESH_SCORES_INLINE=True):
+                self.client.get('/api/tasks/')
+            self.assertTrue(store.scores_are_current())
+    
+    def test_score_writes_never_bring_back_deleted_tasks(self):
+        kept, deleted = self.create('Kept', 1), self.create('Deleted', 2)
+        tasks = list(Task.objects.all())
+        for task in tasks:
+            task.score_smart = 0.99
+        Task.objects.filter(pk=deleted).delete()  # e.g. by a request while a refresh runs
+        store._write_scores(tasks, ['score_smart'])
+        self.assertEqual(list(Task.objects.values_list('pk', 'score_smart')), [(uuid.UUID(kept), 0.99)])
+    
+    def test_staleness_check_uses_the_scored_on_index(self):
+        self.create('A', 3)
+        self.assertIn('task_scored_on_idx', store.stale_tasks().explain())
+        Task.objects.update(scored_on=None)
+        self.assertFalse(store.scores_are_current())
+
+class AnalysisCacheTests(TestCase):
+    def setUp(self):
+        cache.get_analysis_cache().clear()
+        cache.stats.reset()
+        today = timezone.now().date().isoformat()
+        self.tasks = [
+            {'id': '1', 'title': 'One', 'due_date': today, 'estimated_hours': 2, 'importance': 7, 'dependencies': []},
+            {'id': '2', 'title': 'Two', 'due_date': today, 'estimated_hours': 9, 'importance': 3, 'dependencies': ['1']},
+        ]
+    
+    def analyze(self, tasks, strategy='smart', **headers):
+        return self.client.post(
+            f'/api/tasks/analyze/?strategy={strategy}', data=tasks, content_type='application/json', headers=headers
+        )
+    
+    def test_repeat_request_hits_cache(self):
+        first = self.analyze(self.tasks)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        
+        # Key order inside task dicts does not change the canonical hash
+        reordered = [dict(reversed(list(task.items()))) for task in self.tasks]
+        second = self.analyze(reordered)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json(), first.json())
+        
+        self.assertEqual(self.analyze(self.tasks, strategy='deadline')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/tasks/analyze/cache/').json()['hits'], 1)
+    
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.analyze(self.tasks)['ETag']
+        response = self.analyze(self.tasks, If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_key_changes_with_date(self):
+        key = cache.analysis_key(self.tasks, get_weights_for_strategy('smart'))
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            self.assertNotEqual(cache.analysis_key(self.tasks, get_weights_for_strategy('smart')), key)
+    
+    def test_entries_hold_rankings_not_tasks(self):
+        for query in ('all', 'smart&order=topological', 'impact&top=1'):
+            first = self.analyze(self.tasks, strategy=query)
+            second = self.analyze(self.tasks, strategy=query)
+            self.assertEqual(second['X-Cache'], 'HIT', query)
+            self.assertEqual(second.json(), first.json())
+        
+        key = cache.analysis_key(self.tasks, [get_weights_for_strategy('smart')], strategies=['smart'], order='priority', top=None)
+        self.analyze(self.tasks)
+        entry = cache.get_analysis_cache().get(key)
+        self.assertEqual((entry['positions'], entry['scores']), ([0, 1], [0.76, 0.63]))
+        self.assertNotIn('tasks', entry)
+    
+    def test_large_payloads_are_not_cached(self):
+        with self.settings(TASK_ANALYSIS_CACHE_MAX_TASKS=1):
+            self.assertNotIn('X-Cache', self.analyze(self.tasks))
+            self.assertNotIn('X-Cache', self.analyze(self.tasks))
+    
+    def test_invalid_payloads_are_not_cached(self):
+        bad = [dict(self.tasks[0], importance=42)]
+        self.assertEqual(self.analyze(bad).status_code, 400)
+        self.assertEqual(self.analyze(bad).status_code, 400)
+        self.assertEqual(cache.stats.as_dict()['hits'], 0)
+
+class MultiStrategyTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.tasks = [
+            {'id': str(i), 'title': f'Task {i}', 'due_date': (today + timedelta(days=i * 3)).isoformat(),
+             'estimated_hours': 12 - i, 'importance': (i * 7) % 10 + 1, 'dependencies': ['0'] if i % 2 else []}
+            for i in range(8)
+        ]
+    
+    def analyze(self, query):
+        return self.client.post('/api/tasks/analyze/' + query, data=self.tasks, content_type='application/json')
+    
+    def test_all_matches_single_strategy_requests(self):
+        combined = self.analyze('?strategy=all').json()
+        self.assertEqual(combined['strategies_used'], ['smart', 'fastest', 'impact', 'deadline'])
+        
+        for strategy in combined['strategies_used']:
+            single = self.analyze(f'?strategy={strategy}').json()
+            ranked = [combined['tasks'][i] for i in combined['rankings'][strategy]]
+            self.assertEqual([t['id'] for t in ranked], [t['id'] for t in single['tasks']])
+            self.assertEqual([t['scores'][strategy] for t in ranked], [t['priority_score'] for t in single['tasks']])
+    
+    def test_custom_weight_vector(self):
+        result = self.analyze('?strategy=smart&strategy=custom:0.4:0.3:0.2:0.1').json()
+        scores = [(t['scores']['smart'], t['scores']['custom:0.4:0.3:0.2:0.1']) for t in result['tasks']]
+        self.assertTrue(all(smart == custom for smart, custom in scores))
+    
+    def test_invalid_custom_weights_rejected(self):
+        response = self.analyze('?strategy=custom:1:2')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('needs 4 weights', response.json()['error'])
+        for weights in ('nan:0:0:0', 'inf:0:0:0', '0.4:0.3:-inf:0.1'):
+            response = self.analyze(f'?strategy=custom:{weights}')
+            self.assertEqual(response.status_code, 400, weights)
+    
+    def test_resolve_strategies_deduplicates(self):
+        names = [name for name, _ in resolve_strategies(['smart,all', 'impact'])]
+        self.assertEqual(names, ['smart', 'fastest', 'impact', 'deadline'])
+
+class TaskGraphTests(TestCase):
+    def task(self, task_id, hours=1, dependencies=()):
+        return {'id': task_id, 'title': task_id, 'due_date': timezone.now().date().isoformat(),
+                'estimated_hours': hours, 'importance': 5, 'dependencies': list(dependencies)}
+    
+    def test_cycles_and_dangling_references(self):
+        graph = TaskGraph([
+            self.task('a', dependencies=['c']),
+            self.task('b', dependencies=['a']),
+            self.task('c', dependencies=['b', 'ghost']),
+            self.task('d', dependencies=['d']),
+            self.task('e', dependencies=['a']),
+        ])
+        self.assertEqual(sorted(graph.cycles()), [['a', 'b', 'c'], ['d']])
+        self.assertEqual(graph.dangling, {'c': ['ghost']})
+        with self.assertRaises(DependencyCycleError):
+            graph.topological_order([0] * 5)
+    
+    def test_topological_order_prefers_higher_scores(self):
+        graph = TaskGraph([
+            self.task('base'),
+            self.task('blocked', dependencies=['base']),
+            self.task('free'),
+        ])
+        # 'blocked' has the best score but must wait for 'base'
+        order = graph.topological_order([0.2, 0.9, 0.5])
+        self.assertEqual([graph.ids[i] for i in order], ['free', 'base', 'blocked'])
+    
+    def test_critical_path_uses_estimated_hours(self):
+        graph = TaskGraph([
+            self.task('design', 3),
+            self.task('build', 8, ['design']),
+            self.task('docs', 2, ['design']),
+            self.task('ship', 1, ['build', 'docs']),
+        ])
+        self.assertEqual(graph.critical_path(), (12, ['design', 'build', 'ship']))
+    
+    def test_long_chain_has_no_recursion_limit(self):
+        size = 100000
+        tasks = [self.task(str(i), dependencies=[str(i - 1)] if i else []) for i in range(size)]
+        tasks[0]['dependencies'] = [str(size - 1)]
+        graph = TaskGraph(tasks)
+        self.assertEqual(len(graph.cycles()[0]), size)
+        
+        tasks[0]['dependencies'] = []
+        graph = TaskGraph(tasks)
+        self.assertEqual(graph.critical_path()[0], size)
+    
+    def test_analyze_topological_order(self):
+        tasks = [
+            self.task('base', 20),
+            dict(self.task('blocked', 1, ['base']), importance=10),
+        ]
+        response = self.client.post('/api/tasks/analyze/?order=topological', data=tasks, content_type='application/json')
+        result = response.json()
+        self.assertEqual([t['id'] for t in result['tasks']], ['base', 'blocked'])
+        self.assertEqual(result['critical_path']['task_ids'], ['base', 'blocked'])
+        
+        tasks[0]['dependencies'] = ['blocked']
+        response = self.client.post('/api/tasks/analyze/?order=topological', data=tasks, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['cycles'], [['base', 'blocked']])
+
+class ParallelScoringTests(TestCase):
+    def tearDown(self):
+        parallel.shutdown_pool()
+    
+    def test_pool_ranking_matches_serial(self):
+        today = timezone.now().date()
+        tasks = [
+            {'id': str(i), 'title': f'Task {i}', 'due_date': (today + timedelta(days=i % 17 - 2)).isoformat(),
+             'estimated_hours': i % 11 + 1, 'importance': i % 10 + 1,
+             'dependencies': [str(i // 3)] if i % 4 == 0 else []}
+            for i in range(500)
+        ]
+        scorer = TaskScorer(get_weights_for_strategy('fastest'))
+        with self.settings(TASK_SCORING_WORKERS=2, TASK_SCORING_PARALLEL_THRESHOLD=100):
+            self.assertTrue(parallel.should_parallelize(len(tasks)))
+            self.assertEqual(scorer.rank_tasks(tasks, parallel=True), scorer.rank_tasks(tasks))
+    
+    def test_small_batches_stay_serial(self):
+        with self.settings(TASK_SCORING_WORKERS=2, TASK_SCORING_PARALLEL_THRESHOLD=100):
+            self.assertFalse(parallel.should_parallelize(99))
+
+@override_settings(TASK_SHARD_AUTHKEY='shard-test-key')
+class ShardedScoringTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.processes, cls.addresses = sharding.start_local_workers(2)
+    
+    @classmethod
+    def tearDownClass(cls):
+        for process in cls.processes:
+            process.terminate()
+        super().tearDownClass()
+    
+    def tearDown(self):
+        sharding.reset_coordinator()
+    
+    def make_tasks(self, count):
+        today = timezone.now().date()
+        return [
+            {'id': str(i), 'title': f'Task {i}', 'due_date': today + timedelta(days=i % 23 - 3),
+             'estimated_hours': i % 11 + 1, 'importance': i % 10 + 1,
+             'dependencies': [str(i // 3), str(i // 3), str(i // 7)] if i % 4 == 0 else []}
+            for i in range(count)
+        ]
+    
+    def test_sharded_ranking_matches_single_process(self):
+        tasks = self.make_tasks(1000)
+        coordinator = sharding.Coordinator(self.addresses)
+        try:
+            for strategy in ('smart', 'high_impact'):
+                scorer = TaskScorer(get_weights_for_strategy(strategy))
+                self.assertEqual(coordinator.rank(scorer, tasks), scorer.rank_tasks(tasks))
+            self.assertEqual(coordinator.rank(scorer, tasks[:5], shards=7), scorer.rank_tasks(tasks[:5]))
+        finally:
+            coordinator.close()
+    
+    def test_rank_tasks_uses_workers_and_falls_back(self):
+        tasks = self.make_tasks(300)
+        scorer = TaskScorer()
+        expected = scorer.rank_tasks(tasks)
+        with self.settings(TASK_SHARD_WORKERS=self.addresses, TASK_SCORING_PARALLEL_THRESHOLD=100):
+            with mock.patch.object(sharding.Coordinator, 'rank', wraps=sharding.get_coordinator().rank) as rank:
+                self.assertEqual(scorer.rank_tasks(tasks, parallel=True), expected)
+            rank.assert_called_once()
+        sharding.reset_coordinator()
+        # Nothing listens on port 1 - scoring carries on in this process
+        with self.settings(TASK_SHARD_WORKERS=['127.0.0.1:1'], TASK_SCORING_PARALLEL_THRESHOLD=100,
+                           TASK_SCORING_WORKERS=1):
+            with self.assertLogs('tasks.sharding', 'WARNING') as logs:
+                self.assertIsNone(sharding.rank_sharded(scorer, tasks))
+                self.assertEqual(scorer.rank_tasks(tasks, parallel=True), expected)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('Shard workers unavailable', logs.output[0])
+    
+    def test_workers_and_coordinators_require_an_authkey(self):
+        with self.settings(TASK_SHARD_AUTHKEY=None, TASK_SHARD_WORKERS=self.addresses, TASK_SCORING_PARALLEL_THRESHOLD=100):
+            with self.assertRaises(ImproperlyConfigured):
+                sharding.Coordinator(self.addresses)
+            with self.assertRaises(ImproperlyConfigured):
+                TaskScorer().rank_tasks(self.make_tasks(300), parallel=True)
+            with self.assertRaisesMessage(CommandError, 'TASK_SHARD_AUTHKEY'):
+                call_command('score_worker', '--bind', '127.0.0.1:0')
+
+class ValidationTests(TestCase):
+    def test_reports_every_error_with_index(self):
+        tasks = [
+            {'title': 'Fine', 'due_date': '2025-12-01', 'estimated_hours': 2, 'importance': 5},
+            {'title': 'Bad importance', 'due_date': '2025-12-01', 'estimated_hours': 2, 'importance': 'high'},
+            {'title': 'Bad date', 'due_date': '2025-02-30', 'estimated_hours': 0, 'importance': 5},
+            {'due_date': '12/01/2025', 'estimated_hours': True, 'importance': 5, 'dependencies': 'a'},
+        ]
+        errors = validate_tasks(tasks)
+        self.assertEqual(
+            [(e['index'], e['field']) for e in errors],
+            [(1, 'importance'), (2, 'estimated_hours'), (2, 'due_date'),
+             (3, 'title'), (3, 'estimated_hours'), (3, 'due_date'), (3, 'dependencies')]
+        )
+    
+    def test_due_dates_are_normalized_once(self):
+        tasks = [{'title': str(i), 'due_date': '2025-12-01', 'estimated_hours': 1, 'importance': 5} for i in range(3)]
+        self.assertEqual(validate_tasks(tasks), [])
+        self.assertEqual(tasks[0]['due_date'], date(2025, 12, 1))
+        self.assertIs(tasks[0]['due_date'], tasks[2]['due_date'])
+    
+    def test_non_numeric_importance_is_a_400_not_a_500(self):
+        tasks = [
+            {'title': 'A', 'due_date': '2025-12-01', 'estimated_hours': 1, 'importance': 'urgent'},
+            {'title': 'B', 'due_date': 'soon', 'estimated_hours': 1, 'importance': 5},
+        ]
+        response = self.client.post('/api/tasks/analyze/', data=tasks, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        result = response.json()
+        self.assertEqual(result['error'], 'Task 0 importance must be a number between 1-10 (and 1 more error(s))')
+        self.assertEqual([e['index'] for e in result['errors']], [0, 1])
+    
+    def test_error_list_is_capped(self):
+        tasks = [{'title': 'x'}] * 10
+        self.assertEqual(len(validate_tasks(tasks, max_errors=5)), 5)
+
+class ScoredRecordTests(TestCase):
+    def setUp(self):
+        self.task = {'id': '1', 'title': 'Task', 'due_date': date(2025, 12, 1), 'estimated_hours': 2, 'importance': 5}
+    
+    def test_scored_task_matches_a_copied_dict(self):
+        record = ScoredTask(self.task, 0.71, 'smart')
+        self.assertEqual(dict(record), dict(self.task, priority_score=0.71, strategy_used='smart'))
+        self.assertEqual(list(record), list(self.task) + ['priority_score', 'strategy_used'])
+        self.assertNotIn('priority_score', self.task)
+    
+    def test_submitted_score_keys_are_overridden(self):
+        task = dict(self.task, priority_score=99)
+        record = ScoredTask(task, 0.5, 'smart')
+        self.assertEqual(record['priority_score'], 0.5)
+        self.assertEqual(len(record), len(dict(record)))
+    
+    def test_multi_scored_task_shares_strategy_names(self):
+        names = ('smart', 'fastest')
+        record = MultiScoredTask(self.task, names, (0.6, 0.8))
+        self.assertEqual(record['scores'], {'smart': 0.6, 'fastest': 0.8})
+        self.assertIs(MultiScoredTask(self.task, names, (0.1, 0.2)).strategies, record.strategies)
+    
+    def test_records_survive_the_analysis_cache(self):
+        record = pickle.loads(pickle.dumps(ScoredTask(self.task, 0.5, 'smart')))
+        self.assertEqual(dict(record), dict(self.task, priority_score=0.5, strategy_used='smart'))
+    
+    def test_analyze_response_shape_is_unchanged(self):
+        tasks = [
+            {'id': 'a', 'title': 'A', 'due_date': '2025-12-01', 'estimated_hours': 2, 'importance': 5},
+            {'id': 'b', 'title': 'B', 'due_date': '2025-12-02', 'estimated_hours': 1, 'importance': 9, 'dependencies': ['a']},
+        ]
+        result = self.client.post('/api/tasks/analyze/', data=tasks, content_type='application/json').json()
+        self.assertEqual(result['tasks'][0]['id'], 'b')
+        self.assertEqual(
+            set(result['tasks'][0]),
+            {'id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies', 'priority_score', 'strategy_used'}
+        )
+        self.assertEqual(result['tasks'][1]['due_date'], '2025-12-01')
+
+class FrontendAssetTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name, body in (('index.html', '<html>' + 'x' * 500 + '</html>'), ('script.js', 'let a = 1;' * 50), ('styles.css', 'p {}')):
+            with open(os.path.join(self.directory.name, name), 'w') as f:
+                f.write(body)
+        overrides = self.settings(FRONTEND_DIR=self.directory.name, FRONTEND_ASSET_RECHECK_SECONDS=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(self.directory.cleanup)
+        assets.clear()
+        self.addCleanup(assets.clear)
+    
+    def test_serves_precompressed_gzip(self):
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertTrue(gzip.decompress(response.content).startswith(b'<html>'))
+    
+    def test_identity_when_gzip_refused(self):
+        response = self.client.get('/static/script.js', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'let a = 1;' * 50)
+        self.assertEqual(response['Content-Type'], 'text/javascript; charset=utf-8')
+    
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+    
+    def test_changed_file_is_reloaded(self):
+        etag = self.client.get('/static/styles.css')['ETag']
+        path = os.path.join(self.directory.name, 'styles.css')
+        with open(path, 'w') as f:
+            f.write('body { margin: 0; }')
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+        response = self.client.get('/static/styles.css', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'body { margin: 0; }')
+    
+    def test_unknown_asset_is_404(self):
+        self.assertEqual(self.client.get('/static/settings.py').status_code, 404)
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.tasks = [
+            {'id': 'a', 'title': 'A', 'due_date': '2025-12-01', 'estimated_hours': 2, 'importance': 5},
+            {'id': 'b', 'title': 'B', 'due_date': '2025-12-02', 'estimated_hours': 1, 'importance': 9, 'dependencies': ['a']},
+        ]
+    
+    async def test_analyze_matches_sync_view(self):
+        for path in ('/api/tasks/analyze/?strategy=all', '/api/tasks/analyze/?order=topological'):
+            with self.settings(TASK_ANALYSIS_CACHE=None):
+                expected = (await self.async_client.post(path, data=self.tasks, content_type='application/json')).json()
+                response = await self.async_client.post(
+                    path.replace('/api/', '/api/async/'), data=self.tasks, content_type='application/json'
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected)
+    
+    async def test_large_payloads_are_offloaded(self):
+        with self.settings(TASK_ASYNC_OFFLOAD_THRESHOLD=1, TASK_ANALYSIS_CACHE=None):
+            with mock.patch('tasks.parallel.get_pool', wraps=parallel.get_pool) as pool:
+                response = await self.async_client.post('/api/async/tasks/analyze/', data=self.tasks, content_type='application/json')
+                invalid = await self.async_client.post(
+                    '/api/async/tasks/analyze/', data=[{'title': 'x', 'importance': 11}], content_type='application/json'
+                )
+        self.assertEqual(pool.call_count, 2)
+        self.assertEqual([task['id'] for task in response.json()['tasks']], ['b', 'a'])
+        self.assertEqual(response.json()['tasks'][0]['due_date'], '2025-12-02')
+        self.assertEqual(invalid.status_code, 400)
+    
+    async def test_cache_is_used_through_its_async_methods(self):
+        # DatabaseCache refuses synchronous queries from the event loop
+        caches = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'analysis': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'analysis_cache'},
+        }
+        with self.settings(CACHES=caches, TASK_ANALYSIS_CACHE='analysis'):
+            await sync_to_async(call_command)('createcachetable', verbosity=0)
+            first = await self.async_client.post('/api/async/tasks/analyze/', data=self.tasks, content_type='application/json')
+            second = await self.async_client.post('/api/async/tasks/analyze/', data=self.tasks, content_type='application/json')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+    
+    async def test_errors_and_cache_headers(self):
+        response = await self.async_client.post('/api/async/tasks/analyze/', data={'title': 'x'}, content_type='application/json')
+        self.assertEqual(response.json(), {'error': 'Expected a list of tasks'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((await self.async_client.get('/api/async/tasks/analyze/')).status_code, 405)
+        
+        first = await self.async_client.post('/api/async/tasks/analyze/', data=self.tasks, content_type='application/json')
+        second = await self.async_client.post(
+            '/api/async/tasks/analyze/', data=self.tasks, content_type='application/json', headers={'If-None-Match': first['ETag']}
+        )
+        self.assertEqual(second.status_code, 304)
+    
+    async def test_suggest_matches_sync_view(self):
+        today = timezone.now().date()
+        for i in range(4):
+            await Task.objects.acreate(title=f'T{i}', due_date=today + timedelta(days=i), estimated_hours=i + 1, importance=5 + i)
+        with self.settings(TASK_REFRESH_SCORES_INLINE=True):
+            expected = (await self.async_client.get('/api/tasks/suggest/?strategy=impact')).json()
+        response = await self.async_client.get('/api/async/tasks/suggest/?strategy=impact')
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(len(expected['suggestions']), 3)
+
+class BenchmarkCommandTests(TestCase):
+    def test_writes_comparable_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command('benchmark', sizes=[20], repeat=1, due_dates='overdue', output=output, stdout=StringIO())
+            with open(output) as f:
+                report = json.load(f)
+            
+            stages = {result['name'] for result in report['results']}
+            self.assertTrue({'calculate_total_score', 'validate_tasks', 'json_render', 'analyze_round_trip'} <= stages)
+            self.assertEqual(report['options']['due_dates'], 'overdue')
+            
+            out = StringIO()
+            call_command('benchmark', sizes=[20], repeat=1, compare=output, stdout=out)
+            self.assertIn('vs. baseline', out.getvalue())
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.tasks = [
+            {'id': 'a', 'title': 'A', 'due_date': '2025-12-01', 'estimated_hours': 2, 'importance': 5},
+            {'id': 'b', 'title': 'B', 'due_date': '2025-12-02', 'estimated_hours': 1, 'importance': 9, 'dependencies': ['a']},
+        ]
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+    
+    def test_disabled_by_default(self):
+        response = self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json')
+        self.assertFalse(response.has_header('Server-Timing'))
+        with span('anything') as result:
+            self.assertIsNone(result)
+    
+    def test_server_timing_lists_each_stage(self):
+        with self.settings(TASK_INSTRUMENTATION=True, TASK_ANALYSIS_CACHE=None):
+            response = self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json')
+        stages = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        for stage in ('parse', 'validate', 'components', 'combine', 'sort', 'render', 'total'):
+            self.assertIn(stage, stages)
+        self.assertEqual(stages[-1], 'total')
+    
+    def test_metrics_endpoint_reports_histograms(self):
+        with self.settings(TASK_INSTRUMENTATION=True):
+            for _ in range(3):
+                self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json')
+            result = self.client.get('/api/metrics/').json()
+        total = result['views']['analyze-tasks']['total']
+        self.assertEqual(total['count'], 3)
+        self.assertEqual(sum(total['buckets'].values()), 3)
+        self.assertLessEqual(total['p50_ms'], total['max_ms'])
+        
+        self.assertEqual(self.client.get('/api/metrics/', REMOTE_ADDR='10.0.0.5').status_code, 403)
+    
+    def test_sampled_profiles_are_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(TASK_INSTRUMENTATION=True, TASK_PROFILE_SAMPLE_RATE=1.0, TASK_PROFILE_DIR=directory):
+                self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json')
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.prof')]), 1)
+
+class TopKTests(TestCase):
+    def setUp(self):
+        self.tasks = [
+            {'id': str(i), 'title': f'T{i}', 'due_date': f'2025-12-{10 - i % 3:02d}', 'estimated_hours': 1 + i % 4, 'importance': 1 + i % 10,
+             'dependencies': [str(i - 1)] if i % 5 else []}
+            for i in range(60)
+        ]
+    
+    def analyze(self, query=''):
+        with self.settings(TASK_ANALYSIS_CACHE=None):
+            response = self.client.post(f'/api/tasks/analyze/{query}', data=self.tasks, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+    
+    def test_top_matches_the_head_of_the_full_ranking(self):
+        full = self.analyze()['tasks']
+        result = self.analyze('?top=5')
+        self.assertEqual(result['total_tasks'], 60)
+        self.assertEqual([t['priority_score'] for t in result['tasks']], [t['priority_score'] for t in full[:5]])
+    
+    def test_ties_break_by_input_order_on_every_path(self):
+        self.assertEqual(top_positions([0.5, 0.7, 0.5, 0.5], 3), [1, 0, 2])
+        # Every task scores the same: each path must return them in payload order
+        self.tasks = [
+            {'id': f'{i:02d}', 'title': f'T{i}', 'due_date': f'2025-12-{i % 3 + 1:02d}', 'estimated_hours': 2, 'importance': 5}
+            for i in range(20, 0, -1)
+        ]
+        expected = [task['id'] for task in self.tasks]
+        full = [task['id'] for task in self.analyze()['tasks']]
+        self.assertEqual(full, expected)
+        self.assertEqual([task['id'] for task in self.analyze('?top=7')['tasks']], expected[:7])
+        
+        for top_k in (None, 7):
+            analyzer = StreamingAnalyzer(TaskScorer(), top_k=top_k)
+            for task in self.tasks:
+                analyzer.add(dict(task, due_date=date.fromisoformat(task['due_date'])))
+            self.assertEqual([task['id'] for _, task in analyzer.finish()], expected[:top_k])
+    
+    def test_multi_strategy_keeps_only_ranked_tasks(self):
+        result = self.analyze('?strategy=all&limit=3')
+        self.assertEqual(result['total_tasks'], 60)
+        for strategy, ranking in result['rankings'].items():
+            self.assertEqual(len(ranking), 3)
+            scores = [result['tasks'][i]['scores'][strategy] for i in ranking]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(result['tasks']), len(set().union(*result['rankings'].values())))
+    
+    def test_topological_top(self):
+        full = self.analyze('?order=topological')['tasks']
+        self.assertEqual(self.analyze('?order=topological&top=4')['tasks'], full[:4])
+    
+    def test_rejects_bad_top(self):
+        response = self.client.post('/api/tasks/analyze/?top=0', data=self.tasks, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+class JSONRenderingTests(TestCase):
+    def setUp(self):
+        self.tasks = [
+            {'id': str(i), 'title': f'Tâche {i}', 'due_date': '2025-12-01', 'estimated_hours': 1.5, 'importance': 1 + i % 10}
+            for i in range(300)
+        ]
+    
+    def test_matches_drf_json_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+        data = {
+            'tasks': [ScoredTask({'id': 'a', 'title': 'Café', 'due_date': date(2025, 12, 1)}, 0.5, 'smart')],
+            'count': 1,
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(renderers.loads(renderers.dumps(data))['tasks'][0]['due_date'], '2025-12-01')
+    
+    def test_records_as_dict(self):
+        task = {'id': 'a', 'title': 'A'}
+        for record in (ScoredTask(task, 0.5, 'smart'), ScoredTask(dict(task, priority_score=1), 0.5, 'smart'),
+                       MultiScoredTask(task, ('smart',), (0.5,))):
+            self.assertEqual(list(record.as_dict().items()), list(dict(record).items()))
+    
+    def test_malformed_json_is_a_400(self):
+        response = self.client.post('/api/tasks/analyze/', data='[{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+    
+    def test_gzip_is_negotiated(self):
+        plain = self.client.post('/api/tasks/analyze/', data=self.tasks, content_type='application/json')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        
+        response = self.client.post(
+            '/api/tasks/analyze/', data=self.tasks, content_type='application/json', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+    
+    async def test_async_view_gzip(self):
+        response = await self.async_client.post(
+            '/api/async/tasks/analyze/', data=self.tasks, content_type='application/json', headers={'Accept-Encoding': 'gzip'}
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['tasks']), 300)
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+    
+    def csv_file(self, text):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+    
+    def test_csv_import_command(self):
+        due = (self.today + timedelta(days=3)).isoformat()
+        base_id = '6f1c3c2e-4a7d-4a7e-9a55-0d6b2a1f6a10'
+        path = self.csv_file(
+            'id,title,due_date,estimated_hours,importance,dependencies\n'
+            f'{base_id},Base,{due},2,8,\n'
+            f',Child,{due},1,6,{base_id}\n'
+            f',Half hours,{due},1.5,6,\n'
+            f',Bad date,tomorrow,1,6,\n'
+        )
+        err = StringIO()
+        call_command('import_tasks', path, batch_size=1, stdout=StringIO(), stderr=err)
+        
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertIn('Line 4: estimated_hours must be a whole number', err.getvalue())
+        self.assertIn('Line 5: due_date', err.getvalue())
+        # Scores and blocker counts are materialized once the import finishes
+        base = Task.objects.get(pk=base_id)
+        self.assertEqual(base.blocker_count, 1)
+        stored = [store.task_as_dict(task) for task in Task.objects.all()]
+        self.assertEqual(base.score_smart, TaskScorer().calculate_total_score(store.task_as_dict(base), stored))
+    
+    def test_ndjson_import_upserts_and_export_round_trips(self):
+        rows = [
+            {'id': '6f1c3c2e-4a7d-4a7e-9a55-0d6b2a1f6a10', 'title': 'First', 'due_date': '2030-01-01', 'estimated_hours': 2, 'importance': 5},
+            {'id': '6f1c3c2e-4a7d-4a7e-9a55-0d6b2a1f6a10', 'title': 'Renamed', 'due_date': '2030-01-02', 'estimated_hours': 3, 'importance': 6},
+            {'title': 'Second', 'due_date': '2030-02-01', 'estimated_hours': 1, 'importance': 7, 'dependencies': ['x']},
+        ]
+        body = ''.join(json.dumps(row) + '\n' for row in rows)
+        response = self.client.post('/api/tasks/import/', data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['imported'], 2)
+        self.assertEqual(Task.objects.get(pk=rows[0]['id']).title, 'Renamed')
+        
+        for export_type in ('csv', 'ndjson'):
+            response = self.client.get(f'/api/tasks/export/?type={export_type}')
+            exported = b''.join(response.streaming_content)
+            Task.objects.all().delete()
+            response = self.client.post(f'/api/tasks/import/?type={export_type}', data=exported, content_type='application/octet-stream')
+            self.assertEqual(response.json()['imported'], 2, exported)
+            self.assertEqual(
+                sorted(Task.objects.values_list('title', 'due_date', 'estimated_hours', 'importance', 'dependencies')),
+                [('Renamed', date(2030, 1, 2), 3, 6, []), ('Second', date(2030, 2, 1), 1, 7, ['x'])],
+            )
+    
+    def test_import_rescores_only_what_it_touched(self):
+        ids = [str(uuid.UUID(int=i)) for i in range(1, 11)]
+        due = (self.today + timedelta(days=2)).isoformat()
+        row = lambda i, dependencies=(): {'id': ids[i], 'title': f'T{i}', 'due_date': due, 'estimated_hours': 2,
+                                         'importance': 5, 'dependencies': list(dependencies)}
+        # ids[0] is named before it exists; ids[2] gives up its dependency on ids[1]
+        bulk.import_tasks(enumerate([row(1, [ids[0]]), row(2, [ids[1]]), row(3, [ids[1]])] + [row(i) for i in range(4, 10)], 1))
+        with mock.patch('tasks.store.rescore_tasks', wraps=store.rescore_tasks) as rescore:
+            bulk.import_tasks(enumerate([row(0), row(2)], 1))
+        rescored = {task_id for call in rescore.call_args_list for task_id in call.args[0]}
+        self.assertEqual(rescored, {ids[0], ids[1], ids[2]})
+        
+        fields = ['id', 'blocker_count'] + store.SCORE_FIELDS
+        incremental = sorted(Task.objects.values_list(*fields))
+        store.rescore_all()
+        self.assertEqual(incremental, sorted(Task.objects.values_list(*fields)))
+        self.assertEqual(Task.objects.get(pk=ids[0]).blocker_count, 1)
+        self.assertEqual(Task.objects.get(pk=ids[1]).blocker_count, 1)
+    
+    def test_import_reports_values_the_database_cannot_store(self):
+        rows = [
+            {'title': 'Fine', 'due_date': '2030-01-01', 'estimated_hours': 2, 'importance': 5},
+            {'title': 'Huge', 'due_date': '2030-01-01', 'estimated_hours': 10 ** 23, 'importance': 5},
+            {'title': 'Huge float', 'due_date': '2030-01-01', 'estimated_hours': 1e30, 'importance': 5},
+        ]
+        body = ''.join(json.dumps(row) + '\n' for row in rows)
+        response = self.client.post('/api/tasks/import/', data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['imported'], 1)
+        self.assertEqual([(error['line'], error['field']) for error in response.json()['errors']],
+                         [(2, 'estimated_hours'), (3, 'estimated_hours')])
+    
+    def test_written_batches_are_rescored_when_a_later_batch_fails(self):
+        row = lambda i: {'title': f'T{i}', 'due_date': (self.today + timedelta(days=i)).isoformat(), 'estimated_hours': 1, 'importance': 5}
+        real_write = bulk._write_batch
+        
+        def write(batch):
+            # The first batch is written; the second fails
+            if Task.objects.exists():
+                raise RuntimeError('disk full')
+            return real_write(batch)
+        
+        with mock.patch('tasks.bulk._write_batch', side_effect=write):
+            with self.assertRaises(RuntimeError):
+                bulk.import_tasks(enumerate([row(i) for i in range(4)], 1), batch_size=2)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertTrue(store.scores_are_current())
+    
+    def test_import_rejects_unusable_bodies(self):
+        response = self.client.post('/api/tasks/import/', data='{}', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/tasks/import/', data='{"title": \n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['line'], 1)
+        self.assertFalse(Task.objects.exists())
+    
+    def test_sqlite_pragmas_applied(self):
+        from django.db import connection
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+class AnalysisSessionTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.backlog = [
+            {'id': 'a', 'title': 'A', 'due_date': (today + timedelta(days=2)).isoformat(), 'estimated_hours': 3, 'importance': 6},
+            {'id': 'b', 'title': 'B', 'due_date': (today + timedelta(days=9)).isoformat(), 'estimated_hours': 1, 'importance': 4, 'dependencies': ['a']},
+            {'id': 'c', 'title': 'C', 'due_date': today.isoformat(), 'estimated_hours': 12, 'importance': 8, 'dependencies': ['b']},
+            {'id': 'd', 'title': 'D', 'due_date': (today + timedelta(days=2)).isoformat(), 'estimated_hours': 3, 'importance': 6},
+        ]
+        self.addCleanup(sessions.clear)
+    
+    def create(self):
+        response = self.client.post('/api/tasks/sessions/?strategy=all', data=self.backlog, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+    
+    def patch(self, session, delta):
+        return self.client.patch(
+            f'/api/tasks/sessions/{session["session_id"]}/', data=json.dumps(delta), content_type='application/json'
+        )
+    
+    def analyze(self, backlog):
+        data = self.client.post('/api/tasks/analyze/?strategy=all', data=backlog, content_type='application/json').json()
+        return {strategy: [data['tasks'][i]['id'] for i in order] for strategy, order in data['rankings'].items()}
+    
+    def test_patches_match_full_analysis(self):
+        session = self.create()
+        rankings = session['rankings']
+        self.assertEqual(rankings, self.analyze(self.backlog))
+        
+        today = timezone.now().date()
+        delta = {
+            'version': 0,
+            'add': [{'id': 'e', 'title': 'E', 'due_date': today.isoformat(), 'estimated_hours': 1, 'importance': 9, 'dependencies': ['b', 'c']}],
+            'update': [{'id': 'd', 'importance': 10}],
+            'remove': ['a'],
+        }
+        response = self.patch(session, delta)
+        self.assertEqual(response.status_code, 200, response.content)
+        patch = response.json()
+        self.assertFalse(patch['full'])
+        self.assertEqual(patch['removed'], ['a'])
+        # b and c each gained a blocker, so they are rescored without being edited
+        self.assertEqual({task['id'] for task in patch['tasks']}, {'b', 'c', 'd', 'e'})
+        
+        for strategy, change in patch['rankings'].items():
+            order = [task_id for task_id in rankings[strategy] if task_id not in change['remove']]
+            for index, task_id in change['insert']:
+                order.insert(index, task_id)
+            rankings[strategy] = order
+        
+        backlog = [dict(task, importance=10) if task['id'] == 'd' else task for task in self.backlog[1:]] + delta['add']
+        self.assertEqual(rankings, self.analyze(backlog))
+    
+    def test_rejected_deltas_change_nothing(self):
+        session = self.create()
+        self.assertEqual(self.patch(session, {'remove': ['a'], 'update': [{'id': 'b', 'importance': 11}]}).status_code, 400)
+        self.assertEqual(self.patch(session, {'add': [dict(self.backlog[0])]}).status_code, 400)
+        self.assertEqual(self.patch(session, {'version': 3, 'remove': ['a']}).status_code, 409)
+        
+        current = self.client.get(f'/api/tasks/sessions/{session["session_id"]}/').json()
+        self.assertEqual((current['version'], current['rankings']), (0, session['rankings']))
+        
+        missing_id = self.client.post('/api/tasks/sessions/', data=[{'title': 'No id', 'due_date': '2030-01-01', 'estimated_hours': 1, 'importance': 5}], content_type='application/json')
+        self.assertEqual(missing_id.status_code, 400)
+    
+    def test_sessions_are_bounded_and_expire(self):
+        with self.settings(TASK_SESSION_LIMIT=2):
+            first, second, third = self.create(), self.create(), self.create()
+        self.assertEqual(self.patch(first, {}).status_code, 404)
+        self.assertEqual(self.patch(third, {}).status_code, 200)
+        
+        with self.settings(TASK_SESSION_IDLE_SECONDS=0):
+            self.assertEqual(self.patch(second, {}).status_code, 404)
+    
+    def test_date_change_resends_full_rankings(self):
+        session = self.create()
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=3)):
+            patch = self.patch(session, {'update': [{'id': 'a', 'title': 'A2'}]}).json()
+            self.assertTrue(patch['full'])
+            backlog = [dict(self.backlog[0], title='A2')] + self.backlog[1:]
+            self.assertEqual(patch['rankings'], self.analyze(backlog))
+
+class ScheduleSimulationTests(TestCase):
+    start = date(2026, 1, 5)
+    
+    def backlog(self):
+        return [
+            {'id': 'a', 'title': 'A', 'due_date': self.start.isoformat(), 'estimated_hours': 8, 'importance': 5},
+            {'id': 'b', 'title': 'B', 'due_date': (self.start + timedelta(days=1)).isoformat(), 'estimated_hours': 4,
+             'importance': 5, 'dependencies': ['a']},
+            {'id': 'c', 'title': 'C', 'due_date': (self.start + timedelta(days=30)).isoformat(), 'estimated_hours': 2,
+             'importance': 9, 'dependencies': ['elsewhere']},
+        ]
+    
+    def test_schedule_over_several_days(self):
+        response = self.client.post(
+            f'/api/tasks/simulate/?capacity=4&start={self.start}', data=self.backlog(), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        # a takes two 4-hour days; b is waiting on a, and c's missing dependency counts as done
+        self.assertEqual(
+            [(task['id'], task['start_date'], task['completion_date'], task['days_late']) for task in data['schedule']],
+            [('a', '2026-01-05', '2026-01-06', 1), ('b', '2026-01-07', '2026-01-07', 1), ('c', '2026-01-08', '2026-01-08', 0)]
+        )
+        self.assertEqual(data['late_tasks'], ['a', 'b'])
+        self.assertEqual(data['finish_date'], '2026-01-08')
+        self.assertEqual(data['dangling_dependencies'], {'c': ['elsewhere']})
+    
+    def test_cycles_are_unschedulable(self):
+        tasks = self.backlog() + [
+            {'id': 'x', 'title': 'X', 'due_date': self.start, 'estimated_hours': 1, 'importance': 5, 'dependencies': ['y']},
+            {'id': 'y', 'title': 'Y', 'due_date': self.start, 'estimated_hours': 1, 'importance': 5, 'dependencies': ['x']},
+            {'id': 'z', 'title': 'Z', 'due_date': self.start, 'estimated_hours': 1, 'importance': 5, 'dependencies': ['y']},
+        ]
+        validate_tasks(tasks)
+        data = ScheduleSimulator(get_weights_for_strategy('smart'), 8).simulate(tasks, self.start)
+        self.assertEqual([task['id'] for task in data['schedule']], ['a', 'b', 'c'])
+        self.assertEqual(data['unschedulable'], ['x', 'y', 'z'])
+        self.assertEqual(data['cycles'], [['x', 'y']])
+    
+    def test_matches_rescoring_every_ready_task_each_day(self):
+        tasks = [
+            {'id': str(i), 'title': f'Task {i}', 'due_date': self.start + timedelta(days=(i * 7) % 130 - 10),
+             'estimated_hours': (i * 5) % 13 + 0.5, 'importance': i % 10 + 1,
+             'dependencies': [str((i * 3) // 5)] if i % 3 == 0 and i else []}
+            for i in range(300)
+        ]
+        graph = TaskGraph(tasks)
+        for strategy in ('smart', 'deadline', 'custom:1:0:0:0'):
+            weights = resolve_strategies([strategy])[0][1]
+            scorer = TaskScorer(weights)
+            columns = scorer.component_columns(tasks)
+            simulated = ScheduleSimulator(weights, 6).simulate(tasks, self.start)['schedule']
+            
+            in_degree = list(graph.in_degree)
+            ready = {i for i in range(len(tasks)) if in_degree[i] == 0}
+            hours = 0
+            expected = []
+            while ready:
+                urgency_of = UrgencyTable(self.start + timedelta(days=int(hours // 6)))
+                score = lambda i: scorer.combine({
+                    'urgency': urgency_of(tasks[i]['due_date']), 'importance': columns['importance'][i],
+                    'effort': columns['effort'][i], 'dependencies': columns['dependencies'][i],
+                })
+                best = min(ready, key=lambda i: (-score(i), i))
+                expected.append((tasks[best]['id'], score(best)))
+                ready.remove(best)
+                hours += tasks[best]['estimated_hours']
+                for successor in graph.successors[best]:
+                    in_degree[successor] -= 1
+                    if in_degree[successor] == 0:
+                        ready.add(successor)
+            
+            self.assertEqual([(task['id'], task['priority_score']) for task in simulated], expected)
+    
+    def test_rejects_bad_parameters(self):
+        for query in ('capacity=0', 'capacity=25', 'capacity=lots', 'start=tomorrow', 'strategy=smart,fastest'):
+            response = self.client.post(f'/api/tasks/simulate/?{query}', data=self.backlog(), content_type='application/json')
+            self.assertEqual(response.status_code, 400, query)
+        
+        # Past date.max is a bad request, not a crash
+        huge = [{'title': 'Huge', 'due_date': self.start.isoformat(), 'estimated_hours': 100000, 'importance': 5}]
+        response = self.client.post('/api/tasks/simulate/?capacity=0.0001', data=huge, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('9999-12-31', response.json()['error'])
+    
+    def test_tasks_without_ids_are_named_alike_everywhere(self):
+        tasks = self.backlog()
+        del tasks[0]['id']
+        response = self.client.post(f'/api/tasks/simulate/?capacity=4&start={self.start}', data=tasks, content_type='application/json')
+        data = response.json()
+        self.assertEqual([task['id'] for task in data['schedule']], ['#0', 'b', 'c'])
+        self.assertEqual(data['late_tasks'], ['#0', 'b'])
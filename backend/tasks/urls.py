@@ -2,7 +2,19 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('tasks/', views.task_list, name='task-list'),
+    path('tasks/import/', views.import_tasks, name='import-tasks'),
+    path('tasks/export/', views.export_tasks, name='export-tasks'),
+    path('tasks/<uuid:pk>/', views.task_detail, name='task-detail'),
     path('tasks/analyze/', views.analyze_tasks, name='analyze-tasks'),
+    path('tasks/analyze/cache/', views.analysis_cache_stats, name='analysis-cache-stats'),
+    path('tasks/analyze/stream/', views.analyze_tasks_stream, name='analyze-tasks-stream'),
+    path('tasks/sessions/', views.create_analysis_session, name='create-analysis-session'),
+    path('tasks/sessions/<str:session_id>/', views.analysis_session, name='analysis-session'),
+    path('tasks/simulate/', views.simulate_schedule, name='simulate-schedule'),
     path('tasks/suggest/', views.suggest_tasks, name='suggest-tasks'),
+    path('async/tasks/analyze/', views.analyze_tasks_async, name='analyze-tasks-async'),
+    path('async/tasks/suggest/', views.suggest_tasks_async, name='suggest-tasks-async'),
+    path('metrics/', views.timing_metrics, name='timing-metrics'),
     path('info/', views.api_info, name='api-info'),
 ]
\ No newline at end of file
@@ -0,0 +1,120 @@
+import re
+from datetime import date
+
+REQUIRED_FIELDS = ('title', 'due_date', 'estimated_hours', 'importance')
+
+# Stop collecting after this many problems so a garbage payload cannot build a huge error list
+MAX_REPORTED_ERRORS = 1000
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}\Z')
+_NUMBER_TYPES = (int, float)  # Checked with type() so booleans are rejected
+
+def validate_task(index, task, parsed_dates=None):
+    """
+    Check one task and return a list of error dicts (empty if valid).
+    A valid due_date string is replaced with a date object in place, so the
+    scorer never parses it again. parsed_dates memoizes parsing across a batch.
+    """
+    if type(task) is not dict:
+        return [_error(index, None, 'must be an object')]
+    
+    errors = [_error(index, field, 'is required') for field in REQUIRED_FIELDS if field not in task]
+    
+    title = task.get('title')
+    if title is not None and (type(title) is not str or not title.strip()):
+        errors.append(_error(index, 'title', 'must be a non-empty string'))
+    
+    importance = task.get('importance')
+    if 'importance' in task and (type(importance) not in _NUMBER_TYPES or not 1 <= importance <= 10):
+        errors.append(_error(index, 'importance', 'must be a number between 1-10'))
+    
+    hours = task.get('estimated_hours')
+    if 'estimated_hours' in task and (type(hours) not in _NUMBER_TYPES or not hours > 0):
+        errors.append(_error(index, 'estimated_hours', 'must be a positive number'))
+    
+    if 'due_date' in task:
+        due_date = _parse_due_date(task['due_date'], parsed_dates if parsed_dates is not None else {})
+        if due_date is None:
+            errors.append(_error(index, 'due_date', 'must be a date in YYYY-MM-DD format'))
+        else:
+            task['due_date'] = due_date
+    
+    dependencies = task.get('dependencies')
+    if dependencies is not None and (type(dependencies) is not list or any(type(d) is not str for d in dependencies)):
+        errors.append(_error(index, 'dependencies', 'must be a list of task ids'))
+    
+    return errors
+
+def validate_tasks(tasks, max_errors=MAX_REPORTED_ERRORS):
+    """
+    Validate a whole payload in one pass, reporting every error with its task index.
+    Valid tasks take an inlined fast path; validate_task only runs to describe failures.
+    """
+    errors = []
+    parsed_dates = {}
+    number_types = _NUMBER_TYPES
+    
+    for index, task in enumerate(tasks):
+        try:
+            title = task['title']
+            due_date = task['due_date']
+            hours = task['estimated_hours']
+            importance = task['importance']
+            dependencies = task.get('dependencies')
+        except (KeyError, TypeError, AttributeError):
+            pass
+        else:
+            parsed = parsed_dates.get(due_date) if type(due_date) is str else None
+            if parsed is None and type(due_date) is str and due_date not in parsed_dates:
+                parsed = _parse_due_date(due_date, parsed_dates)
+            
+            if (
+                parsed is not None
+                and type(importance) in number_types and 1 <= importance <= 10
+                and type(hours) in number_types and hours > 0
+                and type(title) is str and title and not title.isspace()
+                and (dependencies is None or (
+                    type(dependencies) is list and not [d for d in dependencies if type(d) is not str]
+                ))
+            ):
+                task['due_date'] = parsed
+                continue
+        
+        task_errors = validate_task(index, task, parsed_dates)
+        if task_errors:
+            errors.extend(task_errors)
+            if len(errors) >= max_errors:
+                return errors[:max_errors]
+    return errors
+
+def error_response_data(errors):
+    """Response body for failed validation - 'error' summarises, 'errors' lists everything"""
+    first = errors[0]
+    location = f'Line {first["line"]}: ' if 'line' in first else ''
+    subject = f'Task {first["index"]}' if first['index'] is not None else 'Payload'
+    field = f' {first["field"]}' if first['field'] else ''
+    summary = f'{location}{subject}{field} {first["message"]}'
+    if len(errors) > 1:
+        summary += f' (and {len(errors) - 1} more error(s))'
+    return {'error': summary, 'errors': errors}
+
+def _error(index, field, message):
+    return {'index': index, 'field': field, 'message': message}
+
+def _parse_due_date(value, parsed_dates):
+    if type(value) is date:
+        return value
+    if type(value) is not str:
+        return None
+    
+    if value in parsed_dates:
+        return parsed_dates[value]
+    
+    parsed = None
+    if _ISO_DATE.match(value):
+        try:
+            parsed = date.fromisoformat(value)
+        except ValueError:
+            pass  # Well-formed but impossible, e.g. 2025-02-30
+    parsed_dates[value] = parsed
+    return parsed
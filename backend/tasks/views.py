@@ -1,75 +1,482 @@
+import asyncio
+import io
+from datetime import date
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
 from rest_framework import status
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
-from .scoring import TaskScorer, get_weights_for_strategy
+from . import bulk, cache, parallel, renderers, store
+from .sessions import AnalysisSession, DeltaError, sessions
+from .simulation import ScheduleOverflowError, ScheduleSimulator
+from .graph import TaskGraph
+from .instrumentation import metrics, span
+from .models import Task
+from .records import MultiScoredTask, ScoredTask
+from .serializers import TaskSerializer
+from .scoring import STRATEGY_WEIGHTS, TaskScorer, resolve_strategies, top_positions
+from .streaming import NDJSONError, StreamingAnalyzer, iter_ndjson, ndjson_lines
+from .validation import MAX_REPORTED_ERRORS, error_response_data, validate_task, validate_tasks
+
+DEFAULT_SUGGESTIONS = 3
+MAX_SUGGESTIONS = 100
+DEFAULT_DAILY_HOURS = 8
+
+def _ranking(scores, graph=None, limit=None):
+    """
+    Task positions best first, ties in input order - by score, or dependency-respecting when a graph is given.
+    With a limit only the first `limit` positions are returned.
+    """
+    with span('sort'):
+        if graph is not None:
+            order = graph.topological_order(scores)
+            return order if limit is None else order[:limit]
+        if limit is not None:
+            return top_positions(scores, limit)
+        return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+def _top_param(request):
+    """?top=k (or ?limit=k) as a positive int, None when absent; raises ValueError when malformed"""
+    value = request.GET.get('top', request.GET.get('limit'))
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError('top must be a positive integer')
+    return int(value)
+
+def _graph_summary(graph):
+    """Critical path and dangling references for order=topological responses"""
+    hours, path = graph.critical_path()
+    return {
+        'critical_path': {'task_ids': path, 'estimated_hours': hours},
+        'dangling_dependencies': graph.dangling
+    }
+
+def _multi_strategy_results(tasks, columns, strategies, graph=None, limit=None):
+    """
+    Score tasks under several strategies at once.
+    Each task appears once with a score per strategy; each ranking lists positions in 'tasks', best first.
+    With a limit each ranking keeps its best `limit` tasks and 'tasks' holds only tasks some ranking kept.
+    """
+    names = tuple(strategy for strategy, _ in strategies)
+    score_lists = []
+    rankings = {}
+    
+    for strategy, weights in strategies:
+        scores = TaskScorer(weights).combine_columns(columns)
+        score_lists.append(scores)
+        rankings[strategy] = _ranking(scores, graph, limit)
+    
+    if limit is None:
+        kept = range(len(tasks))
+    else:
+        # Renumber positions so rankings index the shortened 'tasks' list
+        kept = sorted(set().union(*rankings.values()))
+        renumbered = {position: i for i, position in enumerate(kept)}
+        rankings = {strategy: [renumbered[p] for p in ranking] for strategy, ranking in rankings.items()}
+    
+    scored_tasks = [
+        MultiScoredTask(tasks[i], names, tuple(scores[i] for scores in score_lists)) for i in kept
+    ]
+    
+    return {
+        'tasks': scored_tasks,
+        'rankings': rankings,
+        'strategies_used': list(names),
+        'total_tasks': len(tasks)
+    }
+
+def _analysis_job(request, tasks):
+    """
+    Check an /analyze/ payload's shape and query parameters.
+    Returns (error, job): error is a finished (data, status code, headers) 400 or None, and job is
+    (strategies, top, order, analysis cache, cache key, ETag) - the cache and its keys are None when
+    this payload is not cached. Nothing here touches the cache backend, so both views can use it.
+    """
+    # Validate input
+    if not isinstance(tasks, list):
+        return ({'error': 'Expected a list of tasks'}, status.HTTP_400_BAD_REQUEST, {}), None
+    
+    if len(tasks) == 0:
+        return ({'error': 'No tasks provided'}, status.HTTP_400_BAD_REQUEST, {}), None
+    
+    # Get strategies from query params - ?strategy=smart,fastest, ?strategy=all or custom:u:i:e:d
+    try:
+        strategies = resolve_strategies(request.GET.getlist('strategy'))
+    except ValueError as e:
+        return ({'error': str(e)}, status.HTTP_400_BAD_REQUEST, {}), None
+    
+    # ?top=k returns only the best k tasks; total_tasks still counts them all
+    try:
+        top = _top_param(request)
+    except ValueError as e:
+        return ({'error': str(e)}, status.HTTP_400_BAD_REQUEST, {}), None
+    
+    # ?order=topological puts every task after the tasks it depends on
+    order = request.GET.get('order', 'priority')
+    if order not in ('priority', 'topological'):
+        return ({'error': 'order must be "priority" or "topological"'}, status.HTTP_400_BAD_REQUEST, {}), None
+    
+    # Identical backlog, weights and date always give an identical ranking
+    analysis_cache = cache.get_analysis_cache(tasks)
+    cache_key = etag = None
+    if analysis_cache is not None:
+        with span('cache'):
+            cache_key = cache.analysis_key(
+                tasks, [weights for _, weights in strategies], strategies=[name for name, _ in strategies], order=order, top=top
+            )
+        etag = cache.etag_for(cache_key)
+    return None, (strategies, top, order, analysis_cache, cache_key, etag)
+
+def _not_modified(request, etag):
+    """The 304 for a request whose If-None-Match already holds this ETag, else None"""
+    if etag is not None and cache.etag_matches(request, etag):
+        cache.stats.record('not_modified')
+        return None, status.HTTP_304_NOT_MODIFIED, {'ETag': etag}
+    return None
+
+def _cache_hit(tasks, etag, cached):
+    """The response for a cache entry that was found, else None (and the miss is counted)"""
+    if cached is None:
+        cache.stats.record('misses')
+        return None
+    cache.stats.record('hits')
+    return cache.expand(cached, tasks), status.HTTP_200_OK, {'ETag': etag, 'X-Cache': 'HIT'}
+
+def _score_analysis(tasks, strategies, top, order, parallel=None):
+    """
+    Validate and rank a payload for _analysis_job's options.
+    Returns (data, status code); parallel defaults to TASK_SCORING_PARALLEL.
+    """
+    # Validate every task in one pass; due_date strings become date objects
+    with span('validate'):
+        errors = validate_tasks(tasks)
+    if errors:
+        return error_response_data(errors), status.HTTP_400_BAD_REQUEST
+    
+    graph = None
+    if order == 'topological':
+        with span('graph'):
+            graph = TaskGraph(tasks)
+            cycles = graph.cycles()
+        if cycles:
+            return (
+                {'error': 'Dependencies contain a cycle, so tasks cannot be ordered', 'cycles': cycles},
+                status.HTTP_400_BAD_REQUEST
+            )
+    
+    if len(strategies) > 1:
+        # Component scores are shared by every strategy - only the weighting differs
+        columns = TaskScorer().component_columns(tasks)
+        data = _multi_strategy_results(tasks, columns, strategies, graph, top)
+    else:
+        strategy, weights = strategies[0]
+        scorer = TaskScorer(weights)
+        if parallel is None:
+            parallel = getattr(settings, 'TASK_SCORING_PARALLEL', False)
+        if graph is None:
+            ranked = scorer.rank_tasks(tasks, parallel=parallel, limit=top)
+        else:
+            scores = scorer.combine_columns(scorer.component_columns(tasks))
+            ranked = [(scores[i], i) for i in _ranking(scores, graph, top)]
+        # Tasks in ranked order; ScoredTask merges in the score only when rendered
+        sorted_tasks = [ScoredTask(tasks[i], score, strategy) for score, i in ranked]
+        
+        data = {
+            'tasks': sorted_tasks,
+            'strategy_used': strategy,
+            'total_tasks': len(tasks)
+        }
+    
+    if graph is not None:
+        data['order'] = order
+        data.update(_graph_summary(graph))
+    return data, status.HTTP_200_OK
+
+def _score_in_worker(tasks, strategies, top, order):
+    """
+    Process pool entry point for the async view. Sends back the ranking in its
+    compact cache form, so only positions and scores are pickled - not the tasks.
+    """
+    # The pool is the parent's; a worker must not submit to it
+    data, status_code = _score_analysis(tasks, strategies, top, order, parallel=False)
+    if status_code == status.HTTP_200_OK:
+        data = cache.compact(data, tasks)
+    return data, status_code
 
+def _run_analysis(request, tasks):
+    """
+    Validate, score and rank a parsed /analyze/ payload.
+    Returns (data, status code, headers); data is None for a 304.
+    Query parameters and If-None-Match are read from request.
+    """
+    error, job = _analysis_job(request, tasks)
+    if error is not None:
+        return error
+    strategies, top, order, analysis_cache, cache_key, etag = job
+    
+    if analysis_cache is not None:
+        result = _not_modified(request, etag) or _cache_hit(tasks, etag, analysis_cache.get(cache_key))
+        if result is not None:
+            return result
+    
+    data, status_code = _score_analysis(tasks, strategies, top, order)
+    if analysis_cache is None or status_code != status.HTTP_200_OK:
+        return data, status_code, {}
+    
+    analysis_cache.set(cache_key, cache.compact(data, tasks))
+    return data, status_code, {'ETag': etag, 'X-Cache': 'MISS'}
+
+@gzip_page
 @api_view(['POST'])
 def analyze_tasks(request):
     """
     Analyze and prioritize tasks based on multiple factors
     Accepts a list of tasks and returns them sorted by priority score
+    Several strategies (or 'all') return one ranking per strategy from a single scoring pass
     """
     try:
-        tasks = request.data
+        with span('parse'):
+            try:
+                tasks = request.data
+            except ParseError as e:
+                return Response({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        data, status_code, headers = _run_analysis(request, tasks)
+        return Response(data, status=status_code, headers=headers)
         
-        # Validate input
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@gzip_page
+@api_view(['POST'])
+def create_analysis_session(request):
+    """
+    Upload a backlog once and get back its rankings plus a session id.
+    Later edits go to PATCH /api/tasks/sessions/<id>/ as deltas.
+    """
+    try:
+        try:
+            tasks = request.data
+        except ParseError as e:
+            return Response({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
         if not isinstance(tasks, list):
+            return Response({'error': 'Expected a list of tasks'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            strategies = resolve_strategies(request.GET.getlist('strategy'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        session = AnalysisSession(strategies)
+        try:
+            with span('session'):
+                session.load(tasks)
+        except DeltaError as e:
+            return Response(error_response_data(e.errors), status=status.HTTP_400_BAD_REQUEST)
+        sessions.add(session)
+        return Response(session.full_data(), status=status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@gzip_page
+@api_view(['GET', 'PATCH', 'DELETE'])
+def analysis_session(request, session_id):
+    """
+    GET returns the whole session, DELETE drops it, and PATCH applies a
+    {"add": [...], "update": [...], "remove": [...], "version": n} delta and
+    returns a ranking patch. An unknown or expired session is a 404, after
+    which the client uploads its backlog again.
+    """
+    if request.method == 'DELETE':
+        sessions.remove(session_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    session = sessions.get(session_id)
+    if session is None:
+        return Response({'error': 'Session not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+    
+    with session.lock:
+        if request.method == 'GET':
+            return Response(session.full_data())
+        
+        try:
+            delta = request.data
+        except ParseError as e:
+            return Response({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(delta, dict):
+            return Response({'error': 'Expected an object with add, update and remove lists'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # A client that missed a response must resync rather than patch a stale ranking
+        if 'version' in delta and delta['version'] != session.version:
             return Response(
-                {'error': 'Expected a list of tasks'}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Session has changed since this version', 'version': session.version},
+                status=status.HTTP_409_CONFLICT
             )
         
+        try:
+            with span('session'):
+                data = session.apply(delta.get('add'), delta.get('update'), delta.get('remove'))
+        except DeltaError as e:
+            return Response(error_response_data(e.errors), status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+def _simulation_params(request):
+    """(daily hours, start date) from ?capacity= and ?start=; raises ValueError when malformed"""
+    try:
+        daily_hours = float(request.GET.get('capacity', DEFAULT_DAILY_HOURS))
+    except ValueError:
+        raise ValueError('capacity must be a number of hours per day')
+    if not 0 < daily_hours <= 24:
+        raise ValueError('capacity must be more than 0 and at most 24 hours per day')
+    if daily_hours.is_integer():
+        daily_hours = int(daily_hours)
+    
+    start = request.GET.get('start')
+    if start is None:
+        return daily_hours, timezone.now().date()
+    try:
+        return daily_hours, date.fromisoformat(start)
+    except ValueError:
+        raise ValueError('start must be a date in YYYY-MM-DD format')
+
+@gzip_page
+@api_view(['POST'])
+def simulate_schedule(request):
+    """
+    What-if schedule: work through the backlog in priority order at ?capacity=
+    hours a day (default 8) from ?start= (default today), and report when each
+    task would be done and which ones would be late
+    """
+    try:
+        try:
+            tasks = request.data
+        except ParseError as e:
+            return Response({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(tasks, list):
+            return Response({'error': 'Expected a list of tasks'}, status=status.HTTP_400_BAD_REQUEST)
         if len(tasks) == 0:
+            return Response({'error': 'No tasks provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            strategies = resolve_strategies(request.GET.getlist('strategy'))
+            daily_hours, start_date = _simulation_params(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(strategies) > 1:
+            return Response({'error': 'A simulation follows one strategy'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with span('validate'):
+            errors = validate_tasks(tasks)
+        if errors:
+            return Response(error_response_data(errors), status=status.HTTP_400_BAD_REQUEST)
+        
+        strategy, weights = strategies[0]
+        with span('simulate'):
+            try:
+                data = ScheduleSimulator(weights, daily_hours).simulate(tasks, start_date)
+            except ScheduleOverflowError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data['strategy_used'] = strategy
+        return Response(data)
+        
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+def analysis_cache_stats(request):
+    """Hit/miss counters for the /analyze/ result cache in this process"""
+    return Response({
+        'enabled': cache.get_analysis_cache() is not None,
+        **cache.stats.as_dict()
+    })
+
+@api_view(['GET'])
+def timing_metrics(request):
+    """Rolling per-stage latency histograms (TASK_INSTRUMENTATION) - local clients only"""
+    allowed = getattr(settings, 'TASK_METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        return Response({'error': 'Metrics are only available locally'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'enabled': getattr(settings, 'TASK_INSTRUMENTATION', False),
+        'views': metrics.as_dict()
+    })
+
+@gzip_page
+@api_view(['POST'])
+def analyze_tasks_stream(request):
+    """
+    Streaming variant of analyze_tasks for very large payloads
+    Accepts newline-delimited JSON (one task per line) and streams scored tasks back as NDJSON.
+    With ?top=k only the best k tasks are kept and returned.
+    """
+    try:
+        try:
+            strategies = resolve_strategies(request.GET.getlist('strategy'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(strategies) > 1:
             return Response(
-                {'error': 'No tasks provided'}, 
+                {'error': 'The streaming endpoint ranks with one strategy at a time'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        strategy, weights = strategies[0]
         
-        # Validate each task
-        for i, task in enumerate(tasks):
-            if not all(k in task for k in ['title', 'due_date', 'estimated_hours', 'importance']):
-                return Response(
-                    {'error': f'Task {i} missing required fields. Each task must have title, due_date, estimated_hours, and importance'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validate importance range
-            if not (1 <= task['importance'] <= 10):
-                return Response(
-                    {'error': f'Task "{task["title"]}" has invalid importance. Must be between 1-10'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validate estimated hours
-            if task['estimated_hours'] <= 0:
-                return Response(
-                    {'error': f'Task "{task["title"]}" has invalid estimated hours. Must be positive'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        try:
+            top_k = _top_param(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get strategy from query params
-        strategy = request.GET.get('strategy', 'smart')
-        weights = get_weights_for_strategy(strategy)
+        analyzer = StreamingAnalyzer(TaskScorer(weights), top_k)
         
-        # Calculate scores for all tasks
-        scorer = TaskScorer(weights)
-        scored_tasks = []
+        # Read request.stream line by line instead of materializing request.data
+        stream = request.stream if request.stream is not None else []
+        errors = []
+        parsed_dates = {}
+        index = 0
+        try:
+            for line_number, task in iter_ndjson(stream):
+                task_errors = validate_task(index, task, parsed_dates)
+                index += 1
+                if task_errors:
+                    errors.extend(dict(error, line=line_number) for error in task_errors)
+                    if len(errors) >= MAX_REPORTED_ERRORS:
+                        break
+                elif not errors:
+                    analyzer.add(task)
+        except NDJSONError as e:
+            errors.append({'index': None, 'field': None, 'message': e.message, 'line': e.line_number})
         
-        for task in tasks:
-            score = scorer.calculate_total_score(task, tasks)
-            task_with_score = task.copy()
-            task_with_score['priority_score'] = score
-            task_with_score['strategy_used'] = strategy
-            scored_tasks.append(task_with_score)
+        if errors:
+            return Response(error_response_data(errors), status=status.HTTP_400_BAD_REQUEST)
         
-        # Sort by priority score (descending)
-        sorted_tasks = sorted(scored_tasks, key=lambda x: x['priority_score'], reverse=True)
+        if analyzer.total_tasks == 0:
+            return Response(
+                {'error': 'No tasks provided'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response({
-            'tasks': sorted_tasks,
-            'strategy_used': strategy,
-            'total_tasks': len(sorted_tasks)
-        })
+        response = StreamingHttpResponse(
+            ndjson_lines(analyzer.finish(), strategy),
+            content_type='application/x-ndjson'
+        )
+        response['X-Total-Tasks'] = str(analyzer.total_tasks)
+        response['X-Strategy-Used'] = strategy
+        return response
         
     except Exception as e:
         return Response(
@@ -77,47 +484,164 @@ def analyze_tasks(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@gzip_page
+@api_view(['GET', 'POST'])
+def task_list(request):
+    """List stored tasks or create a new one"""
+    if request.method == 'POST':
+        serializer = TaskSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        task = store.save_task(serializer)
+        return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+    
+    store.refresh_stale_scores()
+    strategy = request.GET.get('strategy', 'smart')
+    tasks = Task.objects.order_by(f'-{store.score_field_for_strategy(strategy)}', 'due_date', 'id')
+    return Response(TaskSerializer(tasks, many=True).data)
+
+def _bulk_type(request, default=None):
+    """'csv' or 'ndjson' from ?type=, else from the Content-Type; None if neither"""
+    requested = request.GET.get('type')
+    if requested:
+        return requested if requested in bulk.FORMATS else None
+    content_type = request.content_type or ''
+    if content_type.startswith('text/csv'):
+        return 'csv'
+    if content_type.startswith(('application/x-ndjson', 'application/jsonl')):
+        return 'ndjson'
+    return default
+
+@api_view(['POST'])
+def import_tasks(request):
+    """
+    Bulk-load stored tasks from a CSV or NDJSON request body.
+    Rows are validated and written in batches; rows whose id is already
+    stored update that task. Invalid rows are skipped and reported by line.
+    """
+    try:
+        file_format = _bulk_type(request)
+        if file_format is None:
+            return Response(
+                {'error': 'Send text/csv or application/x-ndjson, or pass ?type=csv|ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Rows are read from request.stream as they are imported, never as one request.data
+        stream = request.stream if request.stream is not None else io.BytesIO()
+        batch_size = getattr(settings, 'TASK_IMPORT_BATCH_SIZE', bulk.DEFAULT_BATCH_SIZE)
+        with span('import'):
+            result = bulk.import_tasks(bulk.iter_rows(stream, file_format), batch_size)
+        
+        if result['errors'] and not result['imported']:
+            return Response(
+                dict(error_response_data(result['errors']), invalid=result['invalid']),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+        
+    except Exception as e:
+        return Response(
+            {'error': f'Internal server error: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@gzip_page
+@api_view(['GET'])
+def export_tasks(request):
+    """Stream every stored task as CSV or NDJSON (?type=, default csv)"""
+    file_format = _bulk_type(request, default='csv')
+    if file_format is None:
+        return Response({'error': 'type must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    batch_size = getattr(settings, 'TASK_IMPORT_BATCH_SIZE', bulk.DEFAULT_BATCH_SIZE)
+    response = StreamingHttpResponse(
+        bulk.export_lines(file_format, batch_size),
+        content_type='text/csv' if file_format == 'csv' else 'application/x-ndjson'
+    )
+    response['Content-Disposition'] = f'attachment; filename="tasks.{file_format}"'
+    return response
+
+@api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
+def task_detail(request, pk):
+    """Retrieve, update or delete a stored task"""
+    try:
+        task = Task.objects.get(pk=pk)
+    except Task.DoesNotExist:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'GET':
+        store.refresh_stale_scores()
+        return Response(TaskSerializer(task).data)
+    
+    if request.method == 'DELETE':
+        store.delete_task(task)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    serializer = TaskSerializer(task, data=request.data, partial=request.method == 'PATCH')
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    task = store.save_task(serializer)
+    return Response(TaskSerializer(task).data)
+
+def _suggestion_reason(task, today):
+    """Explain in a sentence why a stored task ranks highly"""
+    reasons = []
+    if task.due_date < today:
+        reasons.append('Past due')
+    elif task.due_date == today:
+        reasons.append('Due today')
+    elif task.urgency_score >= 0.6:
+        reasons.append(f'Due soon ({task.due_date.isoformat()})')
+    
+    if task.importance >= 8:
+        reasons.append(f'High importance ({task.importance}/10)')
+    if task.effort_score >= 1.0:
+        reasons.append(f'Quick win - only {task.estimated_hours} hour(s) estimated')
+    if task.dependency_score > 0.5:
+        reasons.append('Blocking other tasks')
+    
+    return '; '.join(reasons) or 'Best overall balance of urgency, importance and effort'
+
+def _suggestion_data(tasks, strategy, total_tasks):
+    """Response body for the suggest views"""
+    field = store.score_field_for_strategy(strategy)
+    today = timezone.now().date()
+    
+    suggestions = [
+        {
+            'id': str(task.id),
+            'title': task.title,
+            'reason': _suggestion_reason(task, today),
+            'priority_score': getattr(task, field),
+            'due_date': task.due_date.isoformat(),
+            'estimated_hours': task.estimated_hours,
+            'importance': task.importance
+        }
+        for task in tasks
+    ]
+    
+    return {
+        'suggestions': suggestions,
+        'message': f'Top {len(suggestions)} recommended tasks for today' if suggestions else 'No stored tasks yet',
+        'strategy_used': strategy,
+        'total_tasks': total_tasks
+    }
+
 @api_view(['GET'])
 def suggest_tasks(request):
     """
-    Suggest top 3 tasks to work on today
-    This is a simplified version that would typically work with stored tasks
+    Suggest top 3 tasks (or ?top=k) to work on today
+    Reads stored tasks ordered by their materialized score for the requested strategy
     """
     try:
-        # In a real application, this would fetch tasks from database
-        # For this assignment, we'll return sample suggestions
-        
-        sample_suggestions = [
-            {
-                'title': 'Fix critical login bug',
-                'reason': 'High importance (9/10) and blocking user access',
-                'priority_score': 0.92,
-                'due_date': '2025-11-25',
-                'estimated_hours': 4,
-                'importance': 9
-            },
-            {
-                'title': 'Complete project documentation',
-                'reason': 'Quick win - only 2 hours estimated and due tomorrow',
-                'priority_score': 0.78,
-                'due_date': '2025-11-26',
-                'estimated_hours': 2,
-                'importance': 7
-            },
-            {
-                'title': 'Setup production monitoring',
-                'reason': 'Blocks deployment of 3 other features',
-                'priority_score': 0.71,
-                'due_date': '2025-11-28',
-                'estimated_hours': 6,
-                'importance': 8
-            }
-        ]
-        
-        return Response({
-            'suggestions': sample_suggestions,
-            'message': 'Top 3 recommended tasks for today'
-        })
+        strategy = request.GET.get('strategy', 'smart')
+        try:
+            top = min(_top_param(request) or DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = store.top_tasks(strategy, limit=top)
+        return Response(_suggestion_data(tasks, strategy, store.stored_task_count(tasks, top)))
         
     except Exception as e:
         return Response(
@@ -125,6 +649,100 @@ def suggest_tasks(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def _json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    """Response encoded by the API's JSON renderer, for the async views that bypass DRF"""
+    if data is None:
+        response = HttpResponse(status=status_code)
+    else:
+        response = HttpResponse(renderers.dumps(data), status=status_code, content_type='application/json')
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
+
+def _async_csrf_exempt(view):
+    # django.views.decorators.csrf.csrf_exempt only wraps coroutine views from Django 5.0,
+    # so mark the view directly - DRF views are CSRF-exempt in the same way
+    view.csrf_exempt = True
+    return view
+
+# gzip_page only wraps coroutine views from Django 5.0, so async views call the middleware's
+# Accept-Encoding negotiation directly
+_gzip = GZipMiddleware(lambda request: None)
+
+@_async_csrf_exempt
+async def analyze_tasks_async(request):
+    """
+    ASGI-native analyze_tasks - same query parameters, responses and cache.
+    The cache is read and written with its async methods. Payloads of TASK_ASYNC_OFFLOAD_THRESHOLD
+    tasks or more are scored in the worker process pool (see tasks.parallel), since scoring is
+    CPU-bound and a thread would hold the GIL; smaller ones are scored on the event loop.
+    """
+    if request.method != 'POST':
+        return _json_response({'detail': f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    try:
+        try:
+            with span('parse'):
+                tasks = renderers.loads(request.body)
+        except ValueError as e:
+            return _json_response({'detail': f'JSON parse error - {e}'}, status.HTTP_400_BAD_REQUEST)
+        
+        error, job = _analysis_job(request, tasks)
+        if error is not None:
+            return _json_response(*error)
+        strategies, top, order, analysis_cache, cache_key, etag = job
+        
+        result = None
+        if analysis_cache is not None:
+            result = _not_modified(request, etag) or _cache_hit(tasks, etag, await analysis_cache.aget(cache_key))
+        
+        if result is None:
+            if len(tasks) >= getattr(settings, 'TASK_ASYNC_OFFLOAD_THRESHOLD', 500):
+                loop = asyncio.get_running_loop()
+                data, status_code = await loop.run_in_executor(
+                    parallel.get_pool(), _score_in_worker, tasks, strategies, top, order
+                )
+                if status_code == status.HTTP_200_OK:
+                    data = cache.expand(data, tasks)
+            else:
+                data, status_code = _score_analysis(tasks, strategies, top, order)
+            
+            headers = {}
+            if analysis_cache is not None and status_code == status.HTTP_200_OK:
+                await analysis_cache.aset(cache_key, cache.compact(data, tasks))
+                headers = {'ETag': etag, 'X-Cache': 'MISS'}
+            result = data, status_code, headers
+        
+        with span('render'):
+            response = _json_response(*result)
+        return _gzip.process_response(request, response)
+        
+    except Exception as e:
+        return _json_response(
+            {'error': f'Internal server error: {str(e)}'},
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def suggest_tasks_async(request):
+    """ASGI-native suggest_tasks - stored tasks are read with the async ORM"""
+    if request.method not in ('GET', 'HEAD'):
+        return _json_response({'detail': f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    try:
+        strategy = request.GET.get('strategy', 'smart')
+        try:
+            top = min(_top_param(request) or DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS)
+        except ValueError as e:
+            return _json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+        tasks = await store.atop_tasks(strategy, limit=top)
+        return _json_response(_suggestion_data(tasks, strategy, await store.astored_task_count(tasks, top)))
+        
+    except Exception as e:
+        return _json_response(
+            {'error': f'Internal server error: {str(e)}'},
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
 @api_view(['GET'])
 def api_info(request):
     """API information endpoint"""
@@ -132,9 +750,26 @@ def api_info(request):
         'name': 'Smart Task Analyzer API',
         'version': '1.0',
         'endpoints': {
-            'POST /api/tasks/analyze/': 'Analyze and prioritize tasks',
-            'GET /api/tasks/suggest/': 'Get task suggestions for today',
+            'POST /api/tasks/analyze/': 'Analyze and prioritize tasks (?order=topological keeps dependencies first, ?top=k returns the best k)',
+            'GET /api/tasks/analyze/cache/': 'Result cache hit/miss counters',
+            'GET /api/metrics/': 'Per-stage request timing histograms (local clients, TASK_INSTRUMENTATION)',
+            'POST /api/tasks/sessions/': 'Upload a backlog once for incremental re-ranking (same ?strategy= options as analyze)',
+            'GET, PATCH, DELETE /api/tasks/sessions/<id>/': 'Read a session, apply an add/update/remove delta (returns a ranking patch) or drop it',
+            'POST /api/tasks/simulate/': 'What-if schedule in priority order: completion dates and late tasks (?capacity=hours per day, ?start=YYYY-MM-DD)',
+            'POST /api/tasks/analyze/stream/': 'Analyze newline-delimited JSON tasks, streaming results (optional ?top=k)',
+            'GET /api/tasks/suggest/': 'Get task suggestions for today from stored tasks (?top=k, default 3)',
+            'POST /api/async/tasks/analyze/': 'ASGI-native analyze (large jobs run off the event loop)',
+            'GET /api/async/tasks/suggest/': 'ASGI-native suggest using the async ORM',
+            'GET, POST /api/tasks/': 'List or create stored tasks',
+            'GET, PUT, PATCH, DELETE /api/tasks/<id>/': 'Retrieve, update or delete a stored task',
+            'POST /api/tasks/import/': 'Bulk-load stored tasks from a CSV or NDJSON body (upserts by id)',
+            'GET /api/tasks/export/': 'Stream every stored task as CSV or NDJSON (?type=csv|ndjson)',
             'GET /api/info/': 'API information'
         },
-        'strategies': ['smart', 'fastest', 'impact', 'deadline']
+        'strategies': list(STRATEGY_WEIGHTS),
+        'strategy_options': {
+            'all': 'Rank with every named strategy in one request',
+            'smart,impact': 'Comma-separate (or repeat ?strategy=) to rank with several strategies',
+            'custom:<urgency>:<importance>:<effort>:<dependencies>': 'Custom weight vector, e.g. custom:0.5:0.3:0.1:0.1'
+        }
     })
\ No newline at end of file
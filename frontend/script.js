@@ -1,5 +1,8 @@
 // Smart Task Analyzer - Frontend JavaScript
 let tasks = [];
+let lastAnalysis = null; // Rankings for every strategy from the latest analysis
+let session = null; // Server-side analysis session: { id, version }
+let pendingDelta = { add: [], remove: [] }; // Edits not yet sent to the session
 
 document.addEventListener('DOMContentLoaded', function() {
     initializeApp();
@@ -15,6 +18,7 @@ function initializeApp() {
     const strategySelect = document.getElementById('strategy');
     if (strategySelect) {
         strategySelect.addEventListener('change', updateStrategyInfo);
+        strategySelect.addEventListener('change', showCachedRanking);
     }
     updateStrategyInfo();
     
@@ -37,8 +41,97 @@ function updateStrategyInfo() {
     infoElement.textContent = strategyInfo[strategy] || strategyInfo.smart;
 }
 
+function showCachedRanking() {
+    // Every strategy was ranked in one request, so switching needs no new POST
+    if (!lastAnalysis || pendingDelta.add.length || pendingDelta.remove.length) return;
+    const strategy = document.getElementById('strategy')?.value || 'smart';
+    displayResults(rankingFor(lastAnalysis, strategy));
+}
+
+function rankingFor(analysis, strategy) {
+    const order = analysis.rankings[strategy] || analysis.rankings.smart;
+    return order.map(id => {
+        const task = analysis.tasks.get(id);
+        return { ...task, priority_score: task.scores[strategy] };
+    });
+}
+
+function analysisFromSession(data) {
+    // Rankings list task ids, best first; tasks are looked up by id
+    return {
+        tasks: new Map(data.tasks.map(task => [String(task.id), task])),
+        rankings: data.rankings
+    };
+}
+
+function applyRankingPatch(analysis, patch) {
+    if (patch.full) return analysisFromSession(patch);
+    
+    patch.removed.forEach(id => analysis.tasks.delete(id));
+    patch.tasks.forEach(task => analysis.tasks.set(String(task.id), task));
+    for (const [strategy, change] of Object.entries(patch.rankings)) {
+        // Drop moved and removed ids, then insert at the final indexes in ascending order
+        const dropped = new Set(change.remove);
+        const order = analysis.rankings[strategy].filter(id => !dropped.has(id));
+        change.insert.forEach(([index, id]) => order.splice(index, 0, id));
+        analysis.rankings[strategy] = order;
+    }
+    return analysis;
+}
+
+function resetSession() {
+    if (session) {
+        fetch(`/api/tasks/sessions/${session.id}/`, { method: 'DELETE' }).catch(() => {});
+    }
+    session = null;
+    lastAnalysis = null;
+    pendingDelta = { add: [], remove: [] };
+}
+
+async function uploadSession() {
+    const response = await fetch('/api/tasks/sessions/?strategy=all', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(tasks)
+    });
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    
+    const data = await response.json();
+    session = { id: data.session_id, version: data.version };
+    pendingDelta = { add: [], remove: [] };
+    return analysisFromSession(data);
+}
+
+async function sendDelta() {
+    const response = await fetch(`/api/tasks/sessions/${session.id}/`, {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ ...pendingDelta, version: session.version })
+    });
+    if (response.status === 400 || response.status === 404 || response.status === 409) {
+        // Session expired, out of step or rejected the delta - start over with the whole backlog
+        return uploadSession();
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    
+    const patch = await response.json();
+    session.version = patch.version;
+    pendingDelta = { add: [], remove: [] };
+    return applyRankingPatch(lastAnalysis, patch);
+}
+
 function loadSampleData() {
     if (tasks.length === 0) {
+        // The list may have been emptied one removal at a time - upload the samples as a new backlog
+        resetSession();
         tasks = [
             {
                 id: 'sample-1',
@@ -91,6 +184,7 @@ function addTaskFromForm() {
     };
 
     tasks.push(task);
+    pendingDelta.add.push(task);
     document.getElementById('taskForm').reset();
     const today = new Date().toISOString().split('T')[0];
     document.getElementById('dueDate').value = today;
@@ -134,7 +228,13 @@ function updateTaskList() {
 
 function removeTask(index) {
     if (confirm('Are you sure you want to remove this task?')) {
-        tasks.splice(index, 1);
+        const [removed] = tasks.splice(index, 1);
+        const unsent = pendingDelta.add.indexOf(removed);
+        if (unsent !== -1) {
+            pendingDelta.add.splice(unsent, 1);
+        } else {
+            pendingDelta.remove.push(removed.id);
+        }
         updateTaskList();
         showMessage('Task removed successfully!');
     }
@@ -148,6 +248,7 @@ function clearAllTasks() {
     
     if (confirm('Are you sure you want to remove all tasks?')) {
         tasks = [];
+        resetSession();
         updateTaskList();
         showMessage('All tasks cleared!');
     }
@@ -171,20 +272,13 @@ async function analyzeTasks() {
     try {
         const strategy = document.getElementById('strategy')?.value || 'smart';
         
-        const response = await fetch(`/api/tasks/analyze/?strategy=${strategy}`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(tasks)
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+        // The backlog is uploaded once; after that only the edits since the last analysis are sent
+        if (!session || !lastAnalysis) {
+            lastAnalysis = await uploadSession();
+        } else if (pendingDelta.add.length || pendingDelta.remove.length) {
+            lastAnalysis = await sendDelta();
         }
-
-        const result = await response.json();
-        displayResults(result.tasks || result);
+        displayResults(rankingFor(lastAnalysis, strategy));
         
     } catch (error) {
         console.error('Analysis error:', error);